@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures the per-call overhead of the core client.
+
+Requests never leave the process: a transport adapter answers every call
+with a canned response, so the timings cover cpauto and requests only.
+
+Usage::
+  $ python benchmarks/bench_client.py [--number N] [--codec json|orjson|ujson]
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import cpauto
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+
+class CannedAdapter(BaseAdapter):
+    """Answers every request with the same small JSON body."""
+
+    def __init__(self, body):
+        super(CannedAdapter, self).__init__()
+        self.body = body
+
+    def send(self, request, **kwargs):
+        r = Response()
+        r.status_code = 200
+        r.headers['content-type'] = 'application/json'
+        r._content = self.body
+        r.url = request.url
+        r.request = request
+        return r
+
+    def close(self):
+        pass
+
+CODECS = {
+    'json': cpauto.JSONCodec,
+    'orjson': cpauto.OrjsonCodec,
+    'ujson': cpauto.UjsonCodec,
+}
+
+def make_client(codec):
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', codec=codec)
+    adapter = CannedAdapter(b'{"sid": "97BVpRfN4j81ogN-V2XqGYmw3DDwIhoSn0og8PiKDiM", "uid": "abc", "name": "h"}')
+    http_session = cc._CoreClient__get_http_session()
+    # proxy settings would otherwise be looked up in the environment on
+    # every call, which is not the client's own overhead
+    http_session.trust_env = False
+    http_session.mount('https://', adapter)
+    cc.login()
+    return cc
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=1000, help='calls per benchmark')
+    parser.add_argument('--codec', choices=sorted(CODECS), default='json', help='JSON codec to use')
+    args = parser.parse_args()
+
+    cc = make_client(CODECS[args.codec]())
+    host = cpauto.Host(cc)
+    benchmarks = [
+        ('merge_payloads', lambda: cc.merge_payloads({'name': 'h'}, {'color': 'red'})),
+        ('http_post', lambda: cc.http_post('show-host', payload={'name': 'h'})),
+        ('http_post + json()', lambda: cc.http_post('show-host', payload={'name': 'h'}).json()['uid']),
+        ('Host.show', lambda: host.show(name='h')),
+    ]
+    for name, call in benchmarks:
+        best = min(timeit.repeat(call, number=args.number, repeat=3))
+        print('{0:<24} {1:8.2f} us/call'.format(name, best / args.number * 1e6))
+
+if __name__ == '__main__':
+    main()
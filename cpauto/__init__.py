@@ -68,7 +68,18 @@ __license__ = 'Apache 2.0'
 __copyright__ = 'Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd.'
 
 from .core.sessions import CoreClientResult, CoreClient, LoginMessage, Session
+from .core.autopublish import AutoPublisher, Commit
+from .core.pipeline import PipelinedWriter
+from .core.writerpool import WriterPool
+from .core.cache import ObjectCache
+from .core.jsoncodec import JSONCodec, OrjsonCodec, UjsonCodec, fastest_codec
+from .core.metrics import ClientMetrics
 from .core.misc import Misc
+from .core.polling import PollingStrategy
+from .core.ratelimit import AdaptiveConcurrency, RateLimiter
+from .core.retry import RetryPolicy
+from .core.scheduler import RequestScheduler
+from .core.tasks import TaskHandle, TaskPoller
 from .core.exceptions import (
     CoreClientError,
     WaitOnTaskError,
@@ -77,16 +88,21 @@ from .core.exceptions import (
     SSLError,
     Timeout,
     TooManyRedirects,
-    InvalidURL
+    InvalidURL,
+    SchedulerFull
 )
 
 from .objects.access import AccessRule, AccessSection, AccessLayer, NATRule, NATSection
 from .objects.application import App, AppCategory, AppGroup
+from .objects.batch import ObjectsBatch
+from .objects.bulk import BulkItem, BulkResult
 from .objects.group import Group
 from .objects.host import Host
 from .objects.network import Network
 from .objects.dnsdomain import DNSDomain
 from .objects.policy import Policy, PolicyPackage
+from .objects.reconcile import Change, Plan, Reconciler
+from .objects.resolver import UIDResolver
 from .objects.service import (
     ServiceTCP,
     ServiceUDP,
@@ -98,3 +114,33 @@ from .objects.service import (
 )
 from .objects.simplegateway import SimpleGateway
 from .objects.threat import ThreatProfile
+
+import sys as _sys
+
+if _sys.version_info >= (3, 6):
+    from .core.aiosessions import AsyncCoreClient, AsyncLoginMessage, AsyncSession, AsyncMisc
+    from .objects.aio import (
+        AsyncAccessRule,
+        AsyncAccessSection,
+        AsyncAccessLayer,
+        AsyncNATRule,
+        AsyncNATSection,
+        AsyncApp,
+        AsyncAppCategory,
+        AsyncAppGroup,
+        AsyncDNSDomain,
+        AsyncGroup,
+        AsyncHost,
+        AsyncNetwork,
+        AsyncPolicy,
+        AsyncPolicyPackage,
+        AsyncServiceTCP,
+        AsyncServiceUDP,
+        AsyncServiceSCTP,
+        AsyncServiceOther,
+        AsyncServiceGroup,
+        AsyncServiceDCERPC,
+        AsyncServiceRPC,
+        AsyncSimpleGateway,
+        AsyncThreatProfile
+    )
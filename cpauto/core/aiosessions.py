@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.aiosessions
+# ~~~~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains the asyncio flavour of the objects needed to manage
+R80 Web API sessions. It requires Python 3.6 or newer."""
+
+from .exceptions import WaitOnTaskError
+from .misc import Misc
+from .polling import polling_strategy_for
+from .sessions import _TASK_ID_MARKER, CoreClient, LoginMessage, Session
+from .tasks import _check_task_result, _pending_task_ids, _task_ids
+
+from ..objects._aiocommon import _asyncify
+
+from concurrent.futures import ThreadPoolExecutor
+
+import asyncio
+import functools
+
+async def _sleep_or_timeout(delays):
+    delay = next(delays, None)
+    if delay is None:
+        raise WaitOnTaskError("Timed out waiting on task or tasks")
+    await asyncio.sleep(delay)
+
+class AsyncCoreClient:
+    """The cpauto asyncio core client.
+
+    Offers the same surface as :class:`CoreClient`, but every API call is a
+    coroutine. Requests run on a bounded pool of worker threads sharing one
+    pooled HTTP session, and waiting on tasks never blocks the event loop, so
+    many calls can be kept in flight from a single process. ``pool_size``
+    bounds the number of concurrent requests; ``polling``, ``codec``,
+    ``retry``, ``rate_limit``, ``concurrency``, ``scheduler``, ``cache`` and
+    ``single_flight`` work as they do for :class:`CoreClient`, and requests
+    are counted in ``metrics``.
+    Give a scheduler a ``max_in_flight`` below ``pool_size`` so that urgent
+    requests still find a free worker thread when bulk ones are waiting.
+
+    Basic Usage::
+      >>> import asyncio
+      >>> import cpauto
+      >>> cc = cpauto.AsyncCoreClient('admin', 'vpn123', '10.11.12.13')
+      >>> loop = asyncio.get_event_loop()
+      >>> r = loop.run_until_complete(cc.login())
+      >>> r.status_code
+      200
+    """
+
+    def __init__(self, user='', password='', mgmt_server='', port=443, verify=True, wait_for_tasks=True,
+                 pool_size=10, polling=None, codec=None, retry=None, rate_limit=None, concurrency=None,
+                 scheduler=None, cache=None, single_flight=True):
+        self.__core_client = CoreClient(user, password, mgmt_server, port=port, verify=verify,
+            wait_for_tasks=False, pool_size=pool_size, pool_block=True, codec=codec, retry=retry,
+            rate_limit=rate_limit, concurrency=concurrency, scheduler=scheduler, cache=cache,
+            single_flight=single_flight)
+        self.metrics = self.__core_client.metrics
+        self.__wait_for_tasks = wait_for_tasks
+        self.__pool_size = pool_size
+        self.__polling = polling
+        self.__executor = None
+
+    def __get_executor(self):
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=self.__pool_size)
+        return self.__executor
+
+    async def __post(self, endpoint, send_sid, payload):
+        loop = asyncio.get_event_loop()
+        call = functools.partial(self.__core_client.http_post, endpoint, send_sid=send_sid, payload=payload)
+        return await loop.run_in_executor(self.__get_executor(), call)
+
+    async def __wait_on_tasks(self, task_ids, strategy):
+        delays = strategy.delays()
+        pending = list(task_ids)
+
+        # poll every outstanding task with a single request per round, at the
+        # standard detail level which carries the status; the full details
+        # are fetched once, after every task has finished
+        while pending:
+            await _sleep_or_timeout(delays)
+            task_r = await self.__post("show-task", True, {"task-id": pending, "details-level": "standard"})
+
+            if task_r.status_code == 404:
+                continue
+            if task_r.status_code != 200:
+                raise WaitOnTaskError("Failed to handle asynchronous task as synchronous")
+
+            pending = _pending_task_ids(pending, task_r.json())
+
+        task_r = await self.__post("show-task", True, {"task-id": list(task_ids), "details-level": "full"})
+        if task_r.status_code != 200:
+            raise WaitOnTaskError("Failed to handle asynchronous task as synchronous")
+
+        _check_task_result(task_r)
+        return task_r
+
+    async def http_post(self, endpoint, send_sid=True, payload={}):
+        """Makes an HTTP post to the specified API endpoint using user supplied data.
+
+        :param endpoint: The API endpoint (e.g. /login).
+        :param send_sid: Send the session ID as a header when true.
+        :param payload: The payload (dictionary) that will be included
+            as JSON in the body of the request.
+        :rtype: CoreClientResult
+        """
+        r = await self.__post(endpoint, send_sid, payload)
+        # wait for tasks if needed
+        if self.__wait_for_tasks and r.status_code == 200 and endpoint != "show-task" and (
+                r.raw is None or _TASK_ID_MARKER in r.raw):
+            task_ids = _task_ids(r.json())
+            if task_ids:
+                strategy = polling_strategy_for(endpoint, self.__polling)
+                return await self.__wait_on_tasks(task_ids, strategy)
+        return r
+
+    async def http_post_stream(self, endpoint, keys, send_sid=True, payload={}, chunk_size=65536):
+        """Makes an HTTP post to the specified API endpoint and decodes the
+        response incrementally, as it is read from the socket.
+
+        :param endpoint: The API endpoint (e.g. show-access-rulebase).
+        :param keys: The names of the top-level arrays to decode (e.g. rulebase).
+        :param send_sid: Send the session ID as a header when true.
+        :param payload: The payload (dictionary) that will be included
+            as JSON in the body of the request.
+        :param chunk_size: (optional) The number of bytes read at a time.
+        :raises CoreClientError: The API request failed.
+        :returns: An asynchronous generator of (key, element) tuples.
+        """
+        loop = asyncio.get_event_loop()
+        items = self.__core_client.http_post_stream(endpoint, keys, send_sid=send_sid, payload=payload,
+                                                    chunk_size=chunk_size)
+        end = object()
+        try:
+            while True:
+                item = await loop.run_in_executor(self.__get_executor(), next, items, end)
+                if item is end:
+                    return
+                yield item
+        finally:
+            items.close()
+
+    def merge_payloads(self, payload_a, payload_b):
+        """Merges the contents of two payloads (dictionaries).
+
+        :param payload_a: A payload to merge
+        :param payload_b: Another payload to merge
+        :returns: A single payload (dictionary) with the contents of the two original payloads
+        """
+        return self.__core_client.merge_payloads(payload_a, payload_b)
+
+    async def login(self, params={}):
+        """Login to the R80 Web API server and store the results
+        of the request as a class attribute.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/login
+
+        :param params: (optional) A dictionary of additional, supported parameter names and values.
+        :rtype: CoreClientResult
+        """
+        loop = asyncio.get_event_loop()
+        call = functools.partial(self.__core_client.login, params=params)
+        return await loop.run_in_executor(self.__get_executor(), call)
+
+    async def logout(self):
+        """Logout of the R80 Web API server and invalidate the session.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/logout
+
+        :rtype: CoreClientResult
+        """
+        try:
+            return await self.http_post('logout')
+        finally:
+            self.close()
+
+    def close(self):
+        """Closes all pooled connections and stops the worker threads.
+
+        The client remains usable; both are recreated on the next request.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+        self.__core_client.close()
+
+    async def publish(self, uid=""):
+        """Makes all changes made visible to other users.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/publish
+
+        :param uid: (optional) Specify a different session unique
+            identifier to publish.
+        :rtype: CoreClientResult
+        """
+        payload = {}
+        if uid:
+            payload['uid'] = uid
+        return await self.http_post('publish', payload=payload)
+
+    async def discard(self, uid=""):
+        """Discards all changes made and removes them from the database.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/discard
+
+        :param uid: (optional) Specify a different sessions unique
+            identifier to discard.
+        :rtype: CoreClientResult
+        """
+        payload = {}
+        if uid:
+            payload['uid'] = uid
+        return await self.http_post('discard', payload=payload)
+
+    async def keepalive(self):
+        """Keeps the session alive and valid.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/keepalive
+
+        :rtype: CoreClientResult
+        """
+        return await self.http_post('keepalive')
+
+AsyncSession = _asyncify(Session, __name__)
+AsyncLoginMessage = _asyncify(LoginMessage, __name__)
+AsyncMisc = _asyncify(Misc, __name__)
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.autopublish
+# ~~~~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains a write session that publishes its changes as it
+goes, in commits of bounded size."""
+
+from .exceptions import CoreClientError
+
+import threading
+import time
+
+MUTATING_PREFIXES = ('add-', 'set-', 'delete-')
+"""Endpoints counted as changes to publish."""
+
+def _change_count(endpoint, payload):
+    # the number of objects changed by a call; batch calls change many
+    if not endpoint.startswith(MUTATING_PREFIXES):
+        return 0
+    if endpoint.endswith('-objects-batch'):
+        return sum(len(objects.get('list', [])) for objects in payload.get('objects', []))
+    return 1
+
+class Commit:
+    """A publish made by an :class:`AutoPublisher`, a :class:`PipelinedWriter`
+    or a :class:`WriterPool`: ``changes`` is the number
+    of changes it committed, ``duration`` the seconds it took and ``result``
+    the CoreClientResult of the publish."""
+
+    def __init__(self, changes, duration, result):
+        self.changes = changes
+        self.duration = duration
+        self.result = result
+
+class _Gate:
+    # lets any number of writes through at once, or a single publish
+    def __init__(self):
+        self.__cond = threading.Condition()
+        self.__writes = 0
+        self.__publishing = False
+
+    def enter_write(self):
+        with self.__cond:
+            while self.__publishing:
+                self.__cond.wait()
+            self.__writes += 1
+
+    def exit_write(self):
+        with self.__cond:
+            self.__writes -= 1
+            self.__cond.notify_all()
+
+    def enter_publish(self):
+        with self.__cond:
+            while self.__publishing:
+                self.__cond.wait()
+            self.__publishing = True
+            while self.__writes:
+                self.__cond.wait()
+
+    def exit_publish(self):
+        with self.__cond:
+            self.__publishing = False
+            self.__cond.notify_all()
+
+class AutoPublisher:
+    """A write session over a core client that publishes every ``changes``
+    changes (add-*, set-* and delete-* calls, counting every object of a
+    batch call) or, on the next change, once ``seconds`` have passed since the
+    last publish. Keeping sessions small keeps every publish quick, and
+    commits what was done so far should a long job fail.
+
+    Use it as a context manager and in place of the core client when
+    building objects. Leaving the block publishes whatever is left, or
+    discards it when an exception was raised. Writes made by other threads
+    through the publisher wait while a publish is running. Every publish is
+    recorded as a :class:`Commit` in ``commits`` and handed to ``on_commit``.
+
+    A publish made once a limit is reached never fails the write that
+    reached it. Its error is kept in ``error`` and further writes are
+    refused, without being sent, until :meth:`publish` (called explicitly or
+    on leaving the block) succeeds or the changes are discarded.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13')
+      >>> r = cc.login()
+      >>> with cpauto.AutoPublisher(cc, changes=500) as session:
+      ...     bulk = cpauto.Host(session).add_many(specs)
+      >>> [(c.changes, round(c.duration, 1)) for c in session.commits]
+      [(500, 4.2), (500, 4.3), (137, 1.9)]
+    """
+
+    def __init__(self, core_client, changes=1000, seconds=None, on_commit=None, clock=time.time):
+        self.__cc = core_client
+        self.changes = changes
+        self.seconds = seconds
+        self.on_commit = on_commit
+        self.commits = []
+        self.__clock = clock
+        self.__gate = _Gate()
+        self.__lock = threading.Lock()
+        self.__pending = 0
+        self.__last_publish = clock()
+        self.__error = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.discard()
+        else:
+            self.publish()
+        return False
+
+    @property
+    def pending(self):
+        """The number of changes made since the last publish."""
+        return self.__pending
+
+    @property
+    def error(self):
+        """The error of the last publish made once a limit was reached, when
+        it failed and no publish has succeeded since, or None."""
+        return self.__error
+
+    @property
+    def cache(self):
+        """The object cache of the core client, or None."""
+        return getattr(self.__cc, 'cache', None)
+
+    def merge_payloads(self, payload_a, payload_b):
+        """Merges the contents of two payloads (dictionaries).
+
+        :param payload_a: A payload to merge
+        :param payload_b: Another payload to merge
+        :returns: A single payload (dictionary) with the contents of the two original payloads
+        """
+        return self.__cc.merge_payloads(payload_a, payload_b)
+
+    def http_post(self, endpoint, send_sid=True, payload={}):
+        """Makes an HTTP post through the core client, counting changes and
+        publishing when a limit is reached.
+
+        :param endpoint: The API endpoint (e.g. add-host).
+        :param send_sid: Send the session ID as a header when true.
+        :param payload: The payload (dictionary) that will be included
+            as JSON in the body of the request.
+        :raises CoreClientError: An earlier publish failed; the request was
+            not sent.
+        :rtype: CoreClientResult
+        """
+        count = _change_count(endpoint, payload)
+        if not count:
+            return self.__cc.http_post(endpoint, send_sid=send_sid, payload=payload)
+        error = self.__error
+        if error is not None:
+            raise CoreClientError("Not writing, an earlier publish failed: {0}".format(error),
+                                  http_status_code=getattr(error, 'http_status_code', None))
+        self.__gate.enter_write()
+        try:
+            r = self.__cc.http_post(endpoint, send_sid=send_sid, payload=payload)
+            with self.__lock:
+                self.__pending += count
+                due = self.__pending >= self.changes or (
+                    self.seconds is not None and self.__clock() - self.__last_publish >= self.seconds)
+        finally:
+            self.__gate.exit_write()
+        if due:
+            # the write went through whatever happens to the publish
+            try:
+                self.publish()
+            except Exception as e:
+                with self.__lock:
+                    self.__error = e
+        return r
+
+    def http_post_stream(self, endpoint, keys, send_sid=True, payload={}, chunk_size=65536):
+        """Makes a streamed HTTP post through the core client; see
+        :meth:`CoreClient.http_post_stream`."""
+        return self.__cc.http_post_stream(endpoint, keys, send_sid=send_sid, payload=payload,
+                                          chunk_size=chunk_size)
+
+    def publish(self):
+        """Publishes the changes made so far, once writes in flight are done.
+
+        :raises CoreClientError: The publish failed.
+        :returns: The Commit made, or None when there was nothing to publish.
+        """
+        self.__gate.enter_publish()
+        try:
+            changes = self.__pending
+            if not changes:
+                return None
+            started = self.__clock()
+            r = self.__cc.publish()
+            if r.task is not None:
+                r = r.task.result()
+            commit = Commit(changes, self.__clock() - started, r)
+            if r.status_code != 200 or not r.success:
+                message = r.message or r.json().get('message', 'Failed to publish changes')
+                raise CoreClientError(message, http_status_code=r.status_code)
+            with self.__lock:
+                self.__pending -= changes
+                self.__last_publish = self.__clock()
+                self.__error = None
+            self.commits.append(commit)
+        finally:
+            self.__gate.exit_publish()
+        if self.on_commit is not None:
+            self.on_commit(commit)
+        return commit
+
+    def discard(self):
+        """Discards the changes made since the last publish.
+
+        :rtype: CoreClientResult
+        """
+        self.__gate.enter_publish()
+        try:
+            r = self.__cc.discard()
+            if r.task is not None:
+                r = r.task.result()
+            with self.__lock:
+                self.__pending = 0
+                self.__error = None
+            return r
+        finally:
+            self.__gate.exit_publish()
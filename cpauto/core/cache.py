@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.cache
+# ~~~~~~~~~~~~~~~~~
+
+"""This module contains the cache a core client can keep of the objects it
+shows, so that looking up the same objects again costs no round trip."""
+
+from collections import OrderedDict
+
+import threading
+import time
+
+CACHEABLE_TYPES = (
+    'host', 'network', 'group', 'address-range', 'dns-domain',
+    'application-site', 'application-site-category', 'application-site-group',
+    'service-tcp', 'service-udp', 'service-sctp', 'service-other', 'service-rpc', 'service-dce-rpc',
+    'service-group', 'simple-gateway',
+)
+"""The object types whose show-* results are cached by default."""
+
+GROUP_TYPES = ('group', 'service-group', 'application-site-group')
+"""Types whose members can change as a side effect of writes to other objects."""
+
+GROUP_MEMBER_TYPES = {
+    'group': ('host', 'network', 'group', 'address-range', 'dns-domain', 'simple-gateway'),
+    'service-group': ('service-tcp', 'service-udp', 'service-sctp', 'service-other', 'service-rpc',
+                      'service-dce-rpc', 'service-group'),
+    'application-site-group': ('application-site', 'application-site-category', 'application-site-group'),
+}
+"""Types of the objects each group type can hold, whose shown ``groups``
+change when the group's members do."""
+
+READ_ONLY_ENDPOINTS = ('keepalive', 'show-task', 'publish', 'verify-policy', 'install-policy')
+"""Endpoints other than show-* that never change objects in the session."""
+
+_KEY_FIELDS = frozenset(['name', 'uid', 'details-level'])
+
+def _split(endpoint):
+    # splits e.g. set-host into (set, host)
+    verb, _, object_type = endpoint.partition('-')
+    return verb, object_type
+
+class ObjectCache:
+    """A size-bounded, least recently used cache of show-* results, keyed
+    by object type and name or uid, whose entries expire after ``ttl``
+    seconds. ``max_size`` bounds the number of keys; each cached object takes
+    up two, its name and its uid.
+
+    A core client given a cache answers repeated show calls for an object
+    (e.g. show-host by name) from it. Writes made through the client keep it
+    consistent: add-*, set-* and delete-* drop the entries of the object they
+    target as well as every cached group, writes to a group also drop the
+    objects it can hold, and batch and other writes and discard, login or
+    logout flush it entirely, and a show answered while such a write was
+    in flight is not cached. Changes made by other sessions are only seen
+    once entries expire.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> cache = cpauto.ObjectCache(ttl=300, max_size=10000)
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', cache=cache)
+      >>> r = cpauto.Host(cc).show(name='web-1')  # sent
+      >>> r = cpauto.Host(cc).show(name='web-1')  # answered from the cache
+    """
+
+    def __init__(self, ttl=60.0, max_size=10000, types=CACHEABLE_TYPES, clock=time.time):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.types = frozenset(types)
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+        # bumped by invalidations, so reads that raced a write can tell
+        self.__generations = {}
+        self.__cleared = 0
+
+    def __len__(self):
+        with self.__lock:
+            return len(set(id(entry) for entry in self.__entries.values()))
+
+    def __keys(self, object_type, payload):
+        # the cache key of a show request, or None when it is not cacheable
+        if object_type not in self.types or not payload or not _KEY_FIELDS.issuperset(payload):
+            return None
+        details_level = payload.get('details-level', 'standard')
+        if 'uid' in payload:
+            return (object_type, details_level, 'uid', payload['uid'])
+        if 'name' in payload:
+            return (object_type, details_level, 'name', payload['name'])
+        return None
+
+    def get(self, endpoint, payload):
+        """Returns the cached result of a show request, or None.
+
+        :param endpoint: The API endpoint (e.g. show-host).
+        :param payload: The payload of the request.
+        :rtype: CoreClientResult
+        """
+        verb, object_type = _split(endpoint)
+        if verb != 'show':
+            return None
+        key = self.__keys(object_type, payload)
+        if key is None:
+            return None
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            result, expires, keys = entry
+            if expires <= self.__clock():
+                self.__remove(entry)
+                return None
+            # most recently used entries are kept at the end, under all their keys
+            for k in keys:
+                del self.__entries[k]
+                self.__entries[k] = entry
+            return result
+
+    def find_uid(self, uid, details_level='standard'):
+        """Returns the cached result of showing the object with uid, whatever
+        its type, or None.
+
+        :param uid: The unique identifier of an object.
+        :param details_level: (optional) The level of detail of the result.
+        :rtype: CoreClientResult
+        """
+        payload = { 'uid': uid, 'details-level': details_level }
+        for object_type in self.types:
+            result = self.get('show-' + object_type, payload)
+            if result is not None:
+                return result
+        return None
+
+    def generation(self, endpoint):
+        """Returns a token that changes whenever a write invalidates the
+        entries of the type endpoint shows. Taken before sending a show
+        request and given to :meth:`put`, it keeps a result read before a
+        concurrent write from being cached after it.
+
+        :param endpoint: The API endpoint (e.g. show-host).
+        """
+        verb, object_type = _split(endpoint)
+        with self.__lock:
+            return (self.__cleared, self.__generations.get(object_type, 0))
+
+    def put(self, endpoint, payload, result, generation=None):
+        """Caches the successful result of a show request.
+
+        The result is cached under both the name and the uid of the object,
+        whichever the request used. It is not cached when ``generation``
+        is given and entries of its type were invalidated since.
+
+        :param endpoint: The API endpoint (e.g. show-host).
+        :param payload: The payload of the request.
+        :param result: The CoreClientResult received.
+        :param generation: (optional) The token :meth:`generation` returned
+            before the request was sent.
+        """
+        verb, object_type = _split(endpoint)
+        if verb != 'show' or result.status_code != 200:
+            return
+        key = self.__keys(object_type, payload)
+        if key is None:
+            return
+        data = result.json()
+        keys = [key]
+        for field in ('name', 'uid'):
+            if field in data and key[2] != field:
+                keys.append(key[:2] + (field, data[field]))
+        entry = (result, self.__clock() + self.ttl, keys)
+        with self.__lock:
+            if generation is not None and generation != (self.__cleared, self.__generations.get(object_type, 0)):
+                return
+            for k in keys:
+                old = self.__entries.get(k)
+                if old is not None:
+                    self.__remove(old)
+            for k in keys:
+                self.__entries[k] = entry
+            while len(self.__entries) > self.max_size:
+                self.__remove(next(iter(self.__entries.values())))
+
+    def invalidate(self, endpoint, payload):
+        """Drops the entries a request to endpoint may have made stale.
+
+        :param endpoint: The API endpoint (e.g. set-host).
+        :param payload: The payload of the request.
+        """
+        verb, object_type = _split(endpoint)
+        if verb == 'show' or endpoint in READ_ONLY_ENDPOINTS:
+            return
+        if verb not in ('add', 'set', 'delete') or object_type == 'objects-batch':
+            self.clear()
+            return
+        stale_types = set(GROUP_TYPES)
+        stale_types.update(GROUP_MEMBER_TYPES.get(object_type, ()))
+        with self.__lock:
+            for t in stale_types | set([object_type]):
+                self.__generations[t] = self.__generations.get(t, 0) + 1
+            for key, entry in list(self.__entries.items()):
+                if key not in self.__entries:
+                    continue
+                if key[0] in stale_types or (key[0] == object_type and payload.get(key[2]) == key[3]):
+                    self.__remove(entry)
+
+    def clear(self):
+        """Drops every entry."""
+        with self.__lock:
+            self.__entries.clear()
+            self.__cleared += 1
+
+    def __remove(self, entry):
+        for key in entry[2]:
+            if self.__entries.get(key) is entry:
+                del self.__entries[key]
@@ -60,3 +60,7 @@ class TooManyRedirects(CoreClientError):
 class InvalidURL(CoreClientError, ValueError):
     """The URL provided was invalid."""
     pass
+
+class SchedulerFull(CoreClientError):
+    """The request scheduler queue is full."""
+    pass
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.jsoncodec
+# ~~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains the codecs used to encode request bodies and decode
+response bodies. Faster codecs backed by orjson or ujson are available when
+those packages are installed."""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+class JSONCodec:
+    """Encodes and decodes JSON with the standard library json module.
+
+    Any object with the same dumps and loads methods can be given to the core
+    client as its codec.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', codec=cpauto.fastest_codec())
+    """
+
+    name = 'json'
+
+    def dumps(self, obj):
+        """Encodes obj as JSON.
+
+        :param obj: The object to encode.
+        :returns: The UTF-8 encoded JSON document.
+        :rtype: bytes
+        """
+        return json.dumps(obj, allow_nan=False).encode('utf-8')
+
+    def loads(self, s):
+        """Decodes a JSON document.
+
+        :param s: The JSON document, as UTF-8 bytes or text.
+        """
+        if isinstance(s, bytes) and not isinstance(s, str):
+            s = s.decode('utf-8')
+        return json.loads(s)
+
+class OrjsonCodec(JSONCodec):
+    """Encodes and decodes JSON with orjson."""
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires the orjson package")
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+    def loads(self, s):
+        return orjson.loads(s)
+
+class UjsonCodec(JSONCodec):
+    """Encodes and decodes JSON with ujson."""
+
+    name = 'ujson'
+
+    def __init__(self):
+        if ujson is None:
+            raise ImportError("UjsonCodec requires the ujson package")
+
+    def dumps(self, obj):
+        return ujson.dumps(obj).encode('utf-8')
+
+    def loads(self, s):
+        return ujson.loads(s)
+
+DEFAULT_CODEC = JSONCodec()
+"""The codec used when the core client is not given one."""
+
+def fastest_codec():
+    """Returns the fastest codec available: orjson, then ujson, then the
+    standard library.
+
+    :rtype: JSONCodec
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    if ujson is not None:
+        return UjsonCodec()
+    return DEFAULT_CODEC
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# cpauto.core.metrics
+# ~~~~~~~~~~~~~~~~~~~
+
+"""This module contains the counters a core client keeps about its requests."""
+
+import threading
+
+class ClientMetrics:
+    """Thread-safe, named counters kept by a core client.
+
+    The core client counts every HTTP request it makes under ``requests`` and
+    every retried request under ``retries`` and ``retries.<endpoint>``.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', retry=cpauto.RetryPolicy())
+      >>> r = cc.login()
+      >>> cc.metrics.count('retries')
+      0
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__counters = {}
+
+    def increment(self, name, value=1):
+        """Adds value to the named counter.
+
+        :param name: The counter name.
+        :param value: (optional) The amount to add. Default is 1.
+        """
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def count(self, name):
+        """Returns the value of the named counter, 0 when it was never incremented.
+
+        :rtype: int
+        """
+        with self.__lock:
+            return self.__counters.get(name, 0)
+
+    def counters(self):
+        """Returns a snapshot of every counter.
+
+        :rtype: dict
+        """
+        with self.__lock:
+            return dict(self.__counters)
+
+    def reset(self):
+        """Sets every counter back to 0."""
+        with self.__lock:
+            self.__counters.clear()
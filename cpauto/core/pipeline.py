@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.pipeline
+# ~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains a write session that overlaps publishing with
+writing by alternating between two management sessions."""
+
+from .autopublish import Commit, _Gate, _change_count
+from .exceptions import CoreClientError
+
+from concurrent.futures import ThreadPoolExecutor
+
+import threading
+import time
+
+class PipelinedWriter:
+    """A write session over two logged-in core clients (two management
+    sessions) that take turns: while one publishes its changes, the other
+    keeps taking writes, and they swap roles every ``changes`` changes.
+    Writes and publishes overlap, so an import runs close to the speed of
+    its writes.
+
+    Changes made in one session cannot be seen, nor their objects changed,
+    from the other until they are published; writes that depend on recent
+    ones (e.g. adding hosts, then groups of them) should be made in separate
+    runs or with :class:`AutoPublisher`.
+
+    Use it as a context manager and in place of the core client when
+    building objects, as for :class:`AutoPublisher`. Leaving the block
+    publishes what is left in both sessions, or discards it when an
+    exception was raised. Every publish is recorded as a :class:`Commit` in
+    ``commits`` and handed to ``on_commit``, from the publishing thread.
+
+    A background publish that fails never fails a write. Its error is kept
+    in ``error`` and further writes are refused, without being sent, until
+    :meth:`publish` (called explicitly or on leaving the block) succeeds or
+    the changes are discarded.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> cc_a = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13')
+      >>> cc_b = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13')
+      >>> r = cc_a.login()
+      >>> r = cc_b.login()
+      >>> with cpauto.PipelinedWriter(cc_a, cc_b, changes=1000) as writer:
+      ...     bulk = cpauto.Host(writer).add_many(specs, concurrency=16)
+    """
+
+    def __init__(self, core_client, standby_client, changes=1000, on_commit=None, clock=time.time):
+        self.__clients = [core_client, standby_client]
+        self.changes = changes
+        self.on_commit = on_commit
+        self.commits = []
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__swap_lock = threading.Lock()
+        self.__gates = [_Gate(), _Gate()]
+        self.__pending = [0, 0]
+        self.__publishing = [None, None]
+        self.__active = 0
+        self.__error = None
+        self.__executor = ThreadPoolExecutor(max_workers=1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is not None:
+                self.discard()
+            else:
+                self.publish()
+        finally:
+            self.__executor.shutdown(wait=True)
+        return False
+
+    @property
+    def pending(self):
+        """The number of changes made in both sessions since they were last published."""
+        return sum(self.__pending)
+
+    @property
+    def error(self):
+        """The error of the last background publish, when it failed and no
+        publish has succeeded since, or None."""
+        return self.__error
+
+    @property
+    def cache(self):
+        """The object cache of the active core client, or None."""
+        return getattr(self.__clients[self.__active], 'cache', None)
+
+    def merge_payloads(self, payload_a, payload_b):
+        """Merges the contents of two payloads (dictionaries).
+
+        :param payload_a: A payload to merge
+        :param payload_b: Another payload to merge
+        :returns: A single payload (dictionary) with the contents of the two original payloads
+        """
+        return self.__clients[0].merge_payloads(payload_a, payload_b)
+
+    def http_post(self, endpoint, send_sid=True, payload={}):
+        """Makes an HTTP post through the session currently taking writes,
+        handing it over to publish once it holds enough changes.
+
+        :param endpoint: The API endpoint (e.g. add-host).
+        :param send_sid: Send the session ID as a header when true.
+        :param payload: The payload (dictionary) that will be included
+            as JSON in the body of the request.
+        :raises CoreClientError: An earlier publish failed; the request was
+            not sent.
+        :rtype: CoreClientResult
+        """
+        count = _change_count(endpoint, payload)
+        error = self.__error
+        if count and error is not None:
+            raise CoreClientError("Not writing, an earlier publish failed: {0}".format(error),
+                                  http_status_code=getattr(error, 'http_status_code', None))
+        with self.__lock:
+            i = self.__active
+            if count:
+                # never blocks: only the session not taking writes publishes
+                self.__gates[i].enter_write()
+        if not count:
+            return self.__clients[i].http_post(endpoint, send_sid=send_sid, payload=payload)
+        try:
+            r = self.__clients[i].http_post(endpoint, send_sid=send_sid, payload=payload)
+            with self.__lock:
+                self.__pending[i] += count
+                due = self.__pending[i] >= self.changes
+        finally:
+            self.__gates[i].exit_write()
+        if due:
+            self.__swap(i)
+        return r
+
+    def http_post_stream(self, endpoint, keys, send_sid=True, payload={}, chunk_size=65536):
+        """Makes a streamed HTTP post through the session currently taking
+        writes; see :meth:`CoreClient.http_post_stream`."""
+        return self.__clients[self.__active].http_post_stream(endpoint, keys, send_sid=send_sid,
+                                                              payload=payload, chunk_size=chunk_size)
+
+    def __swap(self, i):
+        # hands writes over to the other session, once it has finished
+        # publishing, and publishes session i in the background
+        with self.__swap_lock:
+            if self.__active != i:
+                return
+            other = self.__publishing[1 - i]
+            if other is not None:
+                other.result()
+                self.__publishing[1 - i] = None
+            with self.__lock:
+                self.__active = 1 - i
+            self.__publishing[i] = self.__executor.submit(self.__publish_in_background, i)
+
+    def __publish_in_background(self, i):
+        # the writes that led to the publish went through whatever happens
+        # to it, so its error is kept for publish() rather than raised
+        try:
+            return self.__publish(i)
+        except Exception as e:
+            with self.__lock:
+                self.__error = e
+
+    def __publish(self, i):
+        gate = self.__gates[i]
+        gate.enter_publish()
+        try:
+            changes = self.__pending[i]
+            if not changes:
+                return None
+            client = self.__clients[i]
+            started = self.__clock()
+            r = client.publish()
+            if r.task is not None:
+                r = r.task.result()
+            commit = Commit(changes, self.__clock() - started, r)
+            if r.status_code != 200 or not r.success:
+                message = r.message or r.json().get('message', 'Failed to publish changes')
+                raise CoreClientError(message, http_status_code=r.status_code)
+            with self.__lock:
+                self.__pending[i] -= changes
+                self.commits.append(commit)
+        finally:
+            gate.exit_publish()
+        if self.on_commit is not None:
+            self.on_commit(commit)
+        return commit
+
+    def publish(self):
+        """Waits for the publish in progress, if any, then publishes the
+        changes left in both sessions.
+
+        :raises CoreClientError: A publish failed.
+        """
+        for i in (0, 1):
+            future = self.__publishing[i]
+            if future is not None:
+                self.__publishing[i] = None
+                future.result()
+        for i in (1 - self.__active, self.__active):
+            self.__publish(i)
+        with self.__lock:
+            self.__error = None
+
+    def discard(self):
+        """Waits for the publish in progress, if any, then discards the
+        changes left in both sessions. A failure of that publish is ignored.
+        """
+        for i in (0, 1):
+            future = self.__publishing[i]
+            if future is not None:
+                self.__publishing[i] = None
+                future.result()
+        for i in (0, 1):
+            gate = self.__gates[i]
+            gate.enter_publish()
+            try:
+                if self.__pending[i]:
+                    self.__clients[i].discard()
+                with self.__lock:
+                    self.__pending[i] = 0
+            finally:
+                gate.exit_publish()
+        with self.__lock:
+            self.__error = None
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.polling
+# ~~~~~~~~~~~~~~~~~~~
+
+"""This module contains the strategies used to poll asynchronous tasks."""
+
+import random
+import time
+
+class PollingStrategy:
+    """Decides how long to wait between polls of an asynchronous task.
+
+    The first poll happens after ``initial_delay`` seconds. Every following
+    delay grows by ``multiplier`` up to ``max_delay``, and each one is
+    randomly stretched or shrunk by up to ``jitter`` (a fraction) so that
+    concurrent waiters do not poll in lockstep. When ``deadline`` (seconds)
+    is set, waiting gives up once that much time has passed.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> fast = cpauto.PollingStrategy(initial_delay=0.05, max_delay=1)
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13',
+      ...                        polling={'publish': fast})
+    """
+
+    def __init__(self, initial_delay=0.2, multiplier=1.5, max_delay=5.0, jitter=0.1, deadline=None):
+        self.initial_delay = initial_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+
+    def delays(self, clock=time.time):
+        """Generates the successive delays (in seconds) to wait between polls.
+
+        The generator is exhausted once the deadline, if any, has passed.
+
+        :param clock: (optional) A function returning the current time in seconds.
+        """
+        start = clock()
+        delay = self.initial_delay
+        while True:
+            next_delay = min(delay, self.max_delay)
+            if self.jitter:
+                next_delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+            if self.deadline is not None:
+                remaining = self.deadline - (clock() - start)
+                if remaining <= 0:
+                    return
+                next_delay = min(next_delay, remaining)
+            yield next_delay
+            delay = delay * self.multiplier
+
+DEFAULT_POLLING_STRATEGY = PollingStrategy()
+"""The strategy used for endpoints without a more specific one."""
+
+ENDPOINT_POLLING_STRATEGIES = {
+    'publish': PollingStrategy(initial_delay=0.1, multiplier=1.5, max_delay=2.0),
+    'discard': PollingStrategy(initial_delay=0.1, multiplier=1.5, max_delay=2.0),
+    'run-script': PollingStrategy(initial_delay=0.5, multiplier=1.5, max_delay=5.0),
+    'put-file': PollingStrategy(initial_delay=0.5, multiplier=1.5, max_delay=5.0),
+    'add-objects-batch': PollingStrategy(initial_delay=0.5, multiplier=1.5, max_delay=5.0),
+    'set-objects-batch': PollingStrategy(initial_delay=0.5, multiplier=1.5, max_delay=5.0),
+    'delete-objects-batch': PollingStrategy(initial_delay=0.5, multiplier=1.5, max_delay=5.0),
+    'verify-policy': PollingStrategy(initial_delay=1.0, multiplier=1.5, max_delay=10.0),
+    'install-policy': PollingStrategy(initial_delay=2.0, multiplier=1.5, max_delay=15.0),
+}
+"""Per-endpoint strategies: quick tasks are polled fast, policy installs slowly."""
+
+def polling_strategy_for(endpoint, polling=None):
+    """Picks the polling strategy to use for tasks started by an endpoint.
+
+    :param endpoint: The API endpoint that started the task (e.g. publish).
+    :param polling: (optional) A PollingStrategy applied to every endpoint, or
+        a dictionary of endpoint names to strategies overriding the defaults.
+    :rtype: PollingStrategy
+    """
+    if isinstance(polling, PollingStrategy):
+        return polling
+    if polling and endpoint in polling:
+        return polling[endpoint]
+    return ENDPOINT_POLLING_STRATEGIES.get(endpoint, DEFAULT_POLLING_STRATEGY)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.ratelimit
+# ~~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains the objects a core client uses to limit the rate and
+the concurrency of its requests, so as not to overload the management server."""
+
+import threading
+import time
+
+class RateLimiter:
+    """A token bucket limiting requests to ``rate`` per second on average,
+    with bursts of up to ``burst`` requests.
+
+    A limiter can be shared by several core clients to limit them together.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> limiter = cpauto.RateLimiter(rate=20, burst=5)
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', rate_limit=limiter)
+    """
+
+    def __init__(self, rate, burst=None, clock=time.time, sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__lock = threading.Lock()
+        self.__tokens = self.burst
+        self.__updated = clock()
+
+    def acquire(self):
+        """Takes a token, waiting for one to be available.
+
+        :returns: The number of seconds spent waiting.
+        :rtype: float
+        """
+        with self.__lock:
+            now = self.__clock()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+            self.__updated = now
+            # the token is taken right away, even if it has to be waited for,
+            # so that concurrent callers queue up behind each other
+            self.__tokens -= 1
+            wait = -self.__tokens / self.rate if self.__tokens < 0 else 0.0
+        if wait:
+            self.__sleep(wait)
+        return wait
+
+class AdaptiveConcurrency:
+    """Limits the number of requests in flight and adapts the limit to the
+    health of the management server (additive increase, multiplicative
+    decrease).
+
+    The limit starts at ``initial``. Every request that succeeds within
+    ``latency_target`` seconds raises it by ``increase`` per limit's worth of
+    requests, up to ``maximum``. A request that fails because the server is
+    struggling (HTTP 429 or 5xx, a connection error or a timeout), or that
+    takes longer than ``latency_target``, multiplies it by ``decrease``, down
+    to ``minimum``; requests already in flight when the limit was lowered do
+    not lower it again.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> concurrency = cpauto.AdaptiveConcurrency(initial=4, maximum=16)
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', concurrency=concurrency)
+      >>> concurrency.limit
+      4
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=32, latency_target=2.0, increase=1.0, decrease=0.5,
+                 clock=time.time):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease = decrease
+        self.__clock = clock
+        self.__cond = threading.Condition()
+        self.__limit = float(min(max(initial, minimum), maximum))
+        self.__in_flight = 0
+        self.__last_decrease = None
+
+    @property
+    def limit(self):
+        """The number of requests currently allowed in flight."""
+        return max(self.minimum, int(self.__limit))
+
+    @property
+    def in_flight(self):
+        """The number of requests currently in flight."""
+        return self.__in_flight
+
+    def acquire(self):
+        """Waits for a free slot and takes it.
+
+        :returns: The time the slot was taken, to be passed back to release().
+        """
+        with self.__cond:
+            while self.__in_flight >= self.limit:
+                self.__cond.wait()
+            self.__in_flight += 1
+            return self.__clock()
+
+    def release(self, started, healthy=True):
+        """Gives back a slot and adapts the limit to how the request went.
+
+        :param started: The time returned by acquire().
+        :param healthy: (optional) False when the request failed because the
+            server is struggling.
+        """
+        with self.__cond:
+            now = self.__clock()
+            self.__in_flight -= 1
+            if not healthy or now - started > self.latency_target:
+                if self.__last_decrease is None or started > self.__last_decrease:
+                    self.__limit = max(float(self.minimum), self.__limit * self.decrease)
+                    self.__last_decrease = now
+            else:
+                self.__limit = min(float(self.maximum), self.__limit + self.increase / self.__limit)
+            self.__cond.notify_all()
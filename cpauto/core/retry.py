@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# cpauto.core.retry
+# ~~~~~~~~~~~~~~~~~
+
+"""This module contains the policy used to retry requests that failed for
+transient reasons, such as an overloaded management server."""
+
+from .polling import PollingStrategy
+
+from requests.packages.urllib3.exceptions import NewConnectionError
+
+import requests
+
+REJECTED_STATUSES = (429, 503)
+"""HTTP statuses telling that the server turned the request away unprocessed."""
+
+FAILED_STATUSES = (500, 502, 504)
+"""HTTP statuses telling that the request may or may not have been processed."""
+
+RETRY_CODES = ('err_too_many_requests', 'generic_err_too_many_requests', 'err_server_busy',
+               'generic_err_server_busy')
+"""API error codes telling that the server was too busy to process the request."""
+
+RETRY_MESSAGES = ('too many requests', 'server is busy', 'server busy')
+"""Fragments of API error messages telling the same, for errors without a code."""
+
+IDEMPOTENT_PREFIXES = ('show-', 'set-', 'delete-')
+"""Endpoints that can be repeated without changing the outcome."""
+
+IDEMPOTENT_ENDPOINTS = ('login', 'keepalive', 'logout', 'discard', 'verify-policy')
+
+DEFAULT_RETRY_BACKOFF = PollingStrategy(initial_delay=0.5, multiplier=2.0, max_delay=10.0, jitter=0.5)
+"""The backoff between attempts for policies without a more specific one."""
+
+class RetryPolicy:
+    """Decides whether and when a failed request is sent again.
+
+    Requests the server turned away unprocessed (HTTP 429 or 503, a busy or
+    too many requests API error, or a connection that could not be made
+    because it was refused, timed out or the name did not resolve) are
+    retried for every endpoint. Requests whose outcome is unknown (other 5xx
+    statuses, dropped connections and read timeouts) are only retried for
+    idempotent endpoints such as show-*, set-* and delete-*, so that add-*,
+    publish and install-policy are never sent twice by accident, unless
+    ``retry_non_idempotent`` is true.
+
+    At most ``max_attempts`` attempts are made per call. The delays between
+    attempts come from ``backoff``, a :class:`PollingStrategy`, but a
+    Retry-After header sent by the server takes precedence.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> retry = cpauto.RetryPolicy(max_attempts=5)
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', retry=retry)
+    """
+
+    def __init__(self, max_attempts=3, backoff=None, retry_codes=RETRY_CODES, retry_non_idempotent=False):
+        self.max_attempts = max_attempts
+        self.backoff = backoff if backoff is not None else DEFAULT_RETRY_BACKOFF
+        self.retry_codes = retry_codes
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def is_idempotent(self, endpoint):
+        """Returns true when sending a request to endpoint twice has the same
+        effect as sending it once.
+
+        :param endpoint: The API endpoint (e.g. add-host).
+        :rtype: bool
+        """
+        return endpoint.startswith(IDEMPOTENT_PREFIXES) or endpoint in IDEMPOTENT_ENDPOINTS
+
+    def is_rejected(self, status_code=None, data=None, error=None):
+        """Returns true when the failure shows that the request was not processed.
+
+        :param status_code: (optional) The HTTP status of the response.
+        :param data: (optional) The decoded body of the response.
+        :param error: (optional) The requests exception raised instead of a response.
+        :rtype: bool
+        """
+        if error is not None:
+            return _not_connected(error)
+        if status_code in REJECTED_STATUSES:
+            return True
+        if isinstance(data, dict):
+            if data.get('code') in self.retry_codes:
+                return True
+            message = str(data.get('message', '')).lower()
+            return any(fragment in message for fragment in RETRY_MESSAGES)
+        return False
+
+    def is_transient(self, status_code=None, data=None, error=None):
+        """Returns true when the failure may go away if the request is sent again.
+
+        :param status_code: (optional) The HTTP status of the response.
+        :param data: (optional) The decoded body of the response.
+        :param error: (optional) The requests exception raised instead of a response.
+        :rtype: bool
+        """
+        if error is not None:
+            if isinstance(error, requests.exceptions.SSLError):
+                return False
+            return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        return status_code in FAILED_STATUSES or self.is_rejected(status_code, data)
+
+    def should_retry(self, endpoint, attempt, status_code=None, data=None, error=None):
+        """Returns true when a request that just failed should be sent again.
+
+        :param endpoint: The API endpoint (e.g. add-host).
+        :param attempt: The number of attempts made so far, starting at 1.
+        :param status_code: (optional) The HTTP status of the response.
+        :param data: (optional) The decoded body of the response.
+        :param error: (optional) The requests exception raised instead of a response.
+        :rtype: bool
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if not self.is_transient(status_code, data, error):
+            return False
+        return (self.retry_non_idempotent or self.is_rejected(status_code, data, error)
+                or self.is_idempotent(endpoint))
+
+    def delays(self):
+        """Generates the successive delays (in seconds) to wait between attempts."""
+        return self.backoff.delays()
+
+def _not_connected(error):
+    # true when the error, or one it was raised from, shows that no
+    # connection was made: refused connections and failed name lookups are
+    # raised by requests as a ConnectionError wrapping urllib3's
+    # MaxRetryError, whose reason is a NewConnectionError
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (requests.exceptions.ConnectTimeout, NewConnectionError)):
+            return True
+        reason = getattr(error, 'reason', None)
+        if isinstance(reason, BaseException):
+            error = reason
+        elif error.args and isinstance(error.args[0], BaseException):
+            error = error.args[0]
+        else:
+            error = getattr(error, '__cause__', None)
+    return False
+
+def _retry_after(response):
+    # the delay asked for by a Retry-After header in seconds, or None; the
+    # HTTP date form is not used by the management server and is ignored
+    if response is None:
+        return None
+    try:
+        return max(0.0, float(response.headers.get('retry-after')))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.scheduler
+# ~~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains the scheduler a core client uses to order its
+requests by priority and to bound the number it has in flight."""
+
+from .exceptions import SchedulerFull
+
+from collections import deque
+from contextlib import contextmanager
+
+import threading
+
+LANES = ('interactive', 'polling', 'bulk')
+"""The priority classes of requests, highest first."""
+
+INTERACTIVE_PREFIXES = ('show-',)
+INTERACTIVE_ENDPOINTS = ('login', 'logout', 'keepalive', 'publish', 'discard')
+
+_RESERVED = object()
+
+class RequestScheduler:
+    """Bounds the number of requests a core client has in flight and lets
+    the most urgent ones go first.
+
+    Requests are put in one of three lanes. Reads and session calls go in
+    ``interactive``, show-task calls made while waiting on tasks go in
+    ``polling`` and every other call (add-*, set-*, delete-* and so on) goes
+    in ``bulk``. Use :meth:`lane` to put a thread's requests in a specific
+    lane. At most ``max_in_flight`` requests are sent at once; free slots go
+    to the interactive lane first, then polling, then bulk, and requests of a
+    lane go in arrival order. ``polling_slots`` extra slots are reserved for
+    polls, so a busy client still notices finished tasks.
+
+    Each lane holds at most ``max_queued`` waiting requests. When a lane is
+    full, further callers wait for room, or get :class:`SchedulerFull` right
+    away when ``block`` is false.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> scheduler = cpauto.RequestScheduler(max_in_flight=8)
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', scheduler=scheduler)
+      >>> with scheduler.lane('bulk'):
+      ...     r = cpauto.Host(cc).show(name='h')
+    """
+
+    def __init__(self, max_in_flight=8, max_queued=1000, polling_slots=1, block=True):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.polling_slots = polling_slots
+        self.block = block
+        self.__cond = threading.Condition()
+        self.__queues = dict((name, deque()) for name in LANES)
+        self.__in_flight = 0
+        self.__polls_in_flight = 0
+        self.__local = threading.local()
+
+    @property
+    def in_flight(self):
+        """The number of requests currently in flight."""
+        return self.__in_flight
+
+    def queued(self, lane):
+        """Returns the number of requests waiting in a lane.
+
+        :rtype: int
+        """
+        return len(self.__queues[lane])
+
+    @contextmanager
+    def lane(self, name):
+        """Puts the requests made by the current thread in the named lane,
+        whatever their endpoint.
+
+        :param name: interactive, polling or bulk.
+        """
+        if name not in LANES:
+            raise ValueError("Unknown request lane: " + str(name))
+        previous = getattr(self.__local, 'lane', None)
+        self.__local.lane = name
+        try:
+            yield
+        finally:
+            self.__local.lane = previous
+
+    def lane_for(self, endpoint):
+        """Returns the lane for a request to endpoint from the current thread.
+
+        :rtype: str
+        """
+        name = getattr(self.__local, 'lane', None)
+        if name is not None:
+            return name
+        if endpoint == 'show-task':
+            return 'polling'
+        if endpoint.startswith(INTERACTIVE_PREFIXES) or endpoint in INTERACTIVE_ENDPOINTS:
+            return 'interactive'
+        return 'bulk'
+
+    def __may_start(self, lane, ticket):
+        if self.__queues[lane][0] is not ticket:
+            return False
+        if lane == 'polling' and self.__polls_in_flight < self.polling_slots:
+            return True
+        if self.__in_flight >= self.max_in_flight:
+            return False
+        for name in LANES:
+            if name == lane:
+                return True
+            if self.__queues[name]:
+                return False
+
+    def acquire(self, lane):
+        """Waits for the turn of a request in a lane and takes a slot.
+
+        :param lane: interactive, polling or bulk.
+        :raises SchedulerFull: The lane is full and the scheduler does not block.
+        :returns: A token to pass back to release().
+        """
+        queue = self.__queues[lane]
+        ticket = object()
+        with self.__cond:
+            while len(queue) >= self.max_queued:
+                if not self.block:
+                    raise SchedulerFull("Too many requests waiting in the " + lane + " lane")
+                self.__cond.wait()
+            queue.append(ticket)
+            try:
+                while not self.__may_start(lane, ticket):
+                    self.__cond.wait()
+            finally:
+                queue.remove(ticket)
+            if lane == 'polling' and self.__polls_in_flight < self.polling_slots:
+                self.__polls_in_flight += 1
+                token = _RESERVED
+            else:
+                self.__in_flight += 1
+                token = lane
+            self.__cond.notify_all()
+        return token
+
+    def release(self, token):
+        """Gives back the slot taken by acquire().
+
+        :param token: The token returned by acquire().
+        """
+        with self.__cond:
+            if token is _RESERVED:
+                self.__polls_in_flight -= 1
+            else:
+                self.__in_flight -= 1
+            self.__cond.notify_all()
+
+    @contextmanager
+    def slot(self, endpoint):
+        """Holds a slot for a request to endpoint while the block runs.
+
+        :param endpoint: The API endpoint (e.g. add-host).
+        """
+        token = self.acquire(self.lane_for(endpoint))
+        try:
+            yield
+        finally:
+            self.release(token)
@@ -21,7 +21,6 @@
 
 from .exceptions import (
     CoreClientError,
-    WaitOnTaskError,
     ConnectionError,
     HTTPError,
     SSLError,
@@ -30,22 +29,79 @@ from .exceptions import (
     InvalidURL
 )
 
+from .cache import READ_ONLY_ENDPOINTS
+from .jsoncodec import DEFAULT_CODEC
+from .metrics import ClientMetrics
+from .polling import polling_strategy_for
+from .retry import _retry_after
+from .singleflight import SingleFlight, request_key
+from .streaming import iter_json_items
+from .tasks import TaskHandle, TaskPoller, _task_ids
+
 from ..objects._common import _CommonClient
 
+from contextlib import contextmanager
+
+import copy
+import threading
 import time
 
+try:
+    from types import MappingProxyType as _read_only
+except ImportError:
+    # Python 2 has no read-only mapping view; json() hands out shallow copies
+    _read_only = None
+
+_TASK_ID_MARKER = b'"task-id"'
+
 import requests
 
-class CoreClientResult:
+from requests.adapters import HTTPAdapter
+
+@contextmanager
+def _requests_errors():
+    # translates requests exceptions into cpauto exceptions
+    try:
+        yield
+    except requests.exceptions.SSLError as e:
+        raise SSLError('SSL error: ' + str(e))
+    except requests.exceptions.ConnectionError as e:
+        raise ConnectionError('Connection error: ' + str(e))
+    except requests.exceptions.HTTPError as e:
+        raise HTTPError('HTTP error: ' + str(e))
+    except requests.exceptions.Timeout as e:
+        raise Timeout(str(e))
+    except requests.exceptions.TooManyRedirects as e:
+        raise TooManyRedirects(str(e))
+    except requests.exceptions.InvalidURL as e:
+        raise InvalidURL(str(e))
+
+_BASE_HEADERS = { 'content-type': 'application/json', 'user-agent': 'cpauto-CoreClient/0.0.5' }
+
+class CoreClientResult(object):
     """Stores the status code and JSON body
     received in an HTTP response to an API request.
 
+    The body is kept as the raw bytes received and only decoded, with the
+    core client's codec, the first time it is needed; the raw bytes are then
+    let go. json() returns a read-only view of the decoded body rather than
+    a copy (a shallow copy on Python 2, which has no read-only views); use
+    json_copy() for a dictionary that can be changed.
+
+    When the request started asynchronous tasks that the core client does
+    not wait for, ``task`` is a :class:`TaskHandle` following them.
     """
-    def __init__(self, status_code, json):
+    __slots__ = ('status_code', 'success', 'message', 'task', '__raw', '__json', '__view', '__loads')
+
+    def __init__(self, status_code, json=None, raw=None, loads=DEFAULT_CODEC.loads):
         self.status_code = status_code
         self.success = status_code == 200
         self.message = ""
+        self.task = None
+        self.__raw = raw
         self.__json = json
+        self.__view = None
+        self.__loads = loads
 
     def set_success(self, value=True):
         self.success = value
@@ -53,13 +109,61 @@ class CoreClientResult:
     def set_message(self, value=""):
         self.message = value
 
+    def __decoded(self):
+        if self.__json is None and self.__raw is not None:
+            self.__json = self.__loads(self.__raw)
+            self.__raw = None
+        return self.__json
+
     def json(self):
-        return dict(self.__json)
+        """Returns a read-only view of the decoded JSON body.
+
+        Only the top level is read-only; nested values are shared with the
+        result and must not be changed.
+        """
+        if _read_only is None:
+            return dict(self.__decoded())
+        if self.__view is None:
+            self.__view = _read_only(self.__decoded())
+        return self.__view
+
+    def json_copy(self):
+        """Returns a deep, mutable copy of the decoded JSON body.
+
+        :rtype: dict
+        """
+        if self.__raw is not None:
+            return self.__loads(self.__raw)
+        return copy.deepcopy(self.__decoded())
+
+    @property
+    def raw(self):
+        """The raw bytes of the body, or None once it was decoded or when the
+        result was built from an already decoded body."""
+        return self.__raw
 
 class CoreClient:
     """The cpauto core client.
 
-    Provides basic configuration and persistence.
+    Provides basic configuration and persistence. HTTP connections to the
+    management server are kept alive and reused across API calls; use
+    ``pool_size`` to set the maximum number of pooled connections and
+    ``pool_block`` to make callers wait for a free connection instead of
+    opening extra, unpooled ones. ``polling`` takes a :class:`PollingStrategy`,
+    or a dictionary of endpoint names to strategies, controlling how tasks
+    are polled. When ``wait_for_tasks`` is false, results of calls that start
+    tasks carry a :class:`TaskHandle` in their ``task`` attribute. ``codec``
+    takes a :class:`JSONCodec` used to encode requests and decode responses.
+    ``retry`` takes a :class:`RetryPolicy` deciding which transient failures
+    are retried; by default none are. Requests and retries are counted in
+    ``metrics``, a :class:`ClientMetrics`. ``rate_limit`` takes a
+    :class:`RateLimiter` and ``concurrency`` an :class:`AdaptiveConcurrency`,
+    limiting the requests of the client and of every object using it.
+    ``scheduler`` takes a :class:`RequestScheduler` bounding the requests in
+    flight and letting interactive calls and task polls overtake bulk ones.
+    ``cache`` takes an :class:`ObjectCache` answering repeated show calls.
+    Identical show calls made at the same time share a single request unless
+    ``single_flight`` is false.
 
     Basic Usage::
       >>> import cpauto
@@ -69,71 +173,153 @@ class CoreClient:
       200
     """
 
-    def __init__(self, user='', password='', mgmt_server='', port=443, verify=True, wait_for_tasks=True):
+    def __init__(self, user='', password='', mgmt_server='', port=443, verify=True, wait_for_tasks=True,
+                 pool_size=10, pool_block=False, polling=None, codec=None, retry=None,
+                 rate_limit=None, concurrency=None, scheduler=None,
+                 cache=None, single_flight=True):
         self.__last_login_result = None
+        self.__set_sid(None)
         self.__user = user
         self.__password = password
         self.__mgmt_server = mgmt_server
         self.__port = port
         self.__verify = verify
         self.__wait_for_tasks = wait_for_tasks
+        self.__pool_size = pool_size
+        self.__pool_block = pool_block
+        self.__polling = polling
+        self.__codec = codec if codec is not None else DEFAULT_CODEC
+        self.__retry = retry
+        self.__rate_limit = rate_limit
+        self.__concurrency = concurrency
+        self.__scheduler = scheduler
+        self.__cache = cache
+        self.__single_flight = SingleFlight() if single_flight else None
+        self.__writes = 0
+        self.metrics = ClientMetrics()
+        self.__http_session = None
+        self.__task_poller = None
+        self.__lock = threading.Lock()
+        self.__base_uri = 'https://' + mgmt_server + ':' + str(port) + '/web_api/'
+        self.__uris = {}
+
+    @property
+    def cache(self):
+        """The :class:`ObjectCache` of the client, or None."""
+        return self.__cache
+
+    def __get_http_session(self):
+        # connections to the management server are pooled and kept alive
+        # across calls; the pool is built lazily, once however many threads
+        # ask for it, and torn down on logout
+        http_session = self.__http_session
+        if http_session is not None:
+            return http_session
+        with self.__lock:
+            if self.__http_session is None:
+                adapter = HTTPAdapter(pool_connections=1,
+                    pool_maxsize=self.__pool_size, pool_block=self.__pool_block)
+                http_session = requests.Session()
+                http_session.mount('https://', adapter)
+                self.__http_session = http_session
+            return self.__http_session
 
     def __build_uri(self, endpoint):
-        uri = 'https://' + self.__mgmt_server + ':' + str(self.__port) + '/web_api/' + endpoint
+        uri = self.__uris.get(endpoint)
+        if uri is None:
+            uri = self.__uris[endpoint] = self.__base_uri + endpoint
         return uri
 
     def __build_headers(self, send_sid=True):
-        headers = { 'content-type': 'application/json', 'user-agent': 'cpauto-CoreClient/0.0.5' }
-        if send_sid and self.__last_login_result is not None:
-            last_login_json = self.__last_login_result.json()
-            headers['x-chkp-sid'] = last_login_json['sid']
-        return headers
-
-    def __wait_on_task(self, task_id):
-        task_complete = False
-        task_r = None
-
-        while not task_complete:
-            task_r = self.http_post(endpoint="show-task", payload={"task-id": task_id, "details-level": "full"})
-
-            while task_r.status_code == 404:
-                time.sleep(1)
-                task_r = self.http_post(endpoint="show-task", payload={"task-id": task_id, "details-level": "full"})
-
-            if task_r.status_code != 200:
-                raise WaitOnTaskError("Failed to handle asynchronous task as synchronous")
-
-            data = task_r.json()
-            completed_tasks = sum(1 for task in data["tasks"] if task["status"] != "in progress")
-            total_tasks = len(data["tasks"])
-
-            if completed_tasks == total_tasks:
-                task_complete = True
+        # the returned headers are shared between calls and must not be changed
+        if send_sid:
+            return self.__sid_headers
+        return _BASE_HEADERS
+
+    def __set_sid(self, sid):
+        self.__sid = sid
+        headers = _BASE_HEADERS
+        if sid is not None:
+            headers = dict(_BASE_HEADERS)
+            headers['x-chkp-sid'] = sid
+        self.__sid_headers = headers
+
+    def __wait_on_tasks(self, task_ids, strategy):
+        # blocking waits are served by the shared poller, so concurrent
+        # callers cost one show-task request per tick between them
+        handle = TaskHandle(task_ids, strategy, self.__get_task_poller())
+        return handle.result()
+
+    def __send(self, endpoint, uri, headers, data, stream):
+        # sends a single request in its scheduler lane, within the rate and
+        # concurrency limits
+        if self.__scheduler is None:
+            return self.__limited_send(uri, headers, data, stream)
+        with self.__scheduler.slot(endpoint):
+            return self.__limited_send(uri, headers, data, stream)
+
+    def __limited_send(self, uri, headers, data, stream):
+        if self.__rate_limit is not None and self.__rate_limit.acquire():
+            self.metrics.increment('throttled')
+        concurrency = self.__concurrency
+        if concurrency is None:
+            return self.__get_http_session().post(uri, headers=headers, data=data, verify=self.__verify,
+                                                  stream=stream)
+        started = concurrency.acquire()
+        healthy = True
+        try:
+            r = self.__get_http_session().post(uri, headers=headers, data=data, verify=self.__verify,
+                                               stream=stream)
+            healthy = r.status_code != 429 and r.status_code < 500
+            return r
+        except requests.exceptions.RequestException as e:
+            healthy = not isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+            raise
+        finally:
+            concurrency.release(started, healthy)
+
+    def __post(self, endpoint, send_sid, payload, stream=False):
+        # sends the request, and again for as long as the retry policy allows
+        uri = self.__build_uri(endpoint)
+        headers = self.__build_headers(send_sid)
+        data = self.__codec.dumps(payload)
+        retry = self.__retry
+        delays = None
+        attempt = 1
+        while True:
+            self.metrics.increment('requests')
+            error = None
+            try:
+                r = self.__send(endpoint, uri, headers, data, stream)
+            except requests.exceptions.RequestException as e:
+                if retry is None or not retry.should_retry(endpoint, attempt, error=e):
+                    raise
+                error = e
+                r = None
             else:
-                time.sleep(2)
-
-        self.__check_task_result(task_r)
-        return task_r
-
-    def __wait_on_tasks(self, task_objects):
-        tasks = []
-        for task_object in task_objects:
-            task_id = task_object["task-id"]
-            tasks.append(task_id)
-            self.__wait_on_task(task_id)
-
-        task_r = self.http_post(endpoint="show-task", payload={"task-id": tasks, "details-level": "full"})
-
-        self.__check_task_result(task_r)
-        return task_r
-
-    def __check_task_result(self, task_result):
-        data = task_result.json()
-        for task in data["tasks"]:
-            if task["status"] == "failed" or task["status"] == "partially succeeded":
-                task_result.set_success(False)
-                task_result.set_message("There was at least one task that failed or partially succeeded")
-                break
+                if retry is None or r.status_code == 200:
+                    return r
+                try:
+                    error_data = self.__codec.loads(r.content)
+                except ValueError:
+                    error_data = None
+                if not retry.should_retry(endpoint, attempt, r.status_code, error_data):
+                    return r
+            if delays is None:
+                delays = retry.delays()
+            delay = next(delays, None)
+            if delay is None:
+                # the backoff deadline has passed; report the last failure
+                if error is not None:
+                    raise error
+                return r
+            retry_after = _retry_after(r)
+            if retry_after is not None:
+                delay = retry_after
+            self.metrics.increment('retries')
+            self.metrics.increment('retries.' + endpoint)
+            time.sleep(delay)
+            attempt += 1
 
     def http_post(self, endpoint, send_sid=True, payload={}):
         """Makes an HTTP post to the specified API endpoint using user supplied data.
@@ -144,30 +330,84 @@ class CoreClient:
             as JSON in the body of the request.
         :rtype: CoreClientResult
         """
-        uri = self.__build_uri(endpoint)
-        headers = self.__build_headers(send_sid)
-        try:
-            r = requests.post(uri, headers=headers, json=payload, verify=self.__verify)
+        cache = self.__cache
+        if cache is not None:
+            result = cache.get(endpoint, payload)
+            if result is not None:
+                self.metrics.increment('cache.hits')
+                return result
+            generation = cache.generation(endpoint)
+        if self.__single_flight is not None and endpoint.startswith('show-'):
+            # identical reads in flight at the same time share one response,
+            # unless a write completed since the first of them was sent
+            key = request_key(endpoint, payload, send_sid, self.__sid, self.__writes)
+            result, shared = self.__single_flight.do(key, lambda: self.__http_post(endpoint, send_sid, payload))
+            if shared:
+                self.metrics.increment('single_flight.shared')
+        else:
+            try:
+                result = self.__http_post(endpoint, send_sid, payload)
+            finally:
+                if endpoint not in READ_ONLY_ENDPOINTS:
+                    with self.__lock:
+                        self.__writes += 1
+        if cache is None:
+            return result
+        cache.invalidate(endpoint, payload)
+        cache.put(endpoint, payload, result, generation)
+        return result
+
+    def __http_post(self, endpoint, send_sid, payload):
+        task_ids = None
+        with _requests_errors():
+            r = self.__post(endpoint, send_sid, payload)
+            result = CoreClientResult(r.status_code, raw=r.content, loads=self.__codec.loads)
+            # only bodies naming a task are decoded here, the others are left
+            # to be decoded when, and if, they are used
+            if r.status_code == 200 and endpoint != "show-task" and _TASK_ID_MARKER in r.content:
+                task_ids = _task_ids(result.json())
             # wait for tasks if needed
-            if self.__wait_for_tasks and r.status_code == 200 and endpoint != "show-task":
-                data = r.json()
-                if "task-id" in data:
-                    return self.__wait_on_task(data["task-id"])
-                elif "tasks" in data:
-                    return self.__wait_on_tasks(data["tasks"])
-        except requests.exceptions.SSLError as e:
-            raise SSLError('SSL error: ' + str(e))
-        except requests.exceptions.ConnectionError as e:
-            raise ConnectionError('Connection error: ' + str(e))
-        except requests.exceptions.HTTPError as e:
-            raise HTTPError('HTTP error: ' + str(e))
-        except requests.exceptions.Timeout as e:
-            raise Timeout(str(e))
-        except requests.exceptions.TooManyRedirects as e:
-            raise TooManyRedirects(str(e))
-        except requests.exceptions.InvalidURL as e:
-            raise InvalidURL(str(e))
-        return CoreClientResult(r.status_code, r.json())
+            if self.__wait_for_tasks and task_ids:
+                strategy = polling_strategy_for(endpoint, self.__polling)
+                return self.__wait_on_tasks(task_ids, strategy)
+        if task_ids:
+            strategy = polling_strategy_for(endpoint, self.__polling)
+            result.task = TaskHandle(task_ids, strategy, self.__get_task_poller())
+        return result
+
+    def http_post_stream(self, endpoint, keys, send_sid=True, payload={}, chunk_size=65536):
+        """Makes an HTTP post to the specified API endpoint and decodes the
+        response incrementally, as it is read from the socket.
+
+        Only the elements of the top-level arrays named in keys are decoded,
+        one at a time, so memory use stays bounded however large the response
+        is. Tasks are never waited for.
+
+        :param endpoint: The API endpoint (e.g. show-access-rulebase).
+        :param keys: The names of the top-level arrays to decode (e.g. rulebase).
+        :param send_sid: Send the session ID as a header when true.
+        :param payload: The payload (dictionary) that will be included
+            as JSON in the body of the request.
+        :param chunk_size: (optional) The number of bytes read at a time.
+        :raises CoreClientError: The API request failed.
+        :returns: A generator of (key, element) tuples.
+        """
+        with _requests_errors():
+            r = self.__post(endpoint, send_sid, payload, stream=True)
+            try:
+                if r.status_code != 200:
+                    message = self.__codec.loads(r.content).get('message', 'Failed to post to ' + endpoint)
+                    raise CoreClientError(message, http_status_code=r.status_code)
+                for item in iter_json_items(r.iter_content(chunk_size), keys, loads=self.__codec.loads):
+                    yield item
+            finally:
+                r.close()
+
+    def __get_task_poller(self):
+        with self.__lock:
+            if self.__task_poller is None:
+                self.__task_poller = TaskPoller(self)
+            return self.__task_poller
 
     def merge_payloads(self, payload_a, payload_b):
         """Merges the contents of two payloads (dictionaries).
@@ -195,6 +435,7 @@ class CoreClient:
             payload = self.merge_payloads(payload, params)
         r = self.http_post('login', send_sid=False, payload=payload)
         self.__last_login_result = r
+        self.__set_sid(r.json().get('sid'))
         return r
 
     def logout(self):
@@ -204,7 +445,20 @@ class CoreClient:
 
         :rtype: CoreClientResult
         """
-        return self.http_post('logout')
+        try:
+            return self.http_post('logout')
+        finally:
+            self.close()
+
+    def close(self):
+        """Closes all pooled connections to the management server.
+
+        The client remains usable; a new pool is created on the next request.
+        """
+        with self.__lock:
+            http_session, self.__http_session = self.__http_session, None
+        if http_session is not None:
+            http_session.close()
 
     def publish(self, uid=""):
         """Makes all changes made visible to other users.
@@ -316,6 +570,44 @@ class Session:
         return self.__common_client._show_all('show-sessions', limit=limit,
             offset=offset, order=order, details_level=details_level)
 
+    def iter_all(self, order=[], details_level='', limit=500, concurrency=1):
+        """Iterates over all sessions, fetching them page by page as needed.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-sessions
+
+        :param order: (optional) Sort the results by the specified field. The
+            default is a random order.
+        :param details_level: (optional) The level of detail to show. Default
+            value is 'standard' and the other options are: 'uid' or 'full'
+        :param limit: (optional) The number of sessions fetched per page.
+            The default value is 500, the maximum allowed.
+        :param concurrency: (optional) The number of pages fetched at once
+            after the first one. Default is 1, fetching pages one by one.
+        :raises CoreClientError: A page could not be fetched.
+        :rtype: generator of dictionaries
+        """
+        return self.__common_client._iter_all('show-sessions', order=order,
+            details_level=details_level, limit=limit, concurrency=concurrency)
+
+    def fetch_all(self, order=[], details_level='', limit=500, concurrency=1):
+        """Fetches all sessions, page by page, into a single list.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-sessions
+
+        :param order: (optional) Sort the results by the specified field. The
+            default is a random order.
+        :param details_level: (optional) The level of detail to show. Default
+            value is 'standard' and the other options are: 'uid' or 'full'
+        :param limit: (optional) The number of sessions fetched per page.
+            The default value is 500, the maximum allowed.
+        :param concurrency: (optional) The number of pages fetched at once
+            after the first one. Default is 1, fetching pages one by one.
+        :raises CoreClientError: A page could not be fetched.
+        :rtype: list of dictionaries
+        """
+        return list(self.iter_all(order=order, details_level=details_level, limit=limit,
+            concurrency=concurrency))
+
 class LoginMessage:
     """Manage login message."""
 
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.singleflight
+# ~~~~~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains the object a core client uses to share one response
+among identical requests made at the same time."""
+
+import json
+import threading
+
+def request_key(endpoint, payload, *extra):
+    """Returns a key identifying a request by its endpoint and payload,
+    whatever the order of the payload members.
+
+    :param endpoint: The API endpoint (e.g. show-package).
+    :param payload: The payload of the request.
+    :param extra: (optional) Further values the response depends on.
+    """
+    return (endpoint, json.dumps(payload, sort_keys=True)) + extra
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Runs a function once for every group of concurrent callers asking for
+    the same key, and hands its outcome to all of them.
+
+    Basic Usage::
+      >>> flight = SingleFlight()
+      >>> result, shared = flight.do(request_key('show-package', {'name': 'standard'}), fetch)
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__calls = {}
+
+    def do(self, key, fn):
+        """Calls fn, unless a call for the same key is already running, in
+        which case its outcome is waited for and shared instead.
+
+        :param key: A hashable key identifying the call.
+        :param fn: A function taking no arguments.
+        :returns: A tuple of the result and whether it was shared.
+        """
+        with self.__lock:
+            call = self.__calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.__calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+            call.done.set()
+        return call.result, False
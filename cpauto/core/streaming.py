@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.streaming
+# ~~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains an incremental decoder for very large JSON responses.
+
+Only the elements of the requested top-level arrays are decoded, one at a
+time, so peak memory is bounded by the largest single element rather than
+by the size of the response.
+"""
+
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r'[^ \t\r\n]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_STRUCT_SPECIAL = re.compile(r'["{}\[\]]')
+_SCALAR_END = re.compile(r'[,}\] \t\r\n]')
+
+class _Stream:
+    """A text buffer refilled from an iterable of chunks as it is consumed."""
+
+    def __init__(self, chunks):
+        self.__chunks = iter(chunks)
+        self.__decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+
+    def fill(self, keep_from):
+        # drops everything before keep_from and appends the next chunk;
+        # returns false at the end of the input
+        for chunk in self.__chunks:
+            if isinstance(chunk, bytes):
+                chunk = self.__decoder.decode(chunk)
+            if chunk:
+                self.buf = self.buf[keep_from:] + chunk
+                self.pos -= keep_from
+                return True
+        return False
+
+    def next_char(self):
+        # consumes and returns the next non-whitespace character
+        while True:
+            m = _WHITESPACE.search(self.buf, self.pos)
+            if m is not None:
+                self.pos = m.end()
+                return m.group()
+            self.pos = len(self.buf)
+            if not self.fill(self.pos):
+                raise ValueError("Unexpected end of JSON input")
+
+    def peek_char(self):
+        c = self.next_char()
+        self.pos -= 1
+        return c
+
+    def expect(self, expected):
+        c = self.next_char()
+        if c != expected:
+            raise ValueError("Expected '{0}' but found '{1}' in JSON input".format(expected, c))
+
+    def read_value(self, keep=True):
+        """Consumes the next JSON value and returns its text, or None when
+        keep is false (the skipped text is then not accumulated)."""
+        self.peek_char()
+        parts = []
+        start = i = self.pos
+        depth = 0
+        in_string = False
+        scalar = False
+        first = self.buf[i]
+        if first == '"':
+            in_string = True
+            i += 1
+        elif first in '{[':
+            depth = 1
+            i += 1
+        else:
+            scalar = True
+
+        while True:
+            buf = self.buf
+            end = None
+            while end is None:
+                if scalar:
+                    m = _SCALAR_END.search(buf, i)
+                    if m is None:
+                        i = len(buf)
+                        break
+                    end = m.start()
+                elif in_string:
+                    m = _STRING_SPECIAL.search(buf, i)
+                    if m is None:
+                        i = len(buf)
+                        break
+                    if m.group() == '\\':
+                        if m.end() >= len(buf):
+                            # the escaped character is in the next chunk
+                            i = m.start()
+                            break
+                        i = m.end() + 1
+                    else:
+                        in_string = False
+                        i = m.end()
+                        if depth == 0:
+                            end = i
+                else:
+                    m = _STRUCT_SPECIAL.search(buf, i)
+                    if m is None:
+                        i = len(buf)
+                        break
+                    c = m.group()
+                    i = m.end()
+                    if c == '"':
+                        in_string = True
+                    elif c in '{[':
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 0:
+                            end = i
+            if end is not None:
+                if keep:
+                    parts.append(buf[start:end])
+                self.pos = end
+                return ''.join(parts) if keep else None
+            if keep:
+                parts.append(buf[start:i])
+            if not self.fill(i):
+                if scalar:
+                    # a scalar may run up to the end of the input
+                    if keep:
+                        self.pos = len(self.buf)
+                        return ''.join(parts)
+                    return None
+                raise ValueError("Unexpected end of JSON input")
+            start = i = 0
+
+def iter_json_items(chunks, keys, loads=json.loads):
+    """Incrementally decodes a JSON object and yields the elements of its
+    top-level arrays named in keys, one at a time. Every other member of the
+    object is skipped without being decoded.
+
+    :param chunks: An iterable of bytes (UTF-8) or text chunks, e.g. from
+        requests' Response.iter_content().
+    :param keys: The names of the top-level arrays to decode.
+    :param loads: (optional) The function used to decode each element.
+    :returns: A generator of (key, element) tuples.
+    """
+    stream = _Stream(chunks)
+    stream.expect('{')
+    if stream.peek_char() == '}':
+        return
+    while True:
+        key = json.loads(stream.read_value())
+        stream.expect(':')
+        if key in keys and stream.peek_char() == '[':
+            stream.expect('[')
+            if stream.peek_char() == ']':
+                stream.expect(']')
+            else:
+                while True:
+                    yield key, loads(stream.read_value())
+                    c = stream.next_char()
+                    if c == ']':
+                        break
+                    if c != ',':
+                        raise ValueError("Expected ',' or ']' but found '{0}' in JSON input".format(c))
+        else:
+            stream.read_value(keep=False)
+        c = stream.next_char()
+        if c == '}':
+            return
+        if c != ',':
+            raise ValueError("Expected ',' or '}}' but found '{0}' in JSON input".format(c))
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.tasks
+# ~~~~~~~~~~~~~~~~~
+
+"""This module contains the objects needed to follow asynchronous R80 Web API tasks."""
+
+from .exceptions import Timeout, WaitOnTaskError
+
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+def _task_ids(data):
+    if "task-id" in data:
+        return [data["task-id"]]
+    elif "tasks" in data:
+        return [task["task-id"] for task in data["tasks"]]
+    return []
+
+def _pending_task_ids(task_ids, data):
+    finished = set(task["task-id"] for task in data.get("tasks", [])
+                   if task.get("status") != "in progress")
+    return [task_id for task_id in task_ids if task_id not in finished]
+
+def _check_task_result(task_result):
+    data = task_result.json()
+    for task in data["tasks"]:
+        if task["status"] == "failed" or task["status"] == "partially succeeded":
+            task_result.set_success(False)
+            task_result.set_message("There was at least one task that failed or partially succeeded")
+            break
+
+class TaskHandle:
+    """A future for the asynchronous task or tasks started by an API call.
+
+    Handles are driven by the :class:`TaskPoller` shared by their core client,
+    which starts following them the first time they are used.
+
+    Basic Usage::
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', wait_for_tasks=False)
+      >>> r = cc.login()
+      >>> handle = cpauto.Policy(cc).install(targets='gw-2200').task
+      >>> handle.add_done_callback(lambda h: print(h.result().success))
+      >>> handle.progress()
+      25
+      >>> r = handle.result(timeout=600)
+      >>> r.json()
+      {u'tasks': [{u'task-id': u'01234567-89ab-cdef-8b0a-92e9635a47d3', u'status': u'succeeded', ...}]}
+    """
+
+    def __init__(self, task_ids, strategy, poller):
+        self.task_ids = list(task_ids)
+        self.__strategy = strategy
+        self.__poller = poller
+        self.__submitted = False
+        self.__lock = threading.Lock()
+        self.__done = threading.Event()
+        self.__result = None
+        self.__exception = None
+        self.__callbacks = []
+        self.__progress = dict((task_id, 0) for task_id in self.task_ids)
+        self._pending = list(self.task_ids)
+        self._delays = None
+        self._due = None
+
+    def __submit(self):
+        with self.__lock:
+            if self.__submitted:
+                return
+            self.__submitted = True
+        self.__poller.submit(self)
+
+    def done(self):
+        """Returns true once every task has finished and its details were fetched.
+
+        :rtype: bool
+        """
+        self.__submit()
+        return self.__done.is_set()
+
+    def result(self, timeout=None):
+        """Waits for the tasks to finish and returns their full details.
+
+        The result's ``success`` is false when at least one task failed or
+        partially succeeded.
+
+        :param timeout: (optional) The number of seconds to wait. Default is
+            to wait until the tasks finish or the polling deadline passes.
+        :raises Timeout: The timeout passed before the tasks finished.
+        :raises WaitOnTaskError: The tasks could not be followed to completion.
+        :rtype: CoreClientResult
+        """
+        self.__submit()
+        if not self.__done.wait(timeout):
+            raise Timeout("Timed out waiting on task or tasks")
+        if self.__exception is not None:
+            raise self.__exception
+        return self.__result
+
+    def exception(self, timeout=None):
+        """Waits for the tasks to finish and returns the error raised while
+        following them, or None.
+
+        :param timeout: (optional) The number of seconds to wait.
+        :raises Timeout: The timeout passed before the tasks finished.
+        """
+        self.__submit()
+        if not self.__done.wait(timeout):
+            raise Timeout("Timed out waiting on task or tasks")
+        return self.__exception
+
+    def progress(self):
+        """Returns the average progress of the tasks as a percentage.
+
+        :rtype: int
+        """
+        self.__submit()
+        if self.__done.is_set():
+            return 100
+        with self.__lock:
+            return int(sum(self.__progress.values()) / len(self.__progress))
+
+    def add_done_callback(self, fn):
+        """Calls fn with this handle, in the poller thread, once the tasks finish.
+
+        If they already have, fn is called right away.
+
+        :param fn: A callable that takes the handle as its only argument.
+        """
+        with self.__lock:
+            if not self.__done.is_set():
+                self.__callbacks.append(fn)
+                fn = None
+        if fn is not None:
+            fn(self)
+        self.__submit()
+
+    def _schedule(self, now):
+        # returns false once the polling deadline has passed
+        if self._delays is None:
+            self._delays = self.__strategy.delays()
+        delay = next(self._delays, None)
+        if delay is None:
+            return False
+        self._due = now + delay
+        return True
+
+    def _update(self, tasks_by_id):
+        with self.__lock:
+            for task_id in self._pending:
+                task = tasks_by_id.get(task_id)
+                if task is not None and "progress-percentage" in task:
+                    self.__progress[task_id] = task["progress-percentage"]
+        self._pending = _pending_task_ids(self._pending, {"tasks": list(tasks_by_id.values())})
+
+    def _finish(self, result=None, exception=None):
+        with self.__lock:
+            if self.__done.is_set():
+                return
+            self.__result = result
+            self.__exception = exception
+            self.__done.set()
+            callbacks, self.__callbacks = self.__callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:
+                log.exception("Exception raised by task done callback")
+
+class TaskPoller:
+    """Follows the outstanding tasks of every TaskHandle of a core client.
+
+    A single background thread polls the task IDs of all outstanding handles
+    with one show-task request per tick, then fetches the full details of
+    each handle once its tasks have finished. The thread stops when there is
+    nothing left to follow and is started again on demand.
+    """
+
+    def __init__(self, core_client, clock=time.time):
+        self.__cc = core_client
+        self.__clock = clock
+        self.__cond = threading.Condition()
+        self.__handles = []
+        self.__thread = None
+
+    def submit(self, handle):
+        """Starts following a handle.
+
+        :param handle: A TaskHandle.
+        """
+        with self.__cond:
+            now = self.__clock()
+            if not handle._schedule(now):
+                handle._due = now
+            self.__handles.append(handle)
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name="cpauto-task-poller")
+                self.__thread.daemon = True
+                self.__thread.start()
+            self.__cond.notify()
+
+    def __run(self):
+        try:
+            self.__loop()
+        except BaseException as e:
+            # never leave handles waiting on a poller that is gone; the next
+            # submit starts a new one
+            with self.__cond:
+                handles, self.__handles = self.__handles, []
+                self.__thread = None
+            for handle in handles:
+                handle._finish(exception=e)
+            raise
+
+    def __loop(self):
+        while True:
+            with self.__cond:
+                while True:
+                    if not self.__handles:
+                        self.__thread = None
+                        return
+                    now = self.__clock()
+                    due = min(handle._due for handle in self.__handles)
+                    if due <= now:
+                        break
+                    self.__cond.wait(due - now)
+                handles = list(self.__handles)
+            try:
+                finished = self.__poll(handles, now)
+            except Exception as e:
+                # e.g. a malformed show-task reply; the handles polled get
+                # the error rather than waiting forever
+                log.exception("Exception raised while polling tasks")
+                for handle in handles:
+                    handle._finish(exception=e)
+                finished = handles
+            for handle in finished:
+                with self.__cond:
+                    self.__handles.remove(handle)
+
+    def __show(self, task_ids):
+        # returns the tasks polled, or None when an unknown task ID made the
+        # server answer with 404
+        task_r = self.__cc.http_post("show-task", payload={"task-id": task_ids, "details-level": "standard"})
+        if task_r.status_code == 404:
+            return None
+        if task_r.status_code != 200:
+            raise WaitOnTaskError("Failed to handle asynchronous task as synchronous")
+        return task_r.json().get("tasks", [])
+
+    def __poll(self, handles, now):
+        # returns the handles that are finished with
+        task_ids = []
+        for handle in handles:
+            task_ids.extend(task_id for task_id in handle._pending if task_id not in task_ids)
+
+        try:
+            tasks = self.__show(task_ids)
+        except Exception as e:
+            if len(handles) == 1:
+                handles[0]._finish(exception=e)
+                return handles
+            tasks = None
+        if tasks is not None:
+            return self.__advance(handles, tasks, now)
+
+        # a task ID unknown to the server, or a failed request, holds up the
+        # whole poll; poll every handle on its own so that it only holds up
+        # the handle it belongs to
+        if len(handles) == 1:
+            return self.__advance(handles, [], now)
+        finished = []
+        for handle in handles:
+            try:
+                tasks = self.__show(handle._pending)
+            except Exception as e:
+                handle._finish(exception=e)
+                finished.append(handle)
+                continue
+            finished.extend(self.__advance([handle], tasks or [], now))
+        return finished
+
+    def __advance(self, handles, tasks, now):
+        tasks_by_id = dict((task["task-id"], task) for task in tasks)
+        finished = []
+        for handle in handles:
+            handle._update(tasks_by_id)
+            if not handle._pending:
+                self.__fetch(handle)
+                finished.append(handle)
+            elif handle._due <= now and not handle._schedule(now):
+                handle._finish(exception=WaitOnTaskError("Timed out waiting on task or tasks"))
+                finished.append(handle)
+        return finished
+
+    def __fetch(self, handle):
+        try:
+            task_r = self.__cc.http_post("show-task", payload={"task-id": handle.task_ids, "details-level": "full"})
+            if task_r.status_code != 200:
+                raise WaitOnTaskError("Failed to handle asynchronous task as synchronous")
+            _check_task_result(task_r)
+        except Exception as e:
+            handle._finish(exception=e)
+        else:
+            handle._finish(result=task_r)
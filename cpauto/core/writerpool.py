@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.core.writerpool
+# ~~~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains a pool of management sessions that write in
+parallel, each to its own share of the objects."""
+
+from .autopublish import Commit
+from .exceptions import CoreClientError
+
+from ..objects.bulk import BulkItem, BulkResult
+
+from concurrent.futures import ThreadPoolExecutor
+
+import time
+
+REFERENCE_FIELDS = ('members', 'groups', 'except', 'include')
+"""Spec fields naming other objects that must be written by the same session."""
+
+def _names(value):
+    # the object names in a reference field: a name, a list of names, or a
+    # dictionary of add/remove/set lists as accepted by set-* endpoints
+    if isinstance(value, dict):
+        names = []
+        for key in ('add', 'remove', 'set'):
+            names.extend(_names(value.get(key, [])))
+        return names
+    if isinstance(value, (list, tuple)):
+        return [name for item in value for name in _names(item)]
+    return [value] if value else []
+
+def _spec_objects(spec):
+    # the object a spec writes, followed by the objects it references
+    own = spec.get('name') or spec.get('uid')
+    objects = [own] if own else []
+    fields = dict(spec.get('params', {}))
+    fields.update(spec)
+    for field in REFERENCE_FIELDS:
+        if field in fields:
+            objects.extend(_names(fields[field]))
+    return objects
+
+class _UnionFind:
+    def __init__(self):
+        self.__parent = {}
+
+    def find(self, x):
+        parent = self.__parent.setdefault(x, x)
+        if parent != x:
+            parent = self.__parent[x] = self.find(parent)
+        return parent
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.__parent[b] = a
+
+class WriterPool:
+    """Writes with several management sessions in parallel, giving each its
+    own share of the objects so that none of them waits on objects another
+    one has locked.
+
+    The pool logs every core client in, each getting its own session.
+    Specs given to :meth:`run` are partitioned by object name (or uid):
+    an object and every object it references through its members or groups
+    fields end up in the same partition, the group-membership closure, and
+    stay with the same session for as long as the pool is used. Partitions
+    are balanced across sessions, each running its specs in order on its
+    own thread. Should a partition join objects already written by
+    different sessions, those sessions publish first.
+
+    Leaving the block publishes the sessions one after the other, in order,
+    or discards them when an exception was raised, then logs them out.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> clients = [cpauto.CoreClient('admin', 'vpn123', '10.11.12.13') for _ in range(4)]
+      >>> with cpauto.WriterPool(clients) as pool:
+      ...     hosts = pool.run(cpauto.Host, 'add', host_specs)
+      ...     groups = pool.run(cpauto.Group, 'add', group_specs)
+      >>> [commit.changes for commit in pool.commits]
+      [2500, 2500, 2500, 2500]
+    """
+
+    def __init__(self, core_clients, login_params={}, clock=time.time):
+        self.__clients = list(core_clients)
+        self.__login_params = login_params
+        self.__clock = clock
+        self.__owners = {}
+        self.__pending = [0] * len(self.__clients)
+        self.commits = []
+
+    def __enter__(self):
+        self.login()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is not None:
+                self.discard()
+            else:
+                self.publish()
+        finally:
+            self.logout()
+        return False
+
+    @property
+    def sessions(self):
+        """The number of sessions in the pool."""
+        return len(self.__clients)
+
+    def login(self):
+        """Logs every core client in, each in its own session.
+
+        :raises CoreClientError: A login failed.
+        """
+        for cc in self.__clients:
+            r = cc.login(params=self.__login_params)
+            if r.status_code != 200:
+                message = r.json().get('message', 'Failed to login')
+                raise CoreClientError(message, http_status_code=r.status_code)
+
+    def logout(self):
+        """Logs every core client out."""
+        for cc in self.__clients:
+            try:
+                cc.logout()
+            except CoreClientError:
+                pass
+
+    def partition(self, specs):
+        """Assigns specs to sessions.
+
+        :param specs: A list of dictionaries of keyword arguments.
+        :returns: A list of lists of (index, spec) tuples, one per session.
+        """
+        uf = _UnionFind()
+        objects = []
+        for index, spec in enumerate(specs):
+            names = _spec_objects(spec) or [('spec', index)]
+            for name in names[1:]:
+                uf.union(names[0], name)
+            objects.append(names)
+
+        components = {}
+        for index, names in enumerate(objects):
+            components.setdefault(uf.find(names[0]), []).append(index)
+
+        # components already owned by sessions keep them; one owned by
+        # several sessions needs them published before it can be written
+        owners = {}
+        for root, indexes in components.items():
+            sessions = set(self.__owners[name] for i in indexes for name in objects[i]
+                           if name in self.__owners)
+            if len(sessions) > 1:
+                self.publish(sorted(sessions))
+                sessions = set()
+            owners[root] = sessions.pop() if sessions else None
+
+        partitions = [[] for _ in self.__clients]
+        load = [0] * len(self.__clients)
+        for root, indexes in sorted(components.items(), key=lambda item: -len(item[1])):
+            i = owners[root]
+            if i is None:
+                i = load.index(min(load))
+            load[i] += len(indexes)
+            for index in indexes:
+                partitions[i].append((index, specs[index]))
+                for name in objects[index]:
+                    self.__owners[name] = i
+        for partition in partitions:
+            partition.sort(key=lambda item: item[0])
+        return partitions
+
+    def run(self, object_class, method, specs):
+        """Calls a method of an object class for every spec, the sessions
+        writing their partitions in parallel.
+
+        :param object_class: The object class (e.g. cpauto.Host).
+        :param method: The name of the method to call (e.g. add).
+        :param specs: An iterable of dictionaries of keyword arguments for
+            the method, one per object.
+        :returns: A BulkResult with a BulkItem per spec, in order.
+        :rtype: BulkResult
+        """
+        partitions = self.partition(list(specs))
+
+        def write(i):
+            fn = getattr(object_class(self.__clients[i]), method)
+            items = []
+            for index, spec in partitions[i]:
+                try:
+                    items.append(BulkItem(index, spec, result=fn(**spec)))
+                except Exception as e:
+                    items.append(BulkItem(index, spec, error=e))
+            self.__pending[i] += len(items)
+            return items
+
+        executor = ThreadPoolExecutor(max_workers=len(self.__clients))
+        try:
+            futures = [executor.submit(write, i) for i, partition in enumerate(partitions) if partition]
+            items = [item for future in futures for item in future.result()]
+        finally:
+            executor.shutdown(wait=True)
+        return BulkResult(items)
+
+    def publish(self, sessions=None):
+        """Publishes sessions one after the other, in order.
+
+        :param sessions: (optional) The indexes of the sessions to publish.
+            Default is every session.
+        :raises CoreClientError: A publish failed.
+        """
+        for i in (sessions if sessions is not None else range(len(self.__clients))):
+            changes = self.__pending[i]
+            if changes:
+                started = self.__clock()
+                r = self.__clients[i].publish()
+                if r.task is not None:
+                    r = r.task.result()
+                if r.status_code != 200 or not r.success:
+                    message = r.message or r.json().get('message', 'Failed to publish changes')
+                    raise CoreClientError(message, http_status_code=r.status_code)
+                self.commits.append(Commit(changes, self.__clock() - started, r))
+                self.__pending[i] = 0
+            for name, owner in list(self.__owners.items()):
+                if owner == i:
+                    del self.__owners[name]
+
+    def discard(self):
+        """Discards the changes of every session."""
+        for i, cc in enumerate(self.__clients):
+            if self.__pending[i]:
+                cc.discard()
+                self.__pending[i] = 0
+        self.__owners.clear()
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.objects._aiocommon
+# ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+"""This module provides common bits needed to manage objects with asyncio."""
+
+from ._common import _page_error, _page_items, _rulebase_page_items
+from .bulk import BulkItem, BulkResult
+
+from collections import deque
+from itertools import islice
+
+import asyncio
+import functools
+import inspect
+
+def _coroutine_method(func):
+    @functools.wraps(func)
+    async def method(self, *args, **kwargs):
+        return await func(self, *args, **kwargs)
+    return method
+
+async def _iter_pages(fetch_page, page_items, limit, concurrency):
+    data = await fetch_page(0)
+    items, last = page_items(data, limit)
+    for item in items:
+        yield item
+    if last:
+        return
+
+    if concurrency > 1 and 'total' in data and len(items) >= limit:
+        offsets = iter(range(len(items), data['total'], limit))
+        pages = deque(asyncio.ensure_future(fetch_page(offset)) for offset in islice(offsets, concurrency))
+        try:
+            while pages:
+                data = await pages.popleft()
+                for offset in islice(offsets, 1):
+                    pages.append(asyncio.ensure_future(fetch_page(offset)))
+                for item in page_items(data, limit)[0]:
+                    yield item
+        finally:
+            for page in pages:
+                page.cancel()
+        return
+
+    offset = len(items)
+    while True:
+        data = await fetch_page(offset)
+        items, last = page_items(data, limit)
+        for item in items:
+            yield item
+        if last:
+            return
+        offset += len(items)
+
+def _async_iter_all(func):
+    @functools.wraps(func)
+    async def iter_all(self, order=[], details_level='', limit=500, concurrency=1):
+        async def fetch_page(offset):
+            r = await self.show_all(limit=limit, offset=offset, order=order, details_level=details_level)
+            if r.status_code != 200:
+                raise _page_error(self.__class__.__name__, r)
+            return r.json()
+
+        async for item in _iter_pages(fetch_page, _page_items, limit, concurrency):
+            yield item
+    return iter_all
+
+def _async_iter_rulebase(func):
+    # rulebases are shown for a layer or package, with paging in params
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def iter_all(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        del arguments['self']
+        params = arguments.pop('params')
+        limit = arguments.pop('limit')
+        concurrency = arguments.pop('concurrency')
+
+        async def fetch_page(offset):
+            page_params = dict(params, limit=limit, offset=offset)
+            r = await self.show_all(params=page_params, **arguments)
+            if r.status_code != 200:
+                raise _page_error(self.__class__.__name__, r)
+            return r.json()
+
+        async for item in _iter_pages(fetch_page, _rulebase_page_items, limit, concurrency):
+            yield item
+    return iter_all
+
+def _async_fetch_all(func):
+    @functools.wraps(func)
+    async def fetch_all(self, *args, **kwargs):
+        return [item async for item in self.iter_all(*args, **kwargs)]
+    return fetch_all
+
+def _async_many(func):
+    # add_many, set_many and delete_many run add, set and delete
+    single = func.__name__[:-len('_many')]
+
+    @functools.wraps(func)
+    async def many(self, specs, concurrency=8, callback=None):
+        fn = getattr(self, single)
+
+        async def run(index, spec):
+            try:
+                return BulkItem(index, spec, result=await fn(**spec))
+            except Exception as e:
+                return BulkItem(index, spec, error=e)
+
+        items = []
+        specs = enumerate(specs)
+        running = set(asyncio.ensure_future(run(index, spec)) for index, spec in islice(specs, concurrency))
+        try:
+            while running:
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    item = future.result()
+                    items.append(item)
+                    if callback is not None:
+                        callback(len(items), item)
+                for index, spec in islice(specs, len(done)):
+                    running.add(asyncio.ensure_future(run(index, spec)))
+        finally:
+            for future in running:
+                future.cancel()
+        return BulkResult(items)
+    return many
+
+_SPECIAL_METHODS = {
+    'iter_all': _async_iter_all,
+    'fetch_all': _async_fetch_all,
+    'add_many': _async_many,
+    'set_many': _async_many,
+    'delete_many': _async_many,
+    # already returns the async generator of AsyncCoreClient.http_post_stream
+    'stream_all': lambda func: func,
+}
+
+def _asyncify(cls, module):
+    """Builds the asyncio flavour of an object class.
+
+    Object classes and _CommonClient only build payloads and hand them to the
+    core client's http_post, returning whatever it returns. Given an
+    AsyncCoreClient that is an awaitable, so every public method of the
+    returned subclass is exposed as a coroutine that awaits it. Pagination
+    helpers are rebuilt on top of the awaitable show_all: iter_all becomes an
+    asynchronous generator. Bulk helpers such as add_many run their calls as
+    concurrent coroutines instead of on worker threads.
+    """
+    namespace = { '__doc__': cls.__doc__, '__module__': module }
+    for attr, value in vars(cls).items():
+        if attr.startswith('_') or not callable(value):
+            continue
+        wrap = _SPECIAL_METHODS.get(attr, _coroutine_method)
+        if attr == 'iter_all' and 'params' in inspect.signature(value).parameters:
+            wrap = _async_iter_rulebase
+        namespace[attr] = wrap(value)
+    return type('Async' + cls.__name__, (cls,), namespace)
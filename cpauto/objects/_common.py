@@ -19,6 +19,53 @@
 
 """This module provides common bits needed to manage objects."""
 
+from ..core.exceptions import CoreClientError
+
+from .bulk import BulkItem, BulkResult
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
+def _page_items(data, limit):
+    # returns the objects listed by a page of show-* results and whether it
+    # was the last page; the list is the only list-valued member of a page
+    items = []
+    for value in data.values():
+        if isinstance(value, list):
+            items = value
+            break
+    if not items:
+        return items, True
+    if 'to' in data and 'total' in data:
+        return items, data['to'] >= data['total']
+    return items, len(items) < limit
+
+def _rulebase_rules(entries):
+    # rulebase entries are rules or sections holding rules; a section may be
+    # split over two pages, so only its rules are listed
+    rules = []
+    for entry in entries:
+        if 'rulebase' in entry:
+            rules.extend(_rulebase_rules(entry['rulebase']))
+        else:
+            rules.append(entry)
+    return rules
+
+def _rulebase_page_items(data, limit):
+    # returns the rules of a page of show-*-rulebase results and whether it
+    # was the last page; pages are counted in rules, not in sections
+    rules = _rulebase_rules(data.get('rulebase', []))
+    if not rules:
+        return rules, True
+    if 'to' in data and 'total' in data:
+        return rules, data['to'] >= data['total']
+    return rules, len(rules) < limit
+
+def _page_error(endpoint, result):
+    message = result.json().get('message', 'Failed to fetch a page of ' + endpoint)
+    return CoreClientError(message, http_status_code=result.status_code)
+
 class _CommonClient:
     def __init__(self, core_client):
         self.__core_client = core_client
@@ -84,3 +131,92 @@ class _CommonClient:
         if details_level:
             payload['details-level'] = details_level
         return self.__core_client.http_post(endpoint, payload=payload)
+
+    def _fetch_page(self, endpoint, offset, limit, order, details_level):
+        r = self._show_all(endpoint, limit=limit, offset=offset, order=order, details_level=details_level)
+        if r.status_code != 200:
+            raise _page_error(endpoint, r)
+        return r.json()
+
+    def _iter_all(self, endpoint, order=[], details_level='', limit=500, concurrency=1):
+        def fetch_page(offset):
+            return self._fetch_page(endpoint, offset, limit, order, details_level)
+        return self._iter_pages(fetch_page, _page_items, limit, concurrency)
+
+    def _iter_rulebase(self, endpoint, payload, limit=500, concurrency=1):
+        def fetch_page(offset):
+            r = self.__core_client.http_post(endpoint,
+                payload=self.__core_client.merge_payloads(payload, { 'limit': limit, 'offset': offset }))
+            if r.status_code != 200:
+                raise _page_error(endpoint, r)
+            return r.json()
+        return self._iter_pages(fetch_page, _rulebase_page_items, limit, concurrency)
+
+    def _iter_pages(self, fetch_page, page_items, limit, concurrency):
+        data = fetch_page(0)
+        items, last = page_items(data, limit)
+        for item in items:
+            yield item
+        if last:
+            return
+
+        if concurrency > 1 and 'total' in data and len(items) >= limit:
+            # the first page tells how many objects there are, so the other
+            # pages are fetched concurrently, at most concurrency at a time,
+            # and yielded in order; a server returning short pages is paged
+            # through one page after the other, as offsets cannot be told
+            offsets = iter(range(len(items), data['total'], limit))
+            executor = ThreadPoolExecutor(max_workers=concurrency)
+            pages = deque()
+            try:
+                for offset in islice(offsets, concurrency):
+                    pages.append(executor.submit(fetch_page, offset))
+                while pages:
+                    data = pages.popleft().result()
+                    for offset in islice(offsets, 1):
+                        pages.append(executor.submit(fetch_page, offset))
+                    for item in page_items(data, limit)[0]:
+                        yield item
+            finally:
+                for page in pages:
+                    page.cancel()
+                executor.shutdown(wait=True)
+            return
+
+        offset = len(items)
+        while True:
+            data = fetch_page(offset)
+            items, last = page_items(data, limit)
+            for item in items:
+                yield item
+            if last:
+                return
+            offset += len(items)
+
+    def _run_many(self, fn, specs, concurrency=8, callback=None):
+        # calls fn(**spec) for every spec on a pool of worker threads sharing
+        # the core client; only a window of specs is in flight at a time so
+        # that any number of them can be streamed through
+        def run(index, spec):
+            try:
+                return BulkItem(index, spec, result=fn(**spec))
+            except Exception as e:
+                return BulkItem(index, spec, error=e)
+
+        items = []
+        specs = enumerate(specs)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            running = set(executor.submit(run, index, spec) for index, spec in islice(specs, concurrency * 2))
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = future.result()
+                    items.append(item)
+                    if callback is not None:
+                        callback(len(items), item)
+                for index, spec in islice(specs, len(done)):
+                    running.add(executor.submit(run, index, spec))
+        finally:
+            executor.shutdown(wait=True)
+        return BulkResult(items)
@@ -80,6 +80,51 @@ class AccessRule:
         """
         return self.__common_client._post_with_layer('delete-access-rule', layer, name, uid, params)
 
+    def add_many(self, specs, concurrency=8, callback=None):
+        """Adds many new access rules, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            add(), one per access rule.
+        :param concurrency: (optional) The number of add() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.add, specs, concurrency=concurrency, callback=callback)
+
+    def set_many(self, specs, concurrency=8, callback=None):
+        """Sets new values for many existing access rules, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            set(), one per access rule.
+        :param concurrency: (optional) The number of set() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.set, specs, concurrency=concurrency, callback=callback)
+
+    def delete_many(self, specs, concurrency=8, callback=None):
+        """Deletes many existing access rules, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            delete(), one per access rule.
+        :param concurrency: (optional) The number of delete() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.delete, specs, concurrency=concurrency, callback=callback)
+
     def show_all(self, name='', params={}):
         """Shows all access rules within a layer, section, etc.
 
@@ -94,6 +139,63 @@ class AccessRule:
             payload = self.__cc.merge_payloads(payload, params)
         return self.__cc.http_post('show-access-rulebase', payload=payload)
 
+    def stream_all(self, name='', params={}):
+        """Streams all access rules within a layer, section, etc. The response
+        is decoded incrementally, so very large rulebases can be walked with
+        bounded memory.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-access-rulebase
+
+        :param name: The name of an existing access layer, section, etc.
+        :param params: (optional) A dictionary of additional, supported parameter names and values.
+        :raises CoreClientError: The rulebase could not be fetched.
+        :returns: A generator of (key, element) tuples, where key is 'rulebase'
+            for rulebase entries and 'objects-dictionary' for referenced objects.
+        """
+        payload = { 'name': name }
+        if params:
+            payload = self.__cc.merge_payloads(payload, params)
+        return self.__cc.http_post_stream('show-access-rulebase', ('rulebase', 'objects-dictionary'),
+            payload=payload)
+
+    def iter_all(self, name='', params={}, limit=500, concurrency=1):
+        """Iterates over all access rules within a layer, section, etc., fetching the rulebase page by page as needed.
+
+        Rules within sections are listed in order, without their sections.
+        Use show_all or stream_all when the objects dictionary is needed too.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-access-rulebase
+
+        :param name: The name of an existing access layer, section, etc.
+        :param params: (optional) A dictionary of additional, supported parameter names and values.
+        :param limit: (optional) The number of rules fetched per page.
+            The default value is 500, the maximum allowed.
+        :param concurrency: (optional) The number of pages fetched at once
+            after the first one. Default is 1, fetching pages one by one.
+        :raises CoreClientError: A page could not be fetched.
+        :rtype: generator of dictionaries
+        """
+        payload = { 'name': name }
+        if params:
+            payload = self.__cc.merge_payloads(payload, params)
+        return self.__common_client._iter_rulebase('show-access-rulebase', payload, limit=limit, concurrency=concurrency)
+
+    def fetch_all(self, name='', params={}, limit=500, concurrency=1):
+        """Fetches all access rules within a layer, section, etc., page by page, into a single list.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-access-rulebase
+
+        :param name: The name of an existing access layer, section, etc.
+        :param params: (optional) A dictionary of additional, supported parameter names and values.
+        :param limit: (optional) The number of rules fetched per page.
+            The default value is 500, the maximum allowed.
+        :param concurrency: (optional) The number of pages fetched at once
+            after the first one. Default is 1, fetching pages one by one.
+        :raises CoreClientError: A page could not be fetched.
+        :rtype: list of dictionaries
+        """
+        return list(self.iter_all(name, params=params, limit=limit, concurrency=concurrency))
+
 class AccessSection:
     """Manage access sections."""
 
@@ -153,6 +255,51 @@ class AccessSection:
         """
         return self.__common_client._post_with_layer('delete-access-section', layer, name, uid, params)
 
+    def add_many(self, specs, concurrency=8, callback=None):
+        """Adds many new access sections, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            add(), one per access section.
+        :param concurrency: (optional) The number of add() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.add, specs, concurrency=concurrency, callback=callback)
+
+    def set_many(self, specs, concurrency=8, callback=None):
+        """Sets new values for many existing access sections, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            set(), one per access section.
+        :param concurrency: (optional) The number of set() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.set, specs, concurrency=concurrency, callback=callback)
+
+    def delete_many(self, specs, concurrency=8, callback=None):
+        """Deletes many existing access sections, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            delete(), one per access section.
+        :param concurrency: (optional) The number of delete() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.delete, specs, concurrency=concurrency, callback=callback)
+
 class AccessLayer:
     """Manage access layers."""
 
@@ -214,6 +361,51 @@ class AccessLayer:
         """
         return self.__common_client._delete('delete-access-layer', name=name, uid=uid, params=params)
 
+    def add_many(self, specs, concurrency=8, callback=None):
+        """Adds many new access layers, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            add(), one per access layer.
+        :param concurrency: (optional) The number of add() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.add, specs, concurrency=concurrency, callback=callback)
+
+    def set_many(self, specs, concurrency=8, callback=None):
+        """Sets new values for many existing access layers, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            set(), one per access layer.
+        :param concurrency: (optional) The number of set() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.set, specs, concurrency=concurrency, callback=callback)
+
+    def delete_many(self, specs, concurrency=8, callback=None):
+        """Deletes many existing access layers, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            delete(), one per access layer.
+        :param concurrency: (optional) The number of delete() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.delete, specs, concurrency=concurrency, callback=callback)
+
     def show_all(self, limit=50, offset=0, order=[], details_level=''):
         """Shows all hosts with some reasonable limitations.
 
@@ -232,11 +424,50 @@ class AccessLayer:
         return self.__common_client._show_all('show-access-layers', limit=limit,
             offset=offset, order=order, details_level=details_level)
 
+    def iter_all(self, order=[], details_level='', limit=500, concurrency=1):
+        """Iterates over all access layers, fetching them page by page as needed.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-access-layers
+
+        :param order: (optional) Sort the results by the specified field. The
+            default is a random order.
+        :param details_level: (optional) The level of detail to show. Default
+            value is 'standard' and the other options are: 'uid' or 'full'
+        :param limit: (optional) The number of access layers fetched per page.
+            The default value is 500, the maximum allowed.
+        :param concurrency: (optional) The number of pages fetched at once
+            after the first one. Default is 1, fetching pages one by one.
+        :raises CoreClientError: A page could not be fetched.
+        :rtype: generator of dictionaries
+        """
+        return self.__common_client._iter_all('show-access-layers', order=order,
+            details_level=details_level, limit=limit, concurrency=concurrency)
+
+    def fetch_all(self, order=[], details_level='', limit=500, concurrency=1):
+        """Fetches all access layers, page by page, into a single list.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-access-layers
+
+        :param order: (optional) Sort the results by the specified field. The
+            default is a random order.
+        :param details_level: (optional) The level of detail to show. Default
+            value is 'standard' and the other options are: 'uid' or 'full'
+        :param limit: (optional) The number of access layers fetched per page.
+            The default value is 500, the maximum allowed.
+        :param concurrency: (optional) The number of pages fetched at once
+            after the first one. Default is 1, fetching pages one by one.
+        :raises CoreClientError: A page could not be fetched.
+        :rtype: list of dictionaries
+        """
+        return list(self.iter_all(order=order, details_level=details_level, limit=limit,
+            concurrency=concurrency))
+
 class NATRule:
     """Manage NAT rules."""
 
     def __init__(self, core_client):
         self.__cc = core_client
+        self.__common_client = _CommonClient(core_client)
 
     def __post(self, endpoint, package="", uid="", params={}):
         payload = { 'package': package }
@@ -298,6 +529,51 @@ class NATRule:
         """
         return self.__post('delete-nat-rule', package, uid, params)
 
+    def add_many(self, specs, concurrency=8, callback=None):
+        """Adds many new NAT rules, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            add(), one per NAT rule.
+        :param concurrency: (optional) The number of add() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.add, specs, concurrency=concurrency, callback=callback)
+
+    def set_many(self, specs, concurrency=8, callback=None):
+        """Sets new values for many existing NAT rules, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            set(), one per NAT rule.
+        :param concurrency: (optional) The number of set() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.set, specs, concurrency=concurrency, callback=callback)
+
+    def delete_many(self, specs, concurrency=8, callback=None):
+        """Deletes many existing NAT rules, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            delete(), one per NAT rule.
+        :param concurrency: (optional) The number of delete() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.delete, specs, concurrency=concurrency, callback=callback)
+
     def show_all(self, package="", params={}):
         """Show all NAT rules within a package.
 
@@ -312,11 +588,68 @@ class NATRule:
             payload = self.__cc.merge_payloads(payload, params)
         return self.__cc.http_post('show-nat-rulebase', payload=payload)
 
+    def stream_all(self, package="", params={}):
+        """Streams all NAT rules within a package. The response is decoded
+        incrementally, so very large rulebases can be walked with bounded memory.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-nat-rulebase
+
+        :param package: The name of an existing package.
+        :param params: (optional) A dictionary of additional, supported parameter names and values.
+        :raises CoreClientError: The rulebase could not be fetched.
+        :returns: A generator of (key, element) tuples, where key is 'rulebase'
+            for rulebase entries and 'objects-dictionary' for referenced objects.
+        """
+        payload = { 'package': package }
+        if params:
+            payload = self.__cc.merge_payloads(payload, params)
+        return self.__cc.http_post_stream('show-nat-rulebase', ('rulebase', 'objects-dictionary'),
+            payload=payload)
+
+    def iter_all(self, package='', params={}, limit=500, concurrency=1):
+        """Iterates over all NAT rules within a package, fetching the rulebase page by page as needed.
+
+        Rules within sections are listed in order, without their sections.
+        Use show_all or stream_all when the objects dictionary is needed too.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-nat-rulebase
+
+        :param package: The name of an existing package.
+        :param params: (optional) A dictionary of additional, supported parameter names and values.
+        :param limit: (optional) The number of rules fetched per page.
+            The default value is 500, the maximum allowed.
+        :param concurrency: (optional) The number of pages fetched at once
+            after the first one. Default is 1, fetching pages one by one.
+        :raises CoreClientError: A page could not be fetched.
+        :rtype: generator of dictionaries
+        """
+        payload = { 'package': package }
+        if params:
+            payload = self.__cc.merge_payloads(payload, params)
+        return self.__common_client._iter_rulebase('show-nat-rulebase', payload, limit=limit, concurrency=concurrency)
+
+    def fetch_all(self, package='', params={}, limit=500, concurrency=1):
+        """Fetches all NAT rules within a package, page by page, into a single list.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-nat-rulebase
+
+        :param package: The name of an existing package.
+        :param params: (optional) A dictionary of additional, supported parameter names and values.
+        :param limit: (optional) The number of rules fetched per page.
+            The default value is 500, the maximum allowed.
+        :param concurrency: (optional) The number of pages fetched at once
+            after the first one. Default is 1, fetching pages one by one.
+        :raises CoreClientError: A page could not be fetched.
+        :rtype: list of dictionaries
+        """
+        return list(self.iter_all(package, params=params, limit=limit, concurrency=concurrency))
+
 class NATSection:
     """Manage NAT sections."""
 
     def __init__(self, core_client):
         self.__cc = core_client
+        self.__common_client = _CommonClient(core_client)
 
     def __post(self, endpoint, package="", name="", uid="", params={}):
         payload = { 'package': package }
@@ -382,3 +715,48 @@ class NATSection:
         :rtype: CoreClientResult
         """
         return self.__post('delete-nat-section', package, name, uid, params)
+
+    def add_many(self, specs, concurrency=8, callback=None):
+        """Adds many new NAT sections, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            add(), one per NAT section.
+        :param concurrency: (optional) The number of add() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.add, specs, concurrency=concurrency, callback=callback)
+
+    def set_many(self, specs, concurrency=8, callback=None):
+        """Sets new values for many existing NAT sections, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            set(), one per NAT section.
+        :param concurrency: (optional) The number of set() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.set, specs, concurrency=concurrency, callback=callback)
+
+    def delete_many(self, specs, concurrency=8, callback=None):
+        """Deletes many existing NAT sections, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            delete(), one per NAT section.
+        :param concurrency: (optional) The number of delete() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.delete, specs, concurrency=concurrency, callback=callback)
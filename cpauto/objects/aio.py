@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.objects.aio
+# ~~~~~~~~~~~~~~~~~~
+
+"""This module contains the asyncio flavour of the object classes. Each one
+takes an AsyncCoreClient and exposes the same methods as its blocking
+counterpart as coroutines. It requires Python 3.6 or newer.
+
+usage:
+
+>>> h = cpauto.AsyncHost(acc)
+>>> r = await h.add('srv_web', ip_address='192.168.1.4')
+"""
+
+from ._aiocommon import _asyncify
+
+from .access import AccessRule, AccessSection, AccessLayer, NATRule, NATSection
+from .application import App, AppCategory, AppGroup
+from .dnsdomain import DNSDomain
+from .group import Group
+from .host import Host
+from .network import Network
+from .policy import Policy, PolicyPackage
+from .service import (
+    ServiceTCP,
+    ServiceUDP,
+    ServiceSCTP,
+    ServiceOther,
+    ServiceGroup,
+    ServiceDCERPC,
+    ServiceRPC
+)
+from .simplegateway import SimpleGateway
+from .threat import ThreatProfile
+
+AsyncAccessRule = _asyncify(AccessRule, __name__)
+AsyncAccessSection = _asyncify(AccessSection, __name__)
+AsyncAccessLayer = _asyncify(AccessLayer, __name__)
+AsyncNATRule = _asyncify(NATRule, __name__)
+AsyncNATSection = _asyncify(NATSection, __name__)
+AsyncApp = _asyncify(App, __name__)
+AsyncAppCategory = _asyncify(AppCategory, __name__)
+AsyncAppGroup = _asyncify(AppGroup, __name__)
+AsyncDNSDomain = _asyncify(DNSDomain, __name__)
+AsyncGroup = _asyncify(Group, __name__)
+AsyncHost = _asyncify(Host, __name__)
+AsyncNetwork = _asyncify(Network, __name__)
+AsyncPolicy = _asyncify(Policy, __name__)
+AsyncPolicyPackage = _asyncify(PolicyPackage, __name__)
+AsyncServiceTCP = _asyncify(ServiceTCP, __name__)
+AsyncServiceUDP = _asyncify(ServiceUDP, __name__)
+AsyncServiceSCTP = _asyncify(ServiceSCTP, __name__)
+AsyncServiceOther = _asyncify(ServiceOther, __name__)
+AsyncServiceGroup = _asyncify(ServiceGroup, __name__)
+AsyncServiceDCERPC = _asyncify(ServiceDCERPC, __name__)
+AsyncServiceRPC = _asyncify(ServiceRPC, __name__)
+AsyncSimpleGateway = _asyncify(SimpleGateway, __name__)
+AsyncThreatProfile = _asyncify(ThreatProfile, __name__)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.objects.batch
+# ~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains the class needed to add, set and delete many objects
+with few requests, through the *-objects-batch endpoints."""
+
+from ..core.exceptions import CoreClientError
+from ..core.sessions import CoreClientResult
+
+from .bulk import BulkItem, BulkResult
+
+def _object_keys(obj):
+    # the keys by which an object reported by a task is matched to an input
+    return [(field, obj[field]) for field in ('uid', 'name') if obj.get(field)]
+
+def _message(obj, default):
+    errors = obj.get('errors') or []
+    if errors and isinstance(errors[0], dict) and 'message' in errors[0]:
+        return errors[0]['message']
+    return obj.get('message', default)
+
+class ObjectsBatch:
+    """Adds, sets or deletes many objects of a type with one request per
+    ``chunk_size`` objects, through the add-objects-batch, set-objects-batch
+    and delete-objects-batch endpoints of newer management API versions.
+
+    Every request starts a task that is waited for with the core client's
+    task machinery. The outcome of each object is then read from the task
+    details and mapped back to the spec it came from: objects listed as
+    failed are matched by uid or name, and when a task fails without
+    listing them, every object of its chunk is failed.
+
+    Specs are dictionaries of API fields (e.g. ``{'name': 'web-1',
+    'ip-address': '10.0.0.1'}``), as they would be sent to add-host.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13')
+      >>> r = cc.login()
+      >>> specs = [{'name': 'web-%d' % i, 'ip-address': '10.0.0.%d' % i} for i in range(1, 200)]
+      >>> bulk = cpauto.ObjectsBatch(cc).add('host', specs)
+      >>> len(bulk.succeeded), len(bulk.failed)
+      (199, 0)
+    """
+
+    def __init__(self, core_client, chunk_size=500):
+        self.__cc = core_client
+        self.chunk_size = chunk_size
+
+    def add(self, object_type, specs):
+        """Adds many objects of a type.
+
+        https://sc1.checkpoint.com/documents/latest/APIs/#web/add-objects-batch
+
+        :param object_type: The type of the objects (e.g. host).
+        :param specs: An iterable of dictionaries of API fields, one per object.
+        :rtype: BulkResult
+        """
+        return self.__run('add-objects-batch', object_type, specs)
+
+    def set(self, object_type, specs):
+        """Sets new values for many existing objects of a type.
+
+        https://sc1.checkpoint.com/documents/latest/APIs/#web/set-objects-batch
+
+        :param object_type: The type of the objects (e.g. host).
+        :param specs: An iterable of dictionaries of API fields, one per
+            object, each identifying it by name or uid.
+        :rtype: BulkResult
+        """
+        return self.__run('set-objects-batch', object_type, specs)
+
+    def delete(self, object_type, specs):
+        """Deletes many existing objects of a type.
+
+        https://sc1.checkpoint.com/documents/latest/APIs/#web/delete-objects-batch
+
+        :param object_type: The type of the objects (e.g. host).
+        :param specs: An iterable of dictionaries, one per object, each
+            identifying it by name or uid.
+        :rtype: BulkResult
+        """
+        return self.__run('delete-objects-batch', object_type, specs)
+
+    def __run(self, endpoint, object_type, specs):
+        items = []
+        chunk = []
+        for spec in specs:
+            chunk.append(spec)
+            if len(chunk) == self.chunk_size:
+                items.extend(self.__run_chunk(endpoint, object_type, len(items), chunk))
+                chunk = []
+        if chunk:
+            items.extend(self.__run_chunk(endpoint, object_type, len(items), chunk))
+        return BulkResult(items)
+
+    def __run_chunk(self, endpoint, object_type, start, chunk):
+        payload = { 'objects': [{ 'type': object_type, 'list': chunk }] }
+        try:
+            r = self.__cc.http_post(endpoint, payload=payload)
+            if r.task is not None:
+                # the core client does not wait for tasks
+                r = r.task.result()
+            if r.status_code != 200:
+                message = r.json().get('message', 'Failed to post to ' + endpoint)
+                raise CoreClientError(message, http_status_code=r.status_code)
+        except Exception as e:
+            return [BulkItem(start + i, spec, error=e) for i, spec in enumerate(chunk)]
+
+        failed = {}
+        succeeded = {}
+        listed = False
+        for task in r.json().get('tasks', []):
+            for details in task.get('task-details', []):
+                for obj in details.get('failed-objects', []):
+                    listed = True
+                    for key in _object_keys(obj):
+                        failed[key] = _message(obj, 'Failed to ' + endpoint.split('-')[0] + ' object')
+                for obj in details.get('succeeded-objects', []):
+                    for key in _object_keys(obj):
+                        succeeded[key] = obj
+
+        items = []
+        for i, spec in enumerate(chunk):
+            keys = _object_keys(spec)
+            message = next((failed[key] for key in keys if key in failed), None)
+            if message is None and not r.success and not listed:
+                message = r.message or 'Failed to ' + endpoint.split('-')[0] + ' object'
+            if message is not None:
+                items.append(BulkItem(start + i, spec, error=CoreClientError(message)))
+                continue
+            obj = next((succeeded[key] for key in keys if key in succeeded), {})
+            items.append(BulkItem(start + i, spec, result=CoreClientResult(200, obj)))
+        return items
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.objects.bulk
+# ~~~~~~~~~~~~~~~~~~~
+
+"""This module contains the results of bulk operations on many objects."""
+
+class BulkItem:
+    """The outcome of one item of a bulk operation.
+
+    ``spec`` is the dictionary of keyword arguments the item was run with and
+    ``index`` its position among the specs. Either ``result`` holds the
+    CoreClientResult received or ``error`` the exception raised.
+    """
+
+    def __init__(self, index, spec, result=None, error=None):
+        self.index = index
+        self.spec = spec
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        """True when the item was run without error and the API call succeeded."""
+        return self.error is None and self.result is not None and self.result.success
+
+class BulkResult:
+    """The outcome of a bulk operation such as Host.add_many, one BulkItem per
+    spec, in the order of the specs. Failed items do not stop the others.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13')
+      >>> r = cc.login()
+      >>> specs = [{'name': 'web-%d' % i, 'ipv4_address': '10.0.0.%d' % i} for i in range(1, 200)]
+      >>> bulk = cpauto.Host(cc).add_many(specs, concurrency=16)
+      >>> len(bulk.succeeded), len(bulk.failed)
+      (199, 0)
+    """
+
+    def __init__(self, items):
+        self.items = sorted(items, key=lambda item: item.index)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    @property
+    def succeeded(self):
+        """The items that succeeded."""
+        return [item for item in self.items if item.ok]
+
+    @property
+    def failed(self):
+        """The items that raised an error or whose API call failed."""
+        return [item for item in self.items if not item.ok]
@@ -89,6 +89,51 @@ class DNSDomain:
         """
         return self.__common_client._delete('delete-dns-domain', name=name, uid=uid, params=params)
 
+    def add_many(self, specs, concurrency=8, callback=None):
+        """Adds many new dns-domains, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            add(), one per dns-domain.
+        :param concurrency: (optional) The number of add() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.add, specs, concurrency=concurrency, callback=callback)
+
+    def set_many(self, specs, concurrency=8, callback=None):
+        """Sets new values for many existing dns-domains, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            set(), one per dns-domain.
+        :param concurrency: (optional) The number of set() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.set, specs, concurrency=concurrency, callback=callback)
+
+    def delete_many(self, specs, concurrency=8, callback=None):
+        """Deletes many existing dns-domains, a bounded number at a time.
+
+        Every spec is run, whether or not others fail.
+
+        :param specs: An iterable of dictionaries of keyword arguments for
+            delete(), one per dns-domain.
+        :param concurrency: (optional) The number of delete() calls in
+            flight at once. Default is 8.
+        :param callback: (optional) A function called with the number of
+            specs done so far and the BulkItem just done, as each one ends.
+        :rtype: BulkResult
+        """
+        return self.__common_client._run_many(self.delete, specs, concurrency=concurrency, callback=callback)
+
     def show_all(self, limit=50, offset=0, order=[], details_level=''):
         """Shows all dns-domains with some reasonable limitations.
 
@@ -106,3 +151,41 @@ class DNSDomain:
         """
         return self.__common_client._show_all('show-dns-domains', limit=limit,
             offset=offset, order=order, details_level=details_level)
+
+    def iter_all(self, order=[], details_level='', limit=500, concurrency=1):
+        """Iterates over all DNS domains, fetching them page by page as needed.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-dns-domains
+
+        :param order: (optional) Sort the results by the specified field. The
+            default is a random order.
+        :param details_level: (optional) The level of detail to show. Default
+            value is 'standard' and the other options are: 'uid' or 'full'
+        :param limit: (optional) The number of DNS domains fetched per page.
+            The default value is 500, the maximum allowed.
+        :param concurrency: (optional) The number of pages fetched at once
+            after the first one. Default is 1, fetching pages one by one.
+        :raises CoreClientError: A page could not be fetched.
+        :rtype: generator of dictionaries
+        """
+        return self.__common_client._iter_all('show-dns-domains', order=order,
+            details_level=details_level, limit=limit, concurrency=concurrency)
+
+    def fetch_all(self, order=[], details_level='', limit=500, concurrency=1):
+        """Fetches all DNS domains, page by page, into a single list.
+
+        https://sc1.checkpoint.com/documents/R80/APIs/#web/show-dns-domains
+
+        :param order: (optional) Sort the results by the specified field. The
+            default is a random order.
+        :param details_level: (optional) The level of detail to show. Default
+            value is 'standard' and the other options are: 'uid' or 'full'
+        :param limit: (optional) The number of DNS domains fetched per page.
+            The default value is 500, the maximum allowed.
+        :param concurrency: (optional) The number of pages fetched at once
+            after the first one. Default is 1, fetching pages one by one.
+        :raises CoreClientError: A page could not be fetched.
+        :rtype: list of dictionaries
+        """
+        return list(self.iter_all(order=order, details_level=details_level, limit=limit,
+            concurrency=concurrency))
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.objects.reconcile
+# ~~~~~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains the engine used to bring objects to a desired state
+with as few API calls as possible."""
+
+UNORDERED_FIELDS = ('members', 'groups', 'tags')
+"""Fields whose lists are compared regardless of order."""
+
+IGNORED_FIELDS = ('name', 'uid', 'type', 'domain', 'meta-info', 'read-only', 'icon',
+                  'available-actions')
+"""Fields never compared, as they are not set through add-* or set-*."""
+
+PROTECTED_DOMAIN_TYPES = ('data domain',)
+"""Domain types of predefined objects, which are never deleted."""
+
+def _field(key):
+    # ipv4_address and ipv4-address name the same field
+    return key.replace('_', '-')
+
+# fields only references to objects carry alongside their names
+_REFERENCE_FIELDS = ('uid', 'type', 'domain')
+
+def _normalize(value):
+    # reduces a field value to a form that compares equal whether it came
+    # from a desired spec or from a show-* reply: references to objects
+    # become their names, numbers become text and surrounding blanks go;
+    # other dictionaries with a name, e.g. gateway interfaces, are compared
+    # field by field
+    if hasattr(value, 'items'):
+        if 'name' in value and any(k in value for k in _REFERENCE_FIELDS):
+            return _normalize(value['name'])
+        return dict((_field(k), _normalize(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    if hasattr(value, 'strip'):
+        return value.strip()
+    return value
+
+def _normalize_field(key, value):
+    value = _normalize(value)
+    if key in UNORDERED_FIELDS:
+        if not isinstance(value, list):
+            value = [value]
+        value = sorted(value, key=repr)
+    return value
+
+def diff(current, desired):
+    """Compares the fields of a desired object with its current state.
+
+    Only fields present in the desired object are compared. Field names may
+    use underscores or hyphens, references to other objects may be names or
+    the objects themselves, and the lists of :data:`UNORDERED_FIELDS` may be
+    in any order.
+
+    :param current: The object as returned by a show-* endpoint.
+    :param desired: A dictionary of the desired field names and values.
+    :returns: A dictionary of the differing field names to (current value,
+        desired value) tuples, both normalized. Empty when nothing differs.
+    :rtype: dict
+    """
+    fields = dict((_field(k), v) for k, v in current.items())
+    changes = {}
+    for key, value in desired.items():
+        key = _field(key)
+        if key in IGNORED_FIELDS:
+            continue
+        wanted = _normalize_field(key, value)
+        if key in fields:
+            found = _normalize_field(key, fields[key])
+        else:
+            found = None
+        if found != wanted:
+            changes[key] = (found, wanted)
+    return changes
+
+class Change:
+    """An API call planned by a :class:`Reconciler`.
+
+    ``action`` is 'add', 'set' or 'delete', ``name`` the name of the object,
+    ``spec`` the keyword arguments for the object class method and ``fields``
+    the differing fields, as returned by :func:`diff`.
+    """
+
+    def __init__(self, action, name, spec, fields=None):
+        self.action = action
+        self.name = name
+        self.spec = spec
+        self.fields = fields or {}
+
+    def describe(self):
+        """Returns a line describing the change, e.g. for a dry run.
+
+        :rtype: str
+        """
+        if self.action == 'add':
+            return '+ {0}'.format(self.name)
+        if self.action == 'delete':
+            return '- {0}'.format(self.name)
+        return '~ {0}: {1}'.format(self.name, ', '.join(
+            '{0} {1!r} -> {2!r}'.format(key, found, wanted)
+            for key, (found, wanted) in sorted(self.fields.items())))
+
+class Plan:
+    """The changes needed to bring objects of one class to a desired state.
+
+    ``changes`` lists the additions, then the updates, then the deletions.
+    ``unchanged`` lists the names of desired objects already as desired,
+    for which no call is made.
+    """
+
+    def __init__(self, object_class, changes, unchanged):
+        self.object_class = object_class
+        self.changes = changes
+        self.unchanged = unchanged
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def of(self, action):
+        """Returns the changes of an action.
+
+        :param action: 'add', 'set' or 'delete'.
+        :rtype: list of Change
+        """
+        return [change for change in self.changes if change.action == action]
+
+    @property
+    def counts(self):
+        """The number of objects to add, set and delete, and of those skipped
+        as unchanged.
+
+        :rtype: dict
+        """
+        counts = {'add': 0, 'set': 0, 'delete': 0, 'unchanged': len(self.unchanged)}
+        for change in self.changes:
+            counts[change.action] += 1
+        return counts
+
+    def describe(self):
+        """Returns lines describing every change, then a summary line.
+
+        :rtype: list of str
+        """
+        counts = self.counts
+        return [change.describe() for change in self.changes] + [
+            '{0}: {1} to add, {2} to set, {3} to delete, {4} unchanged'.format(
+                self.object_class.__name__, counts['add'], counts['set'], counts['delete'],
+                counts['unchanged'])]
+
+class Reconciler:
+    """Brings objects to a desired state, making only the add, set and
+    delete calls needed.
+
+    The current objects of a class are fetched page by page, at the full
+    detail level, and compared field by field with the desired ones by
+    name. Objects missing are added, objects with differing fields are set
+    with those fields only, and, when pruning, objects not desired are
+    deleted; predefined objects never are. Desired objects are
+    dictionaries of the fields to manage, named as show-* returns them
+    (underscores may stand for hyphens); fields left out are left alone.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13')
+      >>> r = cc.login()
+      >>> reconciler = cpauto.Reconciler(cc)
+      >>> plan = reconciler.plan(cpauto.Host, [{'name': 'web-1', 'ipv4-address': '10.0.0.1', 'color': 'red'},
+      ...                                      {'name': 'web-2', 'ipv4-address': '10.0.0.2'}])
+      >>> print('\\n'.join(plan.describe()))
+      ~ web-1: color 'black' -> 'red'
+      Host: 0 to add, 1 to set, 0 to delete, 1 unchanged
+      >>> results = reconciler.apply(plan)
+      >>> r = cc.publish()
+    """
+
+    def __init__(self, core_client, concurrency=8, page_concurrency=1):
+        self.__cc = core_client
+        self.concurrency = concurrency
+        self.page_concurrency = page_concurrency
+
+    def current(self, object_class):
+        """Fetches the current objects of a class.
+
+        :param object_class: The object class (e.g. cpauto.Host).
+        :raises CoreClientError: A page could not be fetched.
+        :returns: A dictionary of object names to objects.
+        :rtype: dict
+        """
+        objects = object_class(self.__cc).iter_all(details_level='full',
+            concurrency=self.page_concurrency)
+        return dict((obj['name'], obj) for obj in objects)
+
+    def plan(self, object_class, desired, prune=False, current=None):
+        """Plans the changes bringing the objects of a class to a desired state.
+
+        :param object_class: The object class (e.g. cpauto.Host).
+        :param desired: An iterable of dictionaries of the desired fields,
+            one per object, each with a name.
+        :param prune: (optional) Delete the objects of the class that are not
+            desired when true. Default is false.
+        :param current: (optional) A dictionary of object names to current
+            objects. Default is to fetch them.
+        :raises CoreClientError: A page could not be fetched.
+        :rtype: Plan
+        """
+        if current is None:
+            current = self.current(object_class)
+        adds, sets, unchanged, names = [], [], [], set()
+        for obj in desired:
+            name = obj['name']
+            names.add(name)
+            params = dict((_field(k), v) for k, v in obj.items() if _field(k) != 'name')
+            if name not in current:
+                adds.append(Change('add', name, {'name': name, 'params': params}))
+                continue
+            fields = diff(current[name], params)
+            if fields:
+                changed = dict((k, v) for k, v in params.items() if k in fields)
+                sets.append(Change('set', name, {'name': name, 'params': changed}, fields))
+            else:
+                unchanged.append(name)
+        deletes = []
+        if prune:
+            for name in sorted(current):
+                domain = current[name].get('domain') or {}
+                if name not in names and domain.get('domain-type') not in PROTECTED_DOMAIN_TYPES:
+                    deletes.append(Change('delete', name, {'name': name}))
+        return Plan(object_class, adds + sets + deletes, unchanged)
+
+    def apply(self, plan, callback=None):
+        """Makes the calls of a plan: additions, then updates, then deletions,
+        a bounded number at a time.
+
+        :param plan: A Plan.
+        :param callback: (optional) A function called with the number of
+            changes of the action done so far and the BulkItem just done.
+        :returns: A dictionary of 'add', 'set' and 'delete' to the BulkResult
+            of each, the specs being those of the plan's changes.
+        :rtype: dict
+        """
+        objects = plan.object_class(self.__cc)
+        results = {}
+        for action in ('add', 'set', 'delete'):
+            run_many = getattr(objects, action + '_many')
+            specs = [change.spec for change in plan.of(action)]
+            results[action] = run_many(specs, concurrency=self.concurrency, callback=callback)
+        return results
+
+    def reconcile(self, object_class, desired, prune=False, dry_run=False, callback=None):
+        """Plans the changes bringing the objects of a class to a desired
+        state, then makes them unless it is a dry run.
+
+        :param object_class: The object class (e.g. cpauto.Host).
+        :param desired: An iterable of dictionaries of the desired fields,
+            one per object, each with a name.
+        :param prune: (optional) Delete the objects of the class that are not
+            desired when true. Default is false.
+        :param dry_run: (optional) Only plan the changes when true.
+        :param callback: (optional) Passed to apply().
+        :raises CoreClientError: A page could not be fetched.
+        :returns: The Plan and the results of apply(), or None on a dry run.
+        :rtype: tuple
+        """
+        plan = self.plan(object_class, desired, prune=prune)
+        if dry_run:
+            return plan, None
+        return plan, self.apply(plan, callback=callback)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 Dana James Traversie and Check Point Software Technologies, Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# cpauto.objects.resolver
+# ~~~~~~~~~~~~~~~~~~~~~~~
+
+"""This module contains the resolver used to look up many objects by UID
+with few requests."""
+
+from ..core.exceptions import CoreClientError
+from ..core.sessions import CoreClientResult
+
+from collections import deque
+
+import threading
+
+class _Pending:
+    def __init__(self):
+        self.done = False
+        self.obj = None
+        self.error = None
+
+class UIDResolver:
+    """Resolves object UIDs, e.g. those referenced by rulebases and groups,
+    through the generic show-objects endpoint.
+
+    UIDs asked for by every thread using the resolver are queued together
+    and resolved ``chunk_size`` at a time, with at most ``concurrency``
+    show-objects requests in flight, so resolving thousands of UIDs takes a
+    handful of requests. UIDs found in the core client's object cache are
+    not requested, and resolved objects are added to it.
+
+    Basic Usage::
+      >>> import cpauto
+      >>> cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', cache=cpauto.ObjectCache())
+      >>> r = cc.login()
+      >>> resolver = cpauto.UIDResolver(cc)
+      >>> objects = resolver.resolve(['f8ae3f50-1b1d-4c5b-bd8a-6d1d7b4c7ab8', ...])
+      >>> objects['f8ae3f50-1b1d-4c5b-bd8a-6d1d7b4c7ab8']['name']
+      u'web-1'
+    """
+
+    def __init__(self, core_client, chunk_size=500, details_level='full', concurrency=2):
+        self.__cc = core_client
+        self.chunk_size = chunk_size
+        self.details_level = details_level
+        self.concurrency = concurrency
+        self.__cond = threading.Condition()
+        self.__queue = deque()
+        self.__pending = {}
+        self.__fetching = 0
+
+    def resolve(self, uids):
+        """Resolves UIDs to the objects they identify.
+
+        :param uids: The UIDs to resolve.
+        :raises CoreClientError: A show-objects request failed.
+        :returns: A dictionary of UIDs to read-only views of the objects, as
+            returned by CoreClientResult.json(). UIDs that do not identify an
+            object are left out.
+        :rtype: dict
+        """
+        objects = {}
+        cache = self.__cc.cache
+        wanted = []
+        seen = set()
+        for uid in uids:
+            if uid in seen:
+                continue
+            seen.add(uid)
+            cached = cache.find_uid(uid, self.details_level) if cache is not None else None
+            if cached is not None:
+                objects[uid] = cached.json()
+            else:
+                wanted.append(uid)
+        if not wanted:
+            return objects
+
+        with self.__cond:
+            pending = {}
+            for uid in wanted:
+                p = self.__pending.get(uid)
+                if p is None:
+                    p = self.__pending[uid] = _Pending()
+                    self.__queue.append(uid)
+                pending[uid] = p
+            while not all(p.done for p in pending.values()):
+                if self.__queue and self.__fetching < self.concurrency:
+                    # fetch the next chunk, whoever queued its UIDs
+                    chunk = [self.__queue.popleft() for _ in range(min(self.chunk_size, len(self.__queue)))]
+                    self.__fetching += 1
+                    found, error = {}, None
+                    self.__cond.release()
+                    try:
+                        found, error = self.__fetch(chunk)
+                    except BaseException as e:
+                        # e.g. KeyboardInterrupt; the chunk's waiters get it too
+                        error = e
+                        raise
+                    finally:
+                        self.__cond.acquire()
+                        self.__fetching -= 1
+                        for uid in chunk:
+                            p = self.__pending.pop(uid)
+                            p.obj = found.get(uid)
+                            p.error = error
+                            p.done = True
+                        self.__cond.notify_all()
+                else:
+                    self.__cond.wait()
+
+        for uid, p in pending.items():
+            if p.error is not None:
+                raise p.error
+            if p.obj is not None:
+                objects[uid] = p.obj
+        return objects
+
+    def __fetch(self, chunk):
+        # returns the objects found by UID and the error raised, if any
+        payload = { 'uids': chunk, 'limit': len(chunk), 'details-level': self.details_level }
+        try:
+            r = self.__cc.http_post('show-objects', payload=payload)
+            if r.status_code != 200:
+                message = r.json().get('message', 'Failed to resolve object UIDs')
+                raise CoreClientError(message, http_status_code=r.status_code)
+        except Exception as e:
+            return {}, e
+        found = {}
+        cache = self.__cc.cache
+        for obj in r.json().get('objects', []):
+            result = CoreClientResult(200, obj)
+            found[obj['uid']] = result.json()
+            if cache is not None and 'type' in obj:
+                show_payload = { 'uid': obj['uid'], 'details-level': self.details_level }
+                cache.put('show-' + obj['type'], show_payload, result)
+        return found, None
@@ -48,6 +48,7 @@ setup(
     tests_require=['pytest', 'pytest-cov', 'responses'],
     install_requires=[
         'requests>=2.11.1',
+        'futures>=3.0.5; python_version < "3"',
         ],
     cmdclass={'test': PyTest},
     author_email='dtravers@checkpoint.com',
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.aiosessions module."""
+
+import asyncio
+import pytest
+import responses
+import cpauto
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+@pytest.fixture
+def async_core_client(mgmt_server_base_uri):
+    core_client = cpauto.AsyncCoreClient('admin', 'vpn123', '10.11.12.13', verify=False)
+    with responses.RequestsMock() as rsps:
+        body = {"sid": "97BVpRfN4j81ogN-V2XqGYmw3DDwIhoSn0og8PiKDiM"}
+        rsps.add(responses.POST, mgmt_server_base_uri + 'login',
+            json=body, status=200, content_type='application/json')
+
+        r = run(core_client.login())
+        assert r.status_code == 200
+        assert r.json() == body
+    return core_client
+
+def test_http_post_sends_sid(async_core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        resp_body = {'foo': 'bar', 'message': 'OK'}
+        rsps.add(responses.POST, mgmt_server_base_uri + 'keepalive',
+                 json=resp_body, status=200,
+                 content_type='application/json')
+
+        r = run(async_core_client.keepalive())
+
+        assert r.status_code == 200
+        assert r.json() == resp_body
+        assert rsps.calls[0].request.headers['x-chkp-sid'] == "97BVpRfN4j81ogN-V2XqGYmw3DDwIhoSn0og8PiKDiM"
+
+def test_http_post_exceptions(async_core_client, mgmt_server_base_uri):
+    from requests.exceptions import ConnectionError
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'foo',
+                 body=ConnectionError(), status=200,
+                 content_type='application/json')
+
+        with pytest.raises(cpauto.ConnectionError):
+            run(async_core_client.http_post('foo', payload={}))
+
+def test_many_calls_in_flight(async_core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        resp_body = {'foo': 'bar', 'message': 'OK'}
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-host',
+                 json=resp_body, status=200,
+                 content_type='application/json')
+
+        h = cpauto.AsyncHost(async_core_client)
+
+        async def show_hosts():
+            return await asyncio.gather(*[h.show(name='host_{}'.format(i)) for i in range(50)])
+
+        results = run(show_hosts())
+
+        assert len(rsps.calls) == 50
+        assert all(r.status_code == 200 for r in results)
+
+@pytest.mark.parametrize("uid", [
+    (""),
+    ("someuid"),
+])
+def test_publish(async_core_client, mgmt_server_base_uri, uid):
+    task_id = "01234567-89ab-cdef-a930-8c37a59972b3"
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'publish',
+                 json={"task-id": task_id}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-task',
+                 json={"tasks": [{"task-id": task_id, "status": "succeeded"}]}, status=200,
+                 content_type='application/json')
+
+        r = run(async_core_client.publish(uid=uid))
+
+        assert r.status_code == 200
+        assert r.success
+        assert r.json()["tasks"][0]["status"] == "succeeded"
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'publish',
+                 json={"task-id": task_id}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-task',
+                 json={"message": "Server Busy"}, status=500,
+                 content_type='application/json')
+
+        with pytest.raises(cpauto.WaitOnTaskError):
+            run(async_core_client.publish(uid=uid))
+
+def test_run_script_failed(async_core_client, mgmt_server_base_uri):
+    task_id = "ef71cf6c-0066-48ca-85be-4d661802fe80"
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'run-script',
+                 json={"tasks": [{"task-id": task_id, "target": "gw-2200"}]}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-task',
+                 json={"tasks": [{"task-id": task_id, "status": "failed"}]}, status=200,
+                 content_type='application/json')
+
+        m = cpauto.AsyncMisc(async_core_client)
+        r = run(m.run_script(script="ls", name="List", targets="gw-2200"))
+
+        assert r.status_code == 200
+        assert r.success == False
+
+@pytest.mark.parametrize("method,resource", [
+    ("discard", "discard"),
+    ("keepalive", "keepalive"),
+    ("logout", "logout"),
+])
+def test_session_calls(async_core_client, mgmt_server_base_uri, method, resource):
+    with responses.RequestsMock() as rsps:
+        resp_body = {'message': 'OK'}
+        rsps.add(responses.POST, mgmt_server_base_uri + resource,
+                 json=resp_body, status=200,
+                 content_type='application/json')
+
+        r = run(getattr(async_core_client, method)())
+
+        assert r.status_code == 200
+        assert r.json() == resp_body
+
+def test_async_session(async_core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        resp_body = {'foo': 'bar', 'message': 'OK'}
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-session',
+                 json=resp_body, status=200,
+                 content_type='application/json')
+
+        s = cpauto.AsyncSession(async_core_client)
+        r = run(s.show(uid="someuid"))
+
+        assert r.status_code == 200
+        assert r.json() == resp_body
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.autopublish module."""
+
+import json
+
+import pytest
+import responses
+import cpauto
+
+def recording_callback(log, endpoint):
+    def callback(request):
+        log.append(endpoint)
+        return (200, {}, json.dumps({'name': json.loads(request.body).get('name', '')}))
+    return callback
+
+def mock_session(rsps, base_uri, log):
+    for endpoint in ('add-host', 'set-host', 'show-host', 'add-objects-batch', 'publish', 'discard'):
+        rsps.add_callback(responses.POST, base_uri + endpoint,
+                          callback=recording_callback(log, endpoint),
+                          content_type='application/json')
+
+def test_publishes_every_n_changes(core_client, mgmt_server_base_uri):
+    log = []
+    commits = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_session(rsps, mgmt_server_base_uri, log)
+
+        with cpauto.AutoPublisher(core_client, changes=3, on_commit=commits.append) as session:
+            host = cpauto.Host(session)
+            for i in range(7):
+                host.add(name='host_{}'.format(i), ipv4_address='10.0.0.1')
+                host.show(name='host_{}'.format(i))
+            assert session.pending == 1
+
+    assert [entry for entry in log if entry != 'show-host'] == \
+        ['add-host'] * 3 + ['publish'] + ['add-host'] * 3 + ['publish', 'add-host', 'publish']
+    assert [commit.changes for commit in session.commits] == [3, 3, 1]
+    assert commits == session.commits
+    assert all(commit.duration >= 0 for commit in commits)
+
+def test_publishes_after_seconds(core_client, mgmt_server_base_uri, clock):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_session(rsps, mgmt_server_base_uri, log)
+
+        with cpauto.AutoPublisher(core_client, changes=100, seconds=60, clock=clock) as session:
+            host = cpauto.Host(session)
+            host.set(name='host_0', params={'color': 'red'})
+            clock.now = 61
+            host.set(name='host_1', params={'color': 'red'})
+            host.set(name='host_2', params={'color': 'red'})
+
+    assert log == ['set-host', 'set-host', 'publish', 'set-host', 'publish']
+
+def test_batch_calls_count_every_object(core_client, mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_session(rsps, mgmt_server_base_uri, log)
+
+        with cpauto.AutoPublisher(core_client, changes=5) as session:
+            session.http_post('add-objects-batch', payload={'objects': [
+                {'type': 'host', 'list': [{'name': 'h{}'.format(i)} for i in range(4)]},
+                {'type': 'network', 'list': [{'name': 'n0'}]}]})
+
+    assert log == ['add-objects-batch', 'publish']
+    assert session.commits[0].changes == 5
+
+def test_discards_on_exception(core_client, mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_session(rsps, mgmt_server_base_uri, log)
+
+        with pytest.raises(ValueError):
+            with cpauto.AutoPublisher(core_client, changes=2) as session:
+                host = cpauto.Host(session)
+                for i in range(3):
+                    host.add(name='host_{}'.format(i), ipv4_address='10.0.0.1')
+                raise ValueError('import failed')
+
+    assert log == ['add-host', 'add-host', 'publish', 'add-host', 'discard']
+    assert session.pending == 0
+
+def test_failed_publish_raises(core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'add-host',
+                 json={'name': 'host_0'}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'publish',
+                 json={'code': 'err_publish_failed', 'message': 'Publish failed'}, status=500,
+                 content_type='application/json')
+
+        with pytest.raises(cpauto.CoreClientError) as excinfo:
+            with cpauto.AutoPublisher(core_client, changes=1) as session:
+                r = cpauto.Host(session).add(name='host_0', ipv4_address='10.0.0.1')
+                assert r.status_code == 200
+                assert session.error.http_status_code == 500
+    assert excinfo.value.http_status_code == 500
+    assert session.commits == []
+
+def test_failed_publish_stops_writes(core_client, mgmt_server_base_uri):
+    log = []
+    statuses = [500, 200]
+    def publish_callback(request):
+        log.append('publish')
+        return (statuses.pop(0), {}, json.dumps({'message': 'Publish failed'}))
+
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_session(rsps, mgmt_server_base_uri, log)
+        rsps.remove(responses.POST, mgmt_server_base_uri + 'publish')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'publish',
+                          callback=publish_callback, content_type='application/json')
+
+        with cpauto.AutoPublisher(core_client, changes=2) as session:
+            bulk = cpauto.Host(session).add_many(
+                [{'name': 'host_{}'.format(i), 'ipv4_address': '10.0.0.1'} for i in range(4)],
+                concurrency=1)
+            assert [item.ok for item in bulk] == [True, True, False, False]
+            assert 'earlier publish failed' in str(bulk.items[2].error)
+            assert session.pending == 2
+            assert session.error is not None
+
+    assert log == ['add-host', 'add-host', 'publish', 'publish']
+    assert session.error is None
+    assert [commit.changes for commit in session.commits] == [2]
+    assert session.pending == 0
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.cache module."""
+
+import json
+import threading
+
+import pytest
+import responses
+import cpauto
+
+def result(body, status_code=200):
+    return cpauto.CoreClientResult(status_code, body)
+
+def test_hit_by_name_and_uid():
+    cache = cpauto.ObjectCache()
+    r = result({'name': 'web-1', 'uid': 'u1'})
+    cache.put('show-host', {'name': 'web-1'}, r)
+    assert cache.get('show-host', {'name': 'web-1'}) is r
+    assert cache.get('show-host', {'uid': 'u1'}) is r
+    assert cache.get('show-host', {'uid': 'u1', 'details-level': 'full'}) is None
+    assert cache.get('show-network', {'name': 'web-1'}) is None
+    assert len(cache) == 1
+
+@pytest.mark.parametrize("endpoint,payload", [
+    ("show-hosts", {"limit": 50}),
+    ("show-host", {}),
+    ("show-host", {"name": "web-1", "limit": 1}),
+    ("show-access-rulebase", {"name": "Network"}),
+])
+def test_not_cacheable(endpoint, payload):
+    cache = cpauto.ObjectCache()
+    cache.put(endpoint, payload, result({'name': 'web-1', 'uid': 'u1'}))
+    assert cache.get(endpoint, payload) is None
+    assert len(cache) == 0
+
+def test_failures_are_not_cached():
+    cache = cpauto.ObjectCache()
+    cache.put('show-host', {'name': 'web-1'}, result({'code': 'generic_err_object_not_found'}, 404))
+    assert cache.get('show-host', {'name': 'web-1'}) is None
+
+def test_entries_expire(clock):
+    cache = cpauto.ObjectCache(ttl=10, clock=clock)
+    cache.put('show-host', {'name': 'web-1'}, result({'name': 'web-1', 'uid': 'u1'}))
+    clock.now = 9
+    assert cache.get('show-host', {'name': 'web-1'}) is not None
+    clock.now = 10
+    assert cache.get('show-host', {'name': 'web-1'}) is None
+    assert cache.get('show-host', {'uid': 'u1'}) is None
+
+def test_least_recently_used_are_evicted():
+    cache = cpauto.ObjectCache(max_size=4)
+    for i in range(3):
+        cache.put('show-host', {'name': 'h%d' % i}, result({'name': 'h%d' % i, 'uid': 'u%d' % i}))
+    assert len(cache) == 2
+    assert cache.get('show-host', {'name': 'h0'}) is None
+    assert cache.get('show-host', {'uid': 'u1'}) is not None
+    cache.put('show-host', {'name': 'h3'}, result({'name': 'h3', 'uid': 'u3'}))
+    assert cache.get('show-host', {'name': 'h1'}) is not None
+    assert cache.get('show-host', {'name': 'h2'}) is None
+
+def test_writes_invalidate_targets_and_groups():
+    cache = cpauto.ObjectCache()
+    cache.put('show-host', {'name': 'web-1'}, result({'name': 'web-1', 'uid': 'u1'}))
+    cache.put('show-host', {'name': 'web-2'}, result({'name': 'web-2', 'uid': 'u2'}))
+    cache.put('show-group', {'name': 'web'}, result({'name': 'web', 'uid': 'g1'}))
+    cache.put('show-network', {'name': 'web-1'}, result({'name': 'web-1', 'uid': 'n1'}))
+
+    cache.invalidate('set-host', {'uid': 'u1', 'groups': ['web']})
+
+    assert cache.get('show-host', {'name': 'web-1'}) is None
+    assert cache.get('show-group', {'name': 'web'}) is None
+    assert cache.get('show-host', {'name': 'web-2'}) is not None
+    assert cache.get('show-network', {'name': 'web-1'}) is not None
+
+def test_group_writes_invalidate_members():
+    cache = cpauto.ObjectCache()
+    cache.put('show-host', {'name': 'h1'}, result({'name': 'h1', 'uid': 'u1', 'groups': []}))
+    cache.put('show-network', {'name': 'n1'}, result({'name': 'n1', 'uid': 'u2', 'groups': []}))
+    cache.put('show-service-tcp', {'name': 'http'}, result({'name': 'http', 'uid': 'u3', 'groups': []}))
+
+    cache.invalidate('set-group', {'name': 'web', 'members': {'add': 'h1'}})
+
+    assert cache.get('show-host', {'name': 'h1'}) is None
+    assert cache.get('show-network', {'name': 'n1'}) is None
+    assert cache.get('show-service-tcp', {'name': 'http'}) is not None
+
+    cache.invalidate('add-service-group', {'name': 'web-services', 'members': ['http']})
+
+    assert cache.get('show-service-tcp', {'name': 'http'}) is None
+
+def test_core_client_group_write_refreshes_member(mgmt_server_base_uri):
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', cache=cpauto.ObjectCache())
+    with responses.RequestsMock() as rsps:
+        for groups in ([], [{'name': 'web', 'uid': 'g1'}]):
+            rsps.add(responses.POST, mgmt_server_base_uri + 'show-host',
+                     json={'name': 'h1', 'uid': 'u1', 'groups': groups}, status=200,
+                     content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'set-group',
+                 json={'name': 'web', 'uid': 'g1'}, status=200,
+                 content_type='application/json')
+
+        assert cpauto.Host(cc).show(name='h1').json()['groups'] == []
+        cpauto.Group(cc).set(name='web', params={'members': {'add': 'h1'}})
+        assert cpauto.Host(cc).show(name='h1').json()['groups'] == [{'name': 'web', 'uid': 'g1'}]
+
+def test_put_skips_results_read_before_an_invalidation():
+    cache = cpauto.ObjectCache()
+    generation = cache.generation('show-host')
+    cache.invalidate('set-host', {'name': 'h1', 'color': 'red'})
+    cache.put('show-host', {'name': 'h1'}, result({'name': 'h1', 'uid': 'u1'}), generation)
+    assert cache.get('show-host', {'name': 'h1'}) is None
+
+    generation = cache.generation('show-host')
+    cache.invalidate('set-service-tcp', {'name': 'http'})
+    cache.put('show-host', {'name': 'h1'}, result({'name': 'h1', 'uid': 'u1'}), generation)
+    assert cache.get('show-host', {'name': 'h1'}) is not None
+
+def test_core_client_read_racing_a_write_is_not_cached(mgmt_server_base_uri):
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', cache=cpauto.ObjectCache())
+    state = {'color': 'black'}
+    reading = threading.Event()
+    written = threading.Event()
+
+    def show(request):
+        body = json.dumps({'name': 'h1', 'uid': 'u1', 'color': state['color']})
+        if not reading.is_set():
+            reading.set()
+            written.wait(5)
+        return (200, {}, body)
+
+    def set_host(request):
+        state['color'] = 'red'
+        return (200, {}, json.dumps({'name': 'h1', 'uid': 'u1', 'color': 'red'}))
+
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-host', callback=show,
+                          content_type='application/json')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'set-host', callback=set_host,
+                          content_type='application/json')
+
+        reader = threading.Thread(target=cpauto.Host(cc).show, kwargs={'name': 'h1'})
+        reader.start()
+        assert reading.wait(5)
+        cpauto.Host(cc).set(name='h1', params={'color': 'red'})
+        written.set()
+        reader.join(5)
+
+        assert cpauto.Host(cc).show(name='h1').json()['color'] == 'red'
+        assert len(rsps.calls) == 3
+
+@pytest.mark.parametrize("endpoint", ["discard", "login", "logout", "run-script", "set-objects-batch"])
+def test_other_writes_flush(endpoint):
+    cache = cpauto.ObjectCache()
+    cache.put('show-host', {'name': 'web-1'}, result({'name': 'web-1', 'uid': 'u1'}))
+    cache.invalidate('keepalive', {})
+    cache.invalidate('publish', {})
+    assert len(cache) == 1
+    cache.invalidate(endpoint, {})
+    assert len(cache) == 0
+
+def test_core_client_serves_hits_from_cache(mgmt_server_base_uri):
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', cache=cpauto.ObjectCache())
+    host = cpauto.Host(cc)
+    with responses.RequestsMock() as rsps:
+        for name in ('web-1', 'web-2'):
+            rsps.add(responses.POST, mgmt_server_base_uri + 'show-host',
+                     json={'name': name, 'uid': 'u1'}, status=200,
+                     content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'set-host',
+                 json={'name': 'web-2', 'uid': 'u1'}, status=200,
+                 content_type='application/json')
+
+        assert host.show(name='web-1').json()['name'] == 'web-1'
+        assert host.show(name='web-1').json()['name'] == 'web-1'
+        assert host.show(uid='u1').json()['name'] == 'web-1'
+        assert len(rsps.calls) == 1
+
+        host.set(uid='u1', params={'new-name': 'web-2'})
+        assert host.show(uid='u1').json()['name'] == 'web-2'
+        assert len(rsps.calls) == 3
+    assert cc.metrics.count('cache.hits') == 2
+    assert cc.metrics.count('requests') == 3
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.jsoncodec module."""
+
+import json
+
+import pytest
+import responses
+import cpauto
+
+from cpauto.core import jsoncodec
+
+def available_codecs():
+    codecs = [cpauto.JSONCodec()]
+    if jsoncodec.orjson is not None:
+        codecs.append(cpauto.OrjsonCodec())
+    if jsoncodec.ujson is not None:
+        codecs.append(cpauto.UjsonCodec())
+    return codecs
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_round_trip(codec):
+    obj = {"name": u"höst", "tags": ["a", "b"], "port": 443, "enabled": True, "comments": None}
+    data = codec.dumps(obj)
+    assert isinstance(data, bytes)
+    assert json.loads(data.decode('utf-8')) == obj
+    assert codec.loads(data) == obj
+    assert codec.loads(data.decode('utf-8')) == obj
+
+def test_fastest_codec():
+    codec = cpauto.fastest_codec()
+    if jsoncodec.orjson is not None:
+        assert codec.name == 'orjson'
+    elif jsoncodec.ujson is not None:
+        assert codec.name == 'ujson'
+    else:
+        assert codec is jsoncodec.DEFAULT_CODEC
+
+class RecordingCodec(cpauto.JSONCodec):
+    def __init__(self):
+        self.dumped = []
+        self.loaded = 0
+
+    def dumps(self, obj):
+        self.dumped.append(obj)
+        return cpauto.JSONCodec.dumps(self, obj)
+
+    def loads(self, s):
+        self.loaded += 1
+        return cpauto.JSONCodec.loads(self, s)
+
+def test_core_client_uses_codec(mgmt_server_base_uri):
+    codec = RecordingCodec()
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', codec=codec)
+    with responses.RequestsMock() as rsps:
+        resp_body = {'uid': 'abc', 'name': 'h'}
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-host',
+                 json=resp_body, status=200,
+                 content_type='application/json')
+
+        r = cc.http_post('show-host', payload={'name': 'h'})
+
+        assert json.loads(rsps.calls[0].request.body.decode('utf-8')) == {'name': 'h'}
+        assert codec.dumped == [{'name': 'h'}]
+        assert r.json() == resp_body
+        assert r.json_copy() == resp_body
+        assert codec.loaded == 1
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.pipeline module."""
+
+import json
+import threading
+import time
+
+import pytest
+import responses
+import cpauto
+
+def logged_in_clients(rsps, base_uri):
+    sids = iter(['a', 'b'])
+    rsps.add_callback(responses.POST, base_uri + 'login',
+                      callback=lambda request: (200, {}, json.dumps({'sid': next(sids)})),
+                      content_type='application/json')
+    clients = [cpauto.CoreClient('admin', 'vpn123', '10.11.12.13') for _ in range(2)]
+    for cc in clients:
+        cc.login()
+    return clients
+
+def mock_sessions(rsps, base_uri, log, publish_started=None, publish_release=None, publish_statuses=None):
+    def write_callback(request):
+        log.append((request.headers['x-chkp-sid'], 'add-host'))
+        return (200, {}, json.dumps({'name': json.loads(request.body)['name']}))
+
+    def publish_callback(request):
+        if publish_started is not None:
+            publish_started.set()
+            publish_release.wait(5)
+        log.append((request.headers['x-chkp-sid'], 'publish'))
+        if publish_statuses:
+            return (publish_statuses.pop(0), {}, json.dumps({'message': 'Publish failed'}))
+        return (200, {}, json.dumps({}))
+
+    def discard_callback(request):
+        log.append((request.headers['x-chkp-sid'], 'discard'))
+        return (200, {}, json.dumps({}))
+
+    rsps.add_callback(responses.POST, base_uri + 'add-host', callback=write_callback,
+                      content_type='application/json')
+    rsps.add_callback(responses.POST, base_uri + 'publish', callback=publish_callback,
+                      content_type='application/json')
+    rsps.add_callback(responses.POST, base_uri + 'discard', callback=discard_callback,
+                      content_type='application/json')
+
+def test_sessions_alternate(mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_sessions(rsps, mgmt_server_base_uri, log)
+
+        with cpauto.PipelinedWriter(*logged_in_clients(rsps, mgmt_server_base_uri), changes=2) as writer:
+            host = cpauto.Host(writer)
+            for i in range(5):
+                host.add(name='host_{}'.format(i), ipv4_address='10.0.0.1')
+
+    writes = [sid for sid, endpoint in log if endpoint == 'add-host']
+    publishes = [sid for sid, endpoint in log if endpoint == 'publish']
+    assert writes == ['a', 'a', 'b', 'b', 'a']
+    assert publishes == ['a', 'b', 'a']
+    assert [commit.changes for commit in writer.commits] == [2, 2, 1]
+    assert writer.pending == 0
+
+def test_writes_continue_while_publishing(mgmt_server_base_uri):
+    log = []
+    started = threading.Event()
+    release = threading.Event()
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_sessions(rsps, mgmt_server_base_uri, log, started, release)
+
+        with cpauto.PipelinedWriter(*logged_in_clients(rsps, mgmt_server_base_uri), changes=2) as writer:
+            host = cpauto.Host(writer)
+            host.add(name='host_0', ipv4_address='10.0.0.1')
+            host.add(name='host_1', ipv4_address='10.0.0.1')
+            assert started.wait(5)
+            # session a is still publishing; session b takes the writes
+            host.add(name='host_2', ipv4_address='10.0.0.1')
+            assert log[-1] == ('b', 'add-host')
+            assert ('a', 'publish') not in log
+            release.set()
+
+    assert [commit.changes for commit in writer.commits] == [2, 1]
+
+def test_discards_both_sessions_on_exception(mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_sessions(rsps, mgmt_server_base_uri, log)
+
+        with pytest.raises(ValueError):
+            with cpauto.PipelinedWriter(*logged_in_clients(rsps, mgmt_server_base_uri), changes=2) as writer:
+                host = cpauto.Host(writer)
+                for i in range(3):
+                    host.add(name='host_{}'.format(i), ipv4_address='10.0.0.1')
+                raise ValueError('import failed')
+
+    assert ('a', 'publish') in log
+    assert ('b', 'discard') in log
+    assert ('a', 'discard') not in log
+    assert writer.pending == 0
+
+def wait_for_error(writer):
+    for _ in range(500):
+        if writer.error is not None:
+            return
+        time.sleep(0.01)
+
+def test_failed_publish_stops_writes(mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_sessions(rsps, mgmt_server_base_uri, log, publish_statuses=[500] * 3)
+
+        with pytest.raises(cpauto.CoreClientError) as excinfo:
+            with cpauto.PipelinedWriter(*logged_in_clients(rsps, mgmt_server_base_uri), changes=2) as writer:
+                host = cpauto.Host(writer)
+                results = [host.add(name='host_{}'.format(i), ipv4_address='10.0.0.1') for i in range(2)]
+                wait_for_error(writer)
+                errors = []
+                for i in range(2, 10):
+                    with pytest.raises(cpauto.CoreClientError) as refused:
+                        host.add(name='host_{}'.format(i), ipv4_address='10.0.0.1')
+                    errors.append(refused.value)
+
+    assert all(r.status_code == 200 for r in results)
+    assert all('earlier publish failed' in str(e) for e in errors)
+    assert [endpoint for sid, endpoint in log] == ['add-host', 'add-host', 'publish', 'publish']
+    assert excinfo.value.http_status_code == 500
+    assert writer.pending == 2
+    assert writer.commits == []
+
+def test_publish_recovers_from_failed_publish(mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_sessions(rsps, mgmt_server_base_uri, log, publish_statuses=[500])
+
+        with cpauto.PipelinedWriter(*logged_in_clients(rsps, mgmt_server_base_uri), changes=2) as writer:
+            host = cpauto.Host(writer)
+            for i in range(2):
+                host.add(name='host_{}'.format(i), ipv4_address='10.0.0.1')
+            wait_for_error(writer)
+            writer.publish()
+            assert writer.error is None
+            host.add(name='host_2', ipv4_address='10.0.0.1')
+
+    assert [endpoint for sid, endpoint in log] == ['add-host', 'add-host', 'publish', 'publish',
+                                                   'add-host', 'publish']
+    assert [commit.changes for commit in writer.commits] == [2, 1]
+    assert writer.pending == 0
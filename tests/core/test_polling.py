@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.polling module."""
+
+import itertools
+import pytest
+import responses
+import cpauto
+
+from cpauto.core.polling import (
+    DEFAULT_POLLING_STRATEGY,
+    ENDPOINT_POLLING_STRATEGIES,
+    polling_strategy_for
+)
+
+def test_delays_grow_to_cap():
+    strategy = cpauto.PollingStrategy(initial_delay=0.1, multiplier=2, max_delay=0.5, jitter=0)
+    delays = list(itertools.islice(strategy.delays(), 5))
+    assert delays == pytest.approx([0.1, 0.2, 0.4, 0.5, 0.5])
+
+def test_delays_jitter():
+    strategy = cpauto.PollingStrategy(initial_delay=1.0, multiplier=1, max_delay=1.0, jitter=0.25)
+    for delay in itertools.islice(strategy.delays(), 100):
+        assert 0.75 <= delay <= 1.25
+
+def test_delays_deadline():
+    now = [0.0]
+    strategy = cpauto.PollingStrategy(initial_delay=1.0, multiplier=1, jitter=0, deadline=2.5)
+    delays = []
+    for delay in strategy.delays(clock=lambda: now[0]):
+        delays.append(delay)
+        now[0] += delay
+    assert delays == pytest.approx([1.0, 1.0, 0.5])
+
+@pytest.mark.parametrize("endpoint,polling,expected", [
+    ("publish", None, ENDPOINT_POLLING_STRATEGIES["publish"]),
+    ("install-policy", None, ENDPOINT_POLLING_STRATEGIES["install-policy"]),
+    ("add-host", None, DEFAULT_POLLING_STRATEGY),
+    ("publish", {"install-policy": DEFAULT_POLLING_STRATEGY}, ENDPOINT_POLLING_STRATEGIES["publish"]),
+    ("publish", {"publish": DEFAULT_POLLING_STRATEGY}, DEFAULT_POLLING_STRATEGY),
+])
+def test_polling_strategy_for(endpoint, polling, expected):
+    assert polling_strategy_for(endpoint, polling) is expected
+
+def test_polling_strategy_for_everything():
+    strategy = cpauto.PollingStrategy()
+    assert polling_strategy_for("install-policy", strategy) is strategy
+
+def test_wait_on_task_deadline(mgmt_server_base_uri):
+    strategy = cpauto.PollingStrategy(initial_delay=0.01, jitter=0, deadline=0.05)
+    core_client = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', polling=strategy)
+    task_id = "01234567-89ab-cdef-a930-8c37a59972b3"
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'publish',
+                 json={"task-id": task_id}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-task',
+                 json={"tasks": [{"task-id": task_id, "status": "in progress"}]}, status=200,
+                 content_type='application/json')
+
+        with pytest.raises(cpauto.WaitOnTaskError):
+            core_client.publish()
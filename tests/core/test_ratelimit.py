@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.ratelimit module."""
+
+import threading
+
+import pytest
+import responses
+import cpauto
+
+def test_rate_limiter_allows_burst_then_paces(clock):
+    limiter = cpauto.RateLimiter(rate=10, burst=3, clock=clock, sleep=clock.sleep)
+    waits = [limiter.acquire() for _ in range(5)]
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3:] == pytest.approx([0.1, 0.1])
+    assert clock.now == pytest.approx(0.2)
+
+def test_rate_limiter_refills_over_time(clock):
+    limiter = cpauto.RateLimiter(rate=2, burst=2, clock=clock, sleep=clock.sleep)
+    limiter.acquire()
+    limiter.acquire()
+    clock.now += 10
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == pytest.approx(0.5)
+
+def test_concurrency_grows_while_healthy(clock):
+    concurrency = cpauto.AdaptiveConcurrency(initial=2, maximum=4, clock=clock)
+    for _ in range(10):
+        concurrency.release(concurrency.acquire())
+    assert concurrency.limit == 4
+
+def test_concurrency_shrinks_on_errors_and_latency(clock):
+    concurrency = cpauto.AdaptiveConcurrency(initial=8, latency_target=1.0, clock=clock)
+    concurrency.release(concurrency.acquire(), healthy=False)
+    assert concurrency.limit == 4
+    clock.now += 1
+    started = concurrency.acquire()
+    clock.now += 5
+    concurrency.release(started)
+    assert concurrency.limit == 2
+    clock.now += 1
+    for _ in range(5):
+        concurrency.release(concurrency.acquire(), healthy=False)
+        clock.now += 1
+    assert concurrency.limit == 1
+
+def test_concurrency_decreases_once_per_window(clock):
+    concurrency = cpauto.AdaptiveConcurrency(initial=8, clock=clock)
+    started = [concurrency.acquire() for _ in range(4)]
+    clock.now += 1
+    for s in started:
+        concurrency.release(s, healthy=False)
+    assert concurrency.limit == 4
+
+def test_concurrency_bounds_in_flight():
+    concurrency = cpauto.AdaptiveConcurrency(initial=1, maximum=1)
+    started = concurrency.acquire()
+    acquired = threading.Event()
+
+    def worker():
+        concurrency.release(concurrency.acquire())
+        acquired.set()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    assert not acquired.wait(0.1)
+    concurrency.release(started)
+    assert acquired.wait(5)
+    t.join()
+    assert concurrency.in_flight == 0
+
+def test_core_client_applies_limits(mgmt_server_base_uri, clock):
+    limiter = cpauto.RateLimiter(rate=5, burst=1, clock=clock, sleep=clock.sleep)
+    concurrency = cpauto.AdaptiveConcurrency(initial=4, clock=clock)
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', rate_limit=limiter, concurrency=concurrency)
+    endpoint = mgmt_server_base_uri + 'show-host'
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, endpoint,
+                 json={'uid': 'abc'}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, endpoint,
+                 json={'message': 'Internal error'}, status=500,
+                 content_type='application/json')
+        rsps.add(responses.POST, endpoint,
+                 json={'uid': 'abc'}, status=200,
+                 content_type='application/json')
+
+        cpauto.Host(cc).show(name='h')
+        clock.now += 1
+        r = cpauto.Host(cc).show(name='h')
+        assert r.status_code == 500
+        cpauto.Host(cc).show(name='h')
+
+    assert clock.now == pytest.approx(1.2)
+    assert cc.metrics.count('throttled') == 1
+    assert concurrency.limit == 2
+    assert concurrency.in_flight == 0
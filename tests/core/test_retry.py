@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.retry module."""
+
+import pytest
+import responses
+import cpauto
+
+from requests.exceptions import ConnectionError
+from requests.exceptions import ConnectTimeout
+from requests.exceptions import ReadTimeout
+from requests.exceptions import SSLError
+from requests.packages.urllib3.exceptions import MaxRetryError, NewConnectionError
+
+NO_WAIT = cpauto.PollingStrategy(initial_delay=0, jitter=0)
+
+def refused():
+    # what requests raises when the server refuses the connection
+    reason = NewConnectionError(None, 'Failed to establish a new connection: [Errno 111] Connection refused')
+    return ConnectionError(MaxRetryError(None, '/web_api/add-host', reason=reason))
+
+@pytest.mark.parametrize("endpoint,expected", [
+    ("show-host", True),
+    ("set-host", True),
+    ("delete-host", True),
+    ("keepalive", True),
+    ("add-host", False),
+    ("publish", False),
+    ("install-policy", False),
+])
+def test_is_idempotent(endpoint, expected):
+    assert cpauto.RetryPolicy().is_idempotent(endpoint) == expected
+
+@pytest.mark.parametrize("endpoint,kwargs,expected", [
+    ("add-host", {"status_code": 429}, True),
+    ("add-host", {"status_code": 503}, True),
+    ("add-host", {"status_code": 400, "data": {"code": "err_too_many_requests"}}, True),
+    ("add-host", {"status_code": 400, "data": {"message": "Management server is busy"}}, True),
+    ("add-host", {"error": ConnectTimeout()}, True),
+    ("add-host", {"error": refused()}, True),
+    ("add-host", {"status_code": 502}, False),
+    ("add-host", {"error": ReadTimeout()}, False),
+    ("add-host", {"error": ConnectionError()}, False),
+    ("show-host", {"status_code": 502}, True),
+    ("show-host", {"status_code": 500}, True),
+    ("show-host", {"error": ReadTimeout()}, True),
+    ("show-host", {"error": ConnectionError()}, True),
+    ("show-host", {"error": SSLError()}, False),
+    ("show-host", {"status_code": 404, "data": {"code": "generic_err_object_not_found"}}, False),
+    ("set-host", {"status_code": 409}, False),
+])
+def test_should_retry(endpoint, kwargs, expected):
+    assert cpauto.RetryPolicy().should_retry(endpoint, 1, **kwargs) == expected
+
+def test_should_retry_non_idempotent():
+    retry = cpauto.RetryPolicy(retry_non_idempotent=True)
+    assert retry.should_retry("add-host", 1, status_code=502)
+
+def test_should_retry_stops_at_max_attempts():
+    retry = cpauto.RetryPolicy(max_attempts=3)
+    assert retry.should_retry("show-host", 2, status_code=503)
+    assert not retry.should_retry("show-host", 3, status_code=503)
+
+def retrying_client(**kwargs):
+    return cpauto.CoreClient('admin', 'vpn123', '10.11.12.13',
+                             retry=cpauto.RetryPolicy(backoff=NO_WAIT, **kwargs))
+
+def test_core_client_retries_busy_server(mgmt_server_base_uri):
+    cc = retrying_client()
+    endpoint = mgmt_server_base_uri + 'add-host'
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, endpoint,
+                 json={'code': 'err_too_many_requests', 'message': 'Too many requests'}, status=429,
+                 content_type='application/json')
+        rsps.add(responses.POST, endpoint,
+                 json={'uid': 'abc'}, status=200,
+                 content_type='application/json')
+
+        r = cc.http_post('add-host', payload={'name': 'h'})
+
+        assert r.status_code == 200
+        assert len(rsps.calls) == 2
+    assert cc.metrics.count('requests') == 2
+    assert cc.metrics.count('retries') == 1
+    assert cc.metrics.count('retries.add-host') == 1
+
+def test_core_client_gives_up_after_max_attempts(mgmt_server_base_uri):
+    cc = retrying_client(max_attempts=2)
+    endpoint = mgmt_server_base_uri + 'show-host'
+    with responses.RequestsMock() as rsps:
+        for _ in range(2):
+            rsps.add(responses.POST, endpoint,
+                     json={'code': 'generic_server_error'}, status=502,
+                     content_type='application/json')
+
+        r = cc.http_post('show-host', payload={'name': 'h'})
+
+        assert r.status_code == 502
+        assert len(rsps.calls) == 2
+    assert cc.metrics.count('retries') == 1
+
+def test_core_client_does_not_retry_ambiguous_add(mgmt_server_base_uri):
+    cc = retrying_client()
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'add-host',
+                 body=ReadTimeout())
+
+        with pytest.raises(cpauto.Timeout):
+            cc.http_post('add-host', payload={'name': 'h'})
+
+        assert len(rsps.calls) == 1
+    assert cc.metrics.count('retries') == 0
+
+def test_core_client_retries_connection_errors(mgmt_server_base_uri):
+    cc = retrying_client(max_attempts=2)
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-host',
+                 body=ConnectionError())
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-host',
+                 body=ConnectionError())
+
+        with pytest.raises(cpauto.ConnectionError):
+            cc.http_post('show-host', payload={'name': 'h'})
+
+        assert len(rsps.calls) == 2
+    assert cc.metrics.count('retries') == 1
+
+def test_core_client_retries_refused_add(mgmt_server_base_uri):
+    cc = retrying_client(max_attempts=2)
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'add-host', body=refused())
+        rsps.add(responses.POST, mgmt_server_base_uri + 'add-host',
+                 json={'name': 'h'}, status=200, content_type='application/json')
+
+        r = cc.http_post('add-host', payload={'name': 'h'})
+
+        assert r.status_code == 200
+        assert len(rsps.calls) == 2
+    assert cc.metrics.count('retries') == 1
+
+def test_core_client_honours_retry_after(mgmt_server_base_uri, monkeypatch):
+    slept = []
+    monkeypatch.setattr('cpauto.core.sessions.time.sleep', slept.append)
+    cc = retrying_client()
+    endpoint = mgmt_server_base_uri + 'show-host'
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, endpoint,
+                 json={'message': 'Too many requests'}, status=429,
+                 headers={'Retry-After': '2'},
+                 content_type='application/json')
+        rsps.add(responses.POST, endpoint,
+                 json={'uid': 'abc'}, status=200,
+                 content_type='application/json')
+
+        r = cc.http_post('show-host', payload={'name': 'h'})
+
+        assert r.status_code == 200
+    assert slept == [2.0]
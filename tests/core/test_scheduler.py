@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.scheduler module."""
+
+import threading
+import time
+
+import pytest
+import responses
+import cpauto
+
+@pytest.mark.parametrize("endpoint,lane", [
+    ("show-host", "interactive"),
+    ("login", "interactive"),
+    ("publish", "interactive"),
+    ("show-task", "polling"),
+    ("add-host", "bulk"),
+    ("set-host", "bulk"),
+    ("delete-host", "bulk"),
+])
+def test_lane_for(endpoint, lane):
+    assert cpauto.RequestScheduler().lane_for(endpoint) == lane
+
+def test_lane_override():
+    scheduler = cpauto.RequestScheduler()
+    with scheduler.lane('bulk'):
+        assert scheduler.lane_for('show-host') == 'bulk'
+        with scheduler.lane('interactive'):
+            assert scheduler.lane_for('add-host') == 'interactive'
+        assert scheduler.lane_for('add-host') == 'bulk'
+    assert scheduler.lane_for('show-host') == 'interactive'
+    with pytest.raises(ValueError):
+        with scheduler.lane('urgent'):
+            pass
+
+def wait_for(predicate):
+    deadline = time.time() + 5
+    while not predicate():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+def test_interactive_overtakes_bulk():
+    scheduler = cpauto.RequestScheduler(max_in_flight=1)
+    token = scheduler.acquire('bulk')
+    order = []
+
+    def worker(lane):
+        scheduler.release(scheduler.acquire(lane))
+        order.append(lane)
+
+    bulk = threading.Thread(target=worker, args=('bulk',))
+    bulk.start()
+    wait_for(lambda: scheduler.queued('bulk') == 1)
+    interactive = threading.Thread(target=worker, args=('interactive',))
+    interactive.start()
+    wait_for(lambda: scheduler.queued('interactive') == 1)
+
+    scheduler.release(token)
+    bulk.join()
+    interactive.join()
+    assert order == ['interactive', 'bulk']
+    assert scheduler.in_flight == 0
+
+def test_polls_have_reserved_slots():
+    scheduler = cpauto.RequestScheduler(max_in_flight=1, polling_slots=1)
+    token = scheduler.acquire('bulk')
+    poll = scheduler.acquire('polling')
+    scheduler.release(poll)
+    scheduler.release(token)
+    assert scheduler.in_flight == 0
+
+def test_full_lane_raises_without_blocking():
+    scheduler = cpauto.RequestScheduler(max_in_flight=1, max_queued=1, block=False)
+    token = scheduler.acquire('bulk')
+    waiter = threading.Thread(target=lambda: scheduler.release(scheduler.acquire('bulk')))
+    waiter.start()
+    wait_for(lambda: scheduler.queued('bulk') == 1)
+
+    with pytest.raises(cpauto.SchedulerFull):
+        scheduler.acquire('bulk')
+
+    scheduler.release(token)
+    waiter.join()
+    assert scheduler.in_flight == 0
+
+def test_core_client_uses_scheduler(mgmt_server_base_uri):
+    scheduler = cpauto.RequestScheduler(max_in_flight=2)
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', scheduler=scheduler)
+    seen = []
+
+    def callback(request):
+        seen.append(scheduler.in_flight)
+        return (200, {}, '{"uid": "abc"}')
+
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'add-host',
+                          callback=callback, content_type='application/json')
+
+        with scheduler.lane('bulk'):
+            r = cpauto.Host(cc).add(name='h', ipv4_address='10.0.0.1')
+
+        assert r.status_code == 200
+    assert seen == [1]
+    assert scheduler.in_flight == 0
@@ -2,6 +2,11 @@
 
 """Tests for cpauto.core.sessions module."""
 
+import json
+import sys
+import threading
+import time
+
 import pytest
 import responses
 import cpauto
@@ -222,3 +227,204 @@ class TestLoginMessage:
 
                 assert r.status_code == 200
                 assert r.json() == resp_body
+
+def test_http_session_is_pooled(core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        resp_body = {'foo': 'bar', 'message': 'OK'}
+        rsps.add(responses.POST, mgmt_server_base_uri + 'keepalive',
+                 json=resp_body, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'logout',
+                 json=resp_body, status=200,
+                 content_type='application/json')
+
+        http_session = core_client._CoreClient__http_session
+        assert http_session is not None
+
+        core_client.keepalive()
+        core_client.keepalive()
+        assert core_client._CoreClient__http_session is http_session
+
+        adapter = http_session.get_adapter(mgmt_server_base_uri)
+        assert adapter._pool_maxsize == 10
+
+        r = core_client.logout()
+
+        assert r.status_code == 200
+        assert core_client._CoreClient__http_session is None
+
+def test_pool_size():
+    core_client = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', pool_size=32)
+    http_session = core_client._CoreClient__get_http_session()
+    adapter = http_session.get_adapter('https://10.11.12.13:443/web_api/login')
+    assert adapter._pool_maxsize == 32
+    core_client.close()
+    assert core_client._CoreClient__http_session is None
+
+def test_http_session_is_created_once(monkeypatch):
+    created = []
+    start = threading.Event()
+    real_session = cpauto.core.sessions.requests.Session
+
+    def slow_session():
+        created.append(1)
+        time.sleep(0.01)
+        return real_session()
+
+    monkeypatch.setattr(cpauto.core.sessions.requests, 'Session', slow_session)
+    core_client = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13')
+    sessions = []
+
+    def get():
+        start.wait(5)
+        sessions.append(core_client._CoreClient__get_http_session())
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for t in threads:
+        t.start()
+    start.set()
+    for t in threads:
+        t.join()
+
+    assert len(created) == 1
+    assert all(http_session is sessions[0] for http_session in sessions)
+    core_client.close()
+
+def test_wait_on_many_tasks(mgmt_server_base_uri):
+    import json
+    strategy = cpauto.PollingStrategy(initial_delay=0.01, jitter=0)
+    core_client = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', polling=strategy)
+    task_ids = ["task-a", "task-b", "task-c"]
+    def tasks(*statuses):
+        return {'tasks': [{'task-id': t, 'status': s} for t, s in zip(task_ids, statuses)]}
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'install-policy',
+                 json={'tasks': [{'task-id': t} for t in task_ids]}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-task',
+                 json=tasks('in progress', 'in progress', 'in progress'), status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-task',
+                 json={'tasks': [{'task-id': 'task-a', 'status': 'succeeded'},
+                                 {'task-id': 'task-b', 'status': 'in progress'},
+                                 {'task-id': 'task-c', 'status': 'succeeded'}]}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-task',
+                 json={'tasks': [{'task-id': 'task-b', 'status': 'succeeded'}]}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-task',
+                 json=tasks('succeeded', 'succeeded', 'succeeded'), status=200,
+                 content_type='application/json')
+
+        r = cpauto.Policy(core_client).install(targets=["gw1", "gw2", "gw3"])
+
+        assert r.status_code == 200
+        assert r.success
+        assert r.json() == tasks('succeeded', 'succeeded', 'succeeded')
+
+        polled = [json.loads(call.request.body)["task-id"] for call in rsps.calls[1:]]
+        assert polled == [task_ids, task_ids, ["task-b"], task_ids]
+
+        details_levels = [json.loads(call.request.body)["details-level"] for call in rsps.calls[1:]]
+        assert details_levels == ["standard", "standard", "standard", "full"]
+
+def test_concurrent_waits_share_polls(mgmt_server_base_uri):
+    import json
+    import threading
+    strategy = cpauto.PollingStrategy(initial_delay=0.05, max_delay=0.05, jitter=0)
+    core_client = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', polling=strategy)
+    task_ids = ["task-{}".format(i) for i in range(8)]
+    polls = {}
+    def show_task(request):
+        body = json.loads(request.body)
+        if body["details-level"] == "standard":
+            for task_id in body["task-id"]:
+                polls[task_id] = polls.get(task_id, 0) + 1
+        status = "succeeded" if polls.get(body["task-id"][0], 0) >= 3 else "in progress"
+        tasks = [{"task-id": task_id, "status": status} for task_id in body["task-id"]]
+        return (200, {}, json.dumps({"tasks": tasks}))
+    with responses.RequestsMock() as rsps:
+        for task_id in task_ids:
+            rsps.add(responses.POST, mgmt_server_base_uri + 'publish',
+                     json={"task-id": task_id}, status=200,
+                     content_type='application/json')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-task',
+                          callback=show_task, content_type='application/json')
+
+        results = []
+        def publish():
+            results.append(core_client.publish())
+        threads = [threading.Thread(target=publish) for _ in task_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(results) == len(task_ids)
+        assert all(r.success for r in results)
+        standard_polls = [call for call in rsps.calls if call.request.url.endswith('show-task')
+                          and json.loads(call.request.body)["details-level"] == "standard"]
+        assert len(standard_polls) < 3 * len(task_ids)
+
+def test_result_json_is_decoded_lazily_once():
+    r = cpauto.CoreClientResult(200, raw=b'{"uid": "abc", "tags": ["a"]}')
+    assert r.raw == b'{"uid": "abc", "tags": ["a"]}'
+    view = r.json()
+    assert view == {"uid": "abc", "tags": ["a"]}
+    assert r.raw is None
+    if sys.version_info >= (3, 3):
+        assert r.json() is view
+    else:
+        assert r.json() is not view
+
+def test_http_post_leaves_body_undecoded(mgmt_server_base_uri):
+    core_client = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', single_flight=False)
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-access-rulebase',
+                 json={'rulebase': [{'uid': 'rule_1'}], 'total': 1}, status=200,
+                 content_type='application/json')
+
+        r = cpauto.AccessRule(core_client).show_all(name='Network')
+
+    assert r.raw is not None
+    assert r.json()['rulebase'] == [{'uid': 'rule_1'}]
+    assert r.raw is None
+    assert r.json_copy() == {'rulebase': [{'uid': 'rule_1'}], 'total': 1}
+
+def test_result_json_copy_is_mutable():
+    r = cpauto.CoreClientResult(200, raw=b'{"uid": "abc", "tags": ["a"]}')
+    copy = r.json_copy()
+    copy["uid"] = "def"
+    copy["tags"].append("b")
+    assert r.json() == {"uid": "abc", "tags": ["a"]}
+
+@pytest.mark.skipif(sys.version_info < (3, 3), reason="read-only views require Python 3.3+")
+def test_result_json_is_read_only():
+    r = cpauto.CoreClientResult(200, {"uid": "abc"})
+    with pytest.raises(TypeError):
+        r.json()["uid"] = "def"
+
+def test_sid_header_follows_login(core_client, mgmt_server_base_uri):
+    sids = iter(['sid-1', 'sid-2'])
+    seen = []
+
+    def login_callback(request):
+        return (200, {}, json.dumps({'sid': next(sids)}))
+
+    def keepalive_callback(request):
+        seen.append(request.headers.get('x-chkp-sid'))
+        return (200, {}, json.dumps({'message': 'OK'}))
+
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'login',
+                          callback=login_callback, content_type='application/json')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'keepalive',
+                          callback=keepalive_callback, content_type='application/json')
+
+        core_client.login()
+        core_client.keepalive()
+        core_client.keepalive()
+        core_client.login()
+        core_client.keepalive()
+
+    assert seen == ['sid-1', 'sid-1', 'sid-2']
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.singleflight module."""
+
+import threading
+import time
+
+import responses
+import cpauto
+
+from cpauto.core.singleflight import SingleFlight, request_key
+
+def test_request_key_ignores_member_order():
+    assert request_key('show-package', {'name': 'p', 'details-level': 'full'}) == \
+        request_key('show-package', {'details-level': 'full', 'name': 'p'})
+    assert request_key('show-package', {'name': 'p'}) != request_key('show-package', {'name': 'q'})
+    assert request_key('show-package', {'name': 'p'}, True) != request_key('show-package', {'name': 'p'}, False)
+
+def run_concurrently(flight, key, fn, followers=3):
+    started = threading.Event()
+    release = threading.Event()
+    outcomes = []
+
+    def leader_fn():
+        started.set()
+        release.wait(5)
+        return fn()
+
+    def call(f):
+        try:
+            outcomes.append(flight.do(key, f))
+        except Exception as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=call, args=(leader_fn,))]
+    threads[0].start()
+    started.wait(5)
+    for _ in range(followers):
+        t = threading.Thread(target=call, args=(fn,))
+        t.start()
+        threads.append(t)
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+    return outcomes
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return 'result'
+
+    outcomes = run_concurrently(flight, 'k', fn)
+    assert len(calls) == 1
+    assert sorted(outcomes) == [('result', False)] + [('result', True)] * 3
+
+    assert flight.do('k', fn) == ('result', False)
+    assert len(calls) == 2
+
+def test_errors_are_shared():
+    flight = SingleFlight()
+
+    def fn():
+        raise cpauto.ConnectionError('Connection error')
+
+    outcomes = run_concurrently(flight, 'k', fn)
+    assert len(outcomes) == 4
+    assert all(isinstance(outcome, cpauto.ConnectionError) for outcome in outcomes)
+
+def test_core_client_shares_concurrent_reads(mgmt_server_base_uri):
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13')
+    started = threading.Event()
+    release = threading.Event()
+
+    def callback(request):
+        started.set()
+        release.wait(5)
+        return (200, {}, '{"name": "standard", "uid": "p1"}')
+
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-package',
+                          callback=callback, content_type='application/json')
+
+        results = []
+        show = lambda: results.append(cpauto.PolicyPackage(cc).show(name='standard'))
+        threads = [threading.Thread(target=show)]
+        threads[0].start()
+        started.wait(5)
+        for _ in range(3):
+            threads.append(threading.Thread(target=show))
+            threads[-1].start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert len(rsps.calls) == 1
+    assert len(results) == 4
+    assert all(r is results[0] for r in results)
+    assert cc.metrics.count('single_flight.shared') == 3
+
+def test_core_client_reads_after_a_write_do_not_join_earlier_reads(mgmt_server_base_uri):
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13')
+    state = {'color': 'black'}
+    started = threading.Event()
+    release = threading.Event()
+
+    def show(request):
+        body = '{"name": "h1", "color": "%s"}' % state['color']
+        if not started.is_set():
+            started.set()
+            release.wait(5)
+        return (200, {}, body)
+
+    def set_host(request):
+        state['color'] = 'red'
+        return (200, {}, '{"name": "h1", "color": "red"}')
+
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-host',
+                          callback=show, content_type='application/json')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'set-host',
+                          callback=set_host, content_type='application/json')
+
+        earlier = threading.Thread(target=cpauto.Host(cc).show, kwargs={'name': 'h1'})
+        earlier.start()
+        started.wait(5)
+        cpauto.Host(cc).set(name='h1', params={'color': 'red'})
+        try:
+            assert cpauto.Host(cc).show(name='h1').json()['color'] == 'red'
+        finally:
+            release.set()
+            earlier.join()
+
+        assert len(rsps.calls) == 3
+    assert cc.metrics.count('single_flight.shared') == 0
+
+def test_core_client_single_flight_can_be_disabled(mgmt_server_base_uri):
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', single_flight=False)
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-package',
+                 json={'name': 'standard'}, status=200,
+                 content_type='application/json')
+
+        cpauto.PolicyPackage(cc).show(name='standard')
+        assert len(rsps.calls) == 1
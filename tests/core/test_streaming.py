@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.streaming module."""
+
+import json
+import pytest
+
+from cpauto.core.streaming import iter_json_items
+
+DOCUMENT = {
+    "from": 1,
+    "to": 3,
+    "rulebase": [
+        {"name": "r\"1\\", "x": [1, 2, {"y": "]}"}], "n": None},
+        {"comments": u"café 中"},
+        3, "s", True, None, -1.5e3
+    ],
+    "objects-dictionary": [{"uid": "a"}],
+    "total": 3,
+    "other": {"a": [1, {"b": "}"}]},
+    "empty": []
+}
+
+EXPECTED = ([("rulebase", item) for item in DOCUMENT["rulebase"]] +
+            [("objects-dictionary", item) for item in DOCUMENT["objects-dictionary"]])
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_iter_json_items_chunks(size):
+    data = json.dumps(DOCUMENT, ensure_ascii=False, indent=2).encode('utf-8')
+    items = list(iter_json_items(chunked(data, size), ("rulebase", "objects-dictionary", "empty")))
+    assert items == EXPECTED
+
+def test_iter_json_items_text():
+    data = json.dumps(DOCUMENT)
+    items = list(iter_json_items(chunked(data, 5), ("objects-dictionary",)))
+    assert items == [("objects-dictionary", {"uid": "a"})]
+
+def test_iter_json_items_is_lazy():
+    def chunks():
+        yield b'{"objects": [{"a": 1},'
+        raise AssertionError("read too far")
+    items = iter_json_items(chunks(), ("objects",))
+    assert next(items) == ("objects", {"a": 1})
+
+@pytest.mark.parametrize("data", [
+    b'{}',
+    b'  { }  ',
+    b'{"objects": []}',
+    b'{"objects": 5}',
+])
+def test_iter_json_items_nothing(data):
+    assert list(iter_json_items([data], ("objects",))) == []
+
+@pytest.mark.parametrize("data", [
+    b'[]',
+    b'{"objects": [1, 2',
+    b'{"objects": [1; 2]}',
+    b'{"objects": [{"a": "b"',
+])
+def test_iter_json_items_invalid(data):
+    with pytest.raises(ValueError):
+        list(iter_json_items([data], ("objects",)))
+
+def test_iter_json_items_loads():
+    data = b'{"objects": [{"a": 1}, {"a": 2}]}'
+    items = iter_json_items([data], ("objects",), loads=lambda text: len(text))
+    assert [item for _, item in items] == [8, 8]
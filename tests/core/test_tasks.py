@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.tasks module."""
+
+import json
+import threading
+import pytest
+import responses
+import cpauto
+
+@pytest.fixture
+def core_client():
+    strategy = cpauto.PollingStrategy(initial_delay=0.01, max_delay=0.02, jitter=0)
+    return cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', wait_for_tasks=False, polling=strategy)
+
+def show_task_callback(statuses):
+    # answers show-task from a dictionary of task id to list of statuses
+    def callback(request):
+        body = json.loads(request.body)
+        task_ids = body["task-id"]
+        tasks = []
+        for task_id in task_ids:
+            status = statuses[task_id][0]
+            if body["details-level"] == "standard" and len(statuses[task_id]) > 1:
+                statuses[task_id].pop(0)
+            progress = 100 if status != "in progress" else 50
+            tasks.append({"task-id": task_id, "status": status, "progress-percentage": progress})
+        return (200, {}, json.dumps({"tasks": tasks}))
+    return callback
+
+def test_no_handle_when_waiting(mgmt_server_base_uri):
+    core_client = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13')
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-host',
+                 json={'foo': 'bar'}, status=200,
+                 content_type='application/json')
+
+        r = cpauto.Host(core_client).show(name='foo')
+
+        assert r.task is None
+
+def test_result(core_client, mgmt_server_base_uri):
+    task_id = "01234567-89ab-cdef-a930-8c37a59972b3"
+    statuses = {task_id: ["in progress", "in progress", "succeeded"]}
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'publish',
+                 json={"task-id": task_id}, status=200,
+                 content_type='application/json')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-task',
+                          callback=show_task_callback(statuses),
+                          content_type='application/json')
+
+        r = core_client.publish()
+
+        assert r.json() == {"task-id": task_id}
+        handle = r.task
+        assert handle.task_ids == [task_id]
+        assert handle.progress() in (0, 50)
+
+        task_r = handle.result(timeout=5)
+
+        assert handle.done()
+        assert handle.progress() == 100
+        assert handle.exception() is None
+        assert task_r.success
+        assert task_r.json()["tasks"][0]["status"] == "succeeded"
+        assert json.loads(rsps.calls[-1].request.body)["details-level"] == "full"
+
+def test_failed_task(core_client, mgmt_server_base_uri):
+    task_id = "ef71cf6c-0066-48ca-85be-4d661802fe80"
+    statuses = {task_id: ["failed"]}
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'run-script',
+                 json={"tasks": [{"task-id": task_id, "target": "gw-2200"}]}, status=200,
+                 content_type='application/json')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-task',
+                          callback=show_task_callback(statuses),
+                          content_type='application/json')
+
+        r = cpauto.Misc(core_client).run_script(script="ls", name="List", targets="gw-2200")
+        task_r = r.task.result(timeout=5)
+
+        assert task_r.success == False
+        assert task_r.message == "There was at least one task that failed or partially succeeded"
+
+def test_error_while_polling(core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'publish',
+                 json={"task-id": "sometaskid"}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-task',
+                 json={"message": "Server Busy"}, status=500,
+                 content_type='application/json')
+
+        handle = core_client.publish().task
+
+        with pytest.raises(cpauto.WaitOnTaskError):
+            handle.result(timeout=5)
+        assert isinstance(handle.exception(), cpauto.WaitOnTaskError)
+
+def test_result_timeout(core_client, mgmt_server_base_uri):
+    statuses = {"sometaskid": ["in progress"]}
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'publish',
+                 json={"task-id": "sometaskid"}, status=200,
+                 content_type='application/json')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-task',
+                          callback=show_task_callback(statuses),
+                          content_type='application/json')
+
+        handle = core_client.publish().task
+
+        with pytest.raises(cpauto.Timeout):
+            handle.result(timeout=0.05)
+        assert not handle.done()
+
+        statuses["sometaskid"] = ["succeeded"]
+        assert handle.result(timeout=5).success
+
+def test_callbacks_and_coalescing(core_client, mgmt_server_base_uri):
+    task_ids = ["task-{}".format(i) for i in range(10)]
+    statuses = dict((task_id, ["in progress", "in progress", "succeeded"]) for task_id in task_ids)
+    with responses.RequestsMock() as rsps:
+        for task_id in task_ids:
+            rsps.add(responses.POST, mgmt_server_base_uri + 'install-policy',
+                     json={"tasks": [{"task-id": task_id}]}, status=200,
+                     content_type='application/json')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-task',
+                          callback=show_task_callback(statuses),
+                          content_type='application/json')
+
+        done = []
+        all_done = threading.Event()
+        def on_done(handle):
+            done.append(handle.task_ids[0])
+            if len(done) == len(task_ids):
+                all_done.set()
+
+        p = cpauto.Policy(core_client)
+        handles = [p.install(targets="gw-{}".format(i)).task for i in range(10)]
+        for handle in handles:
+            handle.add_done_callback(on_done)
+
+        assert all_done.wait(5)
+        assert sorted(done) == sorted(task_ids)
+        assert all(handle.result(timeout=0).success for handle in handles)
+
+        polls = [json.loads(call.request.body) for call in rsps.calls
+                 if call.request.url.endswith('show-task')]
+        standard = [poll for poll in polls if poll["details-level"] == "standard"]
+        assert max(len(poll["task-id"]) for poll in standard) > 1
+
+    handle = handles[0]
+    called = []
+    handle.add_done_callback(called.append)
+    assert called == [handle]
+
+def test_unknown_task_only_holds_up_its_handle(core_client, mgmt_server_base_uri):
+    def show_task(request):
+        body = json.loads(request.body)
+        if "bad" in body["task-id"]:
+            return (404, {}, json.dumps({"message": "Task not found"}))
+        tasks = [{"task-id": task_id, "status": "succeeded"} for task_id in body["task-id"]]
+        return (200, {}, json.dumps({"tasks": tasks}))
+
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'publish',
+                 json={"task-id": "bad"}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'discard',
+                 json={"task-id": "good"}, status=200,
+                 content_type='application/json')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-task',
+                          callback=show_task, content_type='application/json')
+
+        bad = core_client.publish().task
+        good = core_client.discard().task
+        bad.done()
+
+        assert good.result(timeout=5).success
+        assert not bad.done()
+
+def test_error_only_fails_handles_whose_poll_failed(core_client, mgmt_server_base_uri):
+    def show_task(request):
+        body = json.loads(request.body)
+        if len(body["task-id"]) > 1:
+            raise cpauto.ConnectionError("Connection reset")
+        if body["task-id"] == ["bad"]:
+            return (500, {}, json.dumps({"message": "Server Busy"}))
+        tasks = [{"task-id": task_id, "status": "succeeded"} for task_id in body["task-id"]]
+        return (200, {}, json.dumps({"tasks": tasks}))
+
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'publish',
+                 json={"task-id": "bad"}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'discard',
+                 json={"task-id": "good"}, status=200,
+                 content_type='application/json')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-task',
+                          callback=show_task, content_type='application/json')
+
+        bad = core_client.publish().task
+        good = core_client.discard().task
+        for handle in (bad, good):
+            handle.done()
+
+        with pytest.raises(cpauto.WaitOnTaskError):
+            bad.result(timeout=5)
+        assert good.result(timeout=5).success
+
+def test_malformed_reply_fails_handles_and_poller_restarts(core_client, mgmt_server_base_uri):
+    replies = [{"tasks": [{"status": "succeeded"}]}]
+    def show_task(request):
+        body = json.loads(request.body)
+        if replies:
+            return (200, {}, json.dumps(replies.pop(0)))
+        tasks = [{"task-id": task_id, "status": "succeeded"} for task_id in body["task-id"]]
+        return (200, {}, json.dumps({"tasks": tasks}))
+
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'publish',
+                 json={"task-id": "first"}, status=200,
+                 content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'discard',
+                 json={"task-id": "second"}, status=200,
+                 content_type='application/json')
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-task',
+                          callback=show_task, content_type='application/json')
+
+        first = core_client.publish().task
+        with pytest.raises(KeyError):
+            first.result(timeout=5)
+
+        second = core_client.discard().task
+        assert second.result(timeout=5).success
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.core.writerpool module."""
+
+import json
+import threading
+
+import pytest
+import responses
+import cpauto
+
+def clients(count):
+    return [cpauto.CoreClient('admin', 'vpn123', '10.11.12.13') for _ in range(count)]
+
+def mock_sessions(rsps, base_uri, log, publish_status=200):
+    sids = iter('abcd')
+    lock = threading.Lock()
+
+    def record(request, endpoint):
+        with lock:
+            log.append((request.headers.get('x-chkp-sid'), endpoint, json.loads(request.body).get('name')))
+
+    def login_callback(request):
+        return (200, {}, json.dumps({'sid': next(sids)}))
+
+    def callback(endpoint, status=200):
+        def handle(request):
+            record(request, endpoint)
+            return (status, {}, json.dumps({'name': json.loads(request.body).get('name')}))
+        return handle
+
+    rsps.add_callback(responses.POST, base_uri + 'login', callback=login_callback,
+                      content_type='application/json')
+    for endpoint in ('add-host', 'add-group', 'set-group', 'discard', 'logout'):
+        rsps.add_callback(responses.POST, base_uri + endpoint, callback=callback(endpoint),
+                          content_type='application/json')
+    rsps.add_callback(responses.POST, base_uri + 'publish', callback=callback('publish', publish_status),
+                      content_type='application/json')
+
+def sessions_of(log, endpoint):
+    return dict((name, sid) for sid, e, name in log if e == endpoint)
+
+def test_writes_are_partitioned_by_name(mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_sessions(rsps, mgmt_server_base_uri, log)
+        specs = [{'name': 'host_{}'.format(i), 'ipv4_address': '10.0.0.{}'.format(i)} for i in range(8)]
+
+        with cpauto.WriterPool(clients(4)) as pool:
+            result = pool.run(cpauto.Host, 'add', specs)
+
+    assert not result.failed
+    assert [item.spec['name'] for item in result] == [spec['name'] for spec in specs]
+    sids = sessions_of(log, 'add-host')
+    assert sorted(list(sids.values()).count(sid) for sid in 'abcd') == [2, 2, 2, 2]
+    assert [sid for sid, endpoint, name in log if endpoint == 'publish'] == ['a', 'b', 'c', 'd']
+    assert [commit.changes for commit in pool.commits] == [2, 2, 2, 2]
+    assert len([1 for sid, endpoint, name in log if endpoint == 'logout']) == 4
+
+def test_group_members_share_a_session():
+    pool = cpauto.WriterPool(clients(3))
+    specs = [{'name': 'h0'}, {'name': 'h1'}, {'name': 'h2'}, {'name': 'h3'}, {'name': 'h4'},
+             {'name': 'g1', 'params': {'members': ['h0', 'h1', 'h2']}},
+             {'name': 'g2', 'members': 'h3'},
+             {'name': 'g3', 'params': {'members': {'add': ['h2'], 'remove': ['h4']}}}]
+
+    partitions = pool.partition(specs)
+
+    names = [set(spec['name'] for index, spec in partition) for partition in partitions]
+    assert set(['h0', 'h1', 'h2', 'h4', 'g1', 'g3']) in names
+    assert set(['h3', 'g2']) in names
+    assert set() in names
+    for partition in partitions:
+        assert [index for index, spec in partition] == sorted(index for index, spec in partition)
+
+def test_assignments_stick_across_runs(mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_sessions(rsps, mgmt_server_base_uri, log)
+
+        with cpauto.WriterPool(clients(3)) as pool:
+            pool.run(cpauto.Host, 'add', [{'name': 'h{}'.format(i), 'ipv4_address': '10.0.0.1'} for i in range(3)])
+            result = pool.run(cpauto.Group, 'add', [{'name': 'g{}'.format(i), 'params': {'members': ['h{}'.format(i)]}}
+                                                    for i in range(3)])
+
+    assert not result.failed
+    host_sids = sessions_of(log, 'add-host')
+    group_sids = sessions_of(log, 'add-group')
+    for i in range(3):
+        assert host_sids['h{}'.format(i)] == group_sids['g{}'.format(i)]
+    assert [endpoint for sid, endpoint, name in log].count('publish') == 3
+
+def test_partition_across_sessions_publishes_first(mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_sessions(rsps, mgmt_server_base_uri, log)
+
+        with cpauto.WriterPool(clients(2)) as pool:
+            pool.run(cpauto.Host, 'add', [{'name': 'h0', 'ipv4_address': '10.0.0.1'},
+                                          {'name': 'h1', 'ipv4_address': '10.0.0.2'}])
+            pool.run(cpauto.Group, 'set', [{'name': 'g', 'params': {'members': {'add': ['h0', 'h1']}}}])
+
+    endpoints = [endpoint for sid, endpoint, name in log]
+    assert endpoints[:endpoints.index('set-group')].count('publish') == 2
+    assert [commit.changes for commit in pool.commits] == [1, 1, 1]
+
+def test_discards_on_exception(mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_sessions(rsps, mgmt_server_base_uri, log)
+
+        with pytest.raises(RuntimeError):
+            with cpauto.WriterPool(clients(2)) as pool:
+                pool.run(cpauto.Host, 'add', [{'name': 'h0', 'ipv4_address': '10.0.0.1'}])
+                raise RuntimeError('boom')
+
+    endpoints = [endpoint for sid, endpoint, name in log]
+    assert 'publish' not in endpoints
+    assert endpoints.count('discard') == 1
+    assert endpoints.count('logout') == 2
+
+def test_failed_publish_raises(mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_sessions(rsps, mgmt_server_base_uri, log, publish_status=500)
+
+        with pytest.raises(cpauto.CoreClientError):
+            with cpauto.WriterPool(clients(2)) as pool:
+                pool.run(cpauto.Host, 'add', [{'name': 'h0', 'ipv4_address': '10.0.0.1'}])
+
+    assert [endpoint for sid, endpoint, name in log].count('logout') == 2
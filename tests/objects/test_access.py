@@ -2,6 +2,7 @@
 
 """Tests for cpauto.objects.access module."""
 
+import json
 import pytest
 import responses
 import cpauto
@@ -103,6 +104,92 @@ def test_show_all_access_rules(core_client, mgmt_server_base_uri, name, params):
         assert r.status_code == 200
         assert r.json() == resp_body
 
+def rulebase_pages_callback(entries, seen):
+    # answers show-*-rulebase with pages of entries, each a rule or a section
+    # of rules, counting pages in rules as the server does
+    def callback(request):
+        payload = json.loads(request.body)
+        seen.append(payload)
+        offset, limit = payload['offset'], payload['limit']
+        page, number = [], 0
+        for entry in entries:
+            rules = entry.get('rulebase', [entry])
+            taken = [rule for i, rule in enumerate(rules, number) if offset <= i < offset + limit]
+            number += len(rules)
+            if taken:
+                page.append(dict(entry, rulebase=taken) if 'rulebase' in entry else entry)
+        total = sum(len(entry.get('rulebase', [entry])) for entry in entries)
+        body = {'rulebase': page, 'objects-dictionary': [{'uid': 'o1'}], 'from': offset + 1,
+                'to': min(offset + limit, total), 'total': total}
+        return (200, {}, json.dumps(body))
+    return callback
+
+RULEBASE = [
+    {'uid': 'rule_0', 'type': 'access-rule'},
+    {'uid': 'section_1', 'type': 'access-section',
+     'rulebase': [{'uid': 'rule_{}'.format(i), 'type': 'access-rule'} for i in range(1, 5)]},
+    {'uid': 'rule_5', 'type': 'access-rule'},
+]
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_iter_all_access_rules(core_client, mgmt_server_base_uri, concurrency):
+    seen = []
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-access-rulebase',
+                          callback=rulebase_pages_callback(RULEBASE, seen),
+                          content_type='application/json')
+
+        ar = cpauto.AccessRule(core_client)
+        rules = ar.fetch_all(name='Network', params={'details-level': 'full'}, limit=2,
+                             concurrency=concurrency)
+
+    assert [rule['uid'] for rule in rules] == ['rule_{}'.format(i) for i in range(6)]
+    assert sorted(payload['offset'] for payload in seen) == [0, 2, 4]
+    assert all(payload['name'] == 'Network' and payload['details-level'] == 'full' for payload in seen)
+
+def test_iter_all_access_rules_error(core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-access-rulebase',
+                 json={'message': 'Layer not found'}, status=404,
+                 content_type='application/json')
+
+        with pytest.raises(cpauto.CoreClientError):
+            cpauto.AccessRule(core_client).fetch_all(name='Missing')
+
+@pytest.mark.parametrize("name,params", [
+    ("Network", {}),
+    ("Network", {"details-level": "full", "use-object-dictionary": True}),
+])
+def test_stream_all_access_rules(core_client, mgmt_server_base_uri, name, params):
+    import json
+    endpoint = mgmt_server_base_uri + 'show-access-rulebase'
+    with responses.RequestsMock() as rsps:
+        rules = [{'name': 'rule_{}'.format(i), 'rule-number': i + 1} for i in range(100)]
+        objects = [{'uid': 'uid_1', 'name': 'Any'}]
+        resp_body = {'from': 1, 'to': 100, 'total': 100, 'name': name,
+                     'rulebase': rules, 'objects-dictionary': objects}
+        rsps.add(responses.POST, endpoint,
+                 body=json.dumps(resp_body), status=200,
+                 content_type='application/json')
+
+        ar = cpauto.AccessRule(core_client)
+        items = list(ar.stream_all(name=name, params=params))
+
+        assert items == [('rulebase', rule) for rule in rules] + [('objects-dictionary', o) for o in objects]
+        assert json.loads(rsps.calls[0].request.body)['name'] == name
+
+def test_stream_all_access_rules_error(core_client, mgmt_server_base_uri):
+    endpoint = mgmt_server_base_uri + 'show-access-rulebase'
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, endpoint,
+                 json={'code': 'generic_err_object_not_found', 'message': 'Not found'}, status=404,
+                 content_type='application/json')
+
+        ar = cpauto.AccessRule(core_client)
+        with pytest.raises(cpauto.CoreClientError) as e:
+            list(ar.stream_all(name='Nope'))
+        assert e.value.http_status_code == 404
+
 # AccessSection
 
 @pytest.mark.parametrize("layer,position,params", [
@@ -451,3 +538,30 @@ def test_delete_nat_section(core_client, mgmt_server_base_uri, package, name, ui
 
         assert r.status_code == 200
         assert r.json() == resp_body
+
+def test_iter_all_nat_rules(core_client, mgmt_server_base_uri):
+    seen = []
+    entries = [{'uid': 'rule_{}'.format(i), 'type': 'nat-rule'} for i in range(5)]
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-nat-rulebase',
+                          callback=rulebase_pages_callback(entries, seen),
+                          content_type='application/json')
+
+        rules = list(cpauto.NATRule(core_client).iter_all(package='standard', limit=2))
+
+    assert rules == entries
+    assert [payload['offset'] for payload in seen] == [0, 2, 4]
+    assert all(payload['package'] == 'standard' for payload in seen)
+
+def test_stream_all_nat_rules(core_client, mgmt_server_base_uri):
+    endpoint = mgmt_server_base_uri + 'show-nat-rulebase'
+    with responses.RequestsMock() as rsps:
+        rules = [{'uid': 'nat_{}'.format(i)} for i in range(3)]
+        rsps.add(responses.POST, endpoint,
+                 json={'rulebase': rules, 'total': 3}, status=200,
+                 content_type='application/json')
+
+        nr = cpauto.NATRule(core_client)
+        items = list(nr.stream_all(package='standard'))
+
+        assert items == [('rulebase', rule) for rule in rules]
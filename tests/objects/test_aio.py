@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.objects.aio module."""
+
+import asyncio
+import inspect
+import pytest
+import responses
+import cpauto
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+@pytest.fixture
+def async_core_client(mgmt_server_base_uri):
+    core_client = cpauto.AsyncCoreClient('admin', 'vpn123', '10.11.12.13', verify=False)
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'login',
+            json={"sid": "somesid"}, status=200, content_type='application/json')
+        run(core_client.login())
+    return core_client
+
+@pytest.mark.parametrize("cls,sync_cls", [
+    (cpauto.AsyncHost, cpauto.Host),
+    (cpauto.AsyncNetwork, cpauto.Network),
+    (cpauto.AsyncAccessRule, cpauto.AccessRule),
+    (cpauto.AsyncServiceTCP, cpauto.ServiceTCP),
+])
+def test_methods_are_coroutines(cls, sync_cls):
+    assert issubclass(cls, sync_cls)
+    for name in ('add', 'show', 'set', 'delete', 'show_all'):
+        assert inspect.iscoroutinefunction(getattr(cls, name))
+        assert getattr(cls, name).__doc__ == getattr(sync_cls, name).__doc__
+
+@pytest.mark.parametrize("cls,method,resource,kwargs", [
+    (cpauto.AsyncHost, "add", "add-host", {"name": "srv_web", "ip_address": "192.168.1.4"}),
+    (cpauto.AsyncNetwork, "set", "set-network", {"name": "net_mgmt", "params": {"comments": "foo"}}),
+    (cpauto.AsyncGroup, "delete", "delete-group", {"uid": "groupuid"}),
+    (cpauto.AsyncAccessRule, "show", "show-access-rule", {"layer": "Network", "name": "Rule 1"}),
+    (cpauto.AsyncServiceUDP, "show_all", "show-services-udp", {"limit": 10}),
+])
+def test_all_the_things(async_core_client, mgmt_server_base_uri, cls, method, resource, kwargs):
+    with responses.RequestsMock() as rsps:
+        resp_body = {'foo': 'bar', 'message': 'OK'}
+        rsps.add(responses.POST, mgmt_server_base_uri + resource,
+                 json=resp_body, status=200,
+                 content_type='application/json')
+
+        c = cls(async_core_client)
+        r = run(getattr(c, method)(**kwargs))
+
+        assert r.status_code == 200
+        assert r.json() == resp_body
+
+def test_iter_all(async_core_client, mgmt_server_base_uri):
+    import json
+    networks = [{'name': 'net_{}'.format(i)} for i in range(12)]
+    def callback(request):
+        body = json.loads(request.body)
+        page = networks[body['offset']:body['offset'] + body['limit']]
+        resp_body = {'objects': page, 'from': body['offset'] + 1,
+                     'to': body['offset'] + len(page), 'total': len(networks)}
+        return (200, {}, json.dumps(resp_body))
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-networks',
+                          callback=callback, content_type='application/json')
+
+        c = cpauto.AsyncNetwork(async_core_client)
+
+        async def collect():
+            return [network async for network in c.iter_all(limit=5)]
+
+        assert run(collect()) == networks
+        assert len(rsps.calls) == 3
+        assert run(c.fetch_all(limit=5)) == networks
+
+def test_iter_all_concurrency(async_core_client, mgmt_server_base_uri):
+    import json
+    networks = [{'name': 'net_{}'.format(i)} for i in range(23)]
+    def callback(request):
+        body = json.loads(request.body)
+        page = networks[body['offset']:body['offset'] + body['limit']]
+        resp_body = {'objects': page, 'from': body['offset'] + 1,
+                     'to': body['offset'] + len(page), 'total': len(networks)}
+        return (200, {}, json.dumps(resp_body))
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-networks',
+                          callback=callback, content_type='application/json')
+
+        c = cpauto.AsyncNetwork(async_core_client)
+
+        assert run(c.fetch_all(limit=5, concurrency=3)) == networks
+        assert len(rsps.calls) == 5
+
+def test_stream_all(async_core_client, mgmt_server_base_uri):
+    rules = [{'uid': 'rule_{}'.format(i)} for i in range(5)]
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-access-rulebase',
+                 json={'rulebase': rules, 'objects-dictionary': []}, status=200,
+                 content_type='application/json')
+
+        ar = cpauto.AsyncAccessRule(async_core_client)
+
+        async def collect():
+            return [item async for item in ar.stream_all(name='Network')]
+
+        assert run(collect()) == [('rulebase', rule) for rule in rules]
+
+def test_fetch_all_rules(async_core_client, mgmt_server_base_uri):
+    from .test_access import RULEBASE, rulebase_pages_callback
+    seen = []
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-access-rulebase',
+                          callback=rulebase_pages_callback(RULEBASE, seen),
+                          content_type='application/json')
+
+        ar = cpauto.AsyncAccessRule(async_core_client)
+        rules = run(ar.fetch_all('Network', params={'details-level': 'full'}, limit=2, concurrency=2))
+
+    assert [rule['uid'] for rule in rules] == ['rule_{}'.format(i) for i in range(6)]
+    assert sorted(payload['offset'] for payload in seen) == [0, 2, 4]
+    assert all(payload['name'] == 'Network' and payload['details-level'] == 'full' for payload in seen)
+
+def test_add_many(async_core_client, mgmt_server_base_uri):
+    import json
+    def callback(request):
+        body = json.loads(request.body)
+        if body['name'] == 'net_2':
+            return (400, {}, json.dumps({'message': 'Validation failed'}))
+        return (200, {}, json.dumps({'name': body['name']}))
+    specs = [{'name': 'net_{}'.format(i), 'params': {'subnet': '10.{}.0.0'.format(i)}} for i in range(6)]
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'add-network',
+                          callback=callback, content_type='application/json')
+
+        c = cpauto.AsyncNetwork(async_core_client)
+        progress = []
+        bulk = run(c.add_many(specs, concurrency=3, callback=lambda done, item: progress.append(done)))
+
+        assert len(rsps.calls) == 6
+    assert [item.index for item in bulk] == list(range(6))
+    assert [item.spec['name'] for item in bulk.failed] == ['net_2']
+    assert progress == list(range(1, 7))
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.objects.batch module."""
+
+import json
+
+import pytest
+import responses
+import cpauto
+
+def batch_callbacks(task_details, status="succeeded"):
+    # answers *-objects-batch with a new task per request and show-task with
+    # the details given for that request, in order
+    requests_seen = []
+
+    def batch_callback(request):
+        requests_seen.append(json.loads(request.body))
+        return (200, {}, json.dumps({"task-id": "task-{}".format(len(requests_seen) - 1)}))
+
+    def show_task_callback(request):
+        body = json.loads(request.body)
+        tasks = []
+        for task_id in body["task-id"]:
+            index = int(task_id.split('-')[1])
+            details = task_details[index] if index < len(task_details) else []
+            task_status = status if isinstance(status, str) else status[index]
+            tasks.append({"task-id": task_id, "status": task_status, "progress-percentage": 100,
+                          "task-details": details})
+        return (200, {}, json.dumps({"tasks": tasks}))
+
+    return requests_seen, batch_callback, show_task_callback
+
+def add_callbacks(rsps, base_uri, endpoint, callbacks):
+    requests_seen, batch_callback, show_task_callback = callbacks
+    rsps.add_callback(responses.POST, base_uri + endpoint,
+                      callback=batch_callback, content_type='application/json')
+    rsps.add_callback(responses.POST, base_uri + 'show-task',
+                      callback=show_task_callback, content_type='application/json')
+    return requests_seen
+
+@pytest.fixture
+def fast_core_client(mgmt_server_base_uri):
+    strategy = cpauto.PollingStrategy(initial_delay=0.01, max_delay=0.02, jitter=0)
+    return cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', polling=strategy)
+
+def host_specs(count):
+    return [{'name': 'host_{}'.format(i), 'ip-address': '10.0.0.{}'.format(i)} for i in range(count)]
+
+def test_add_in_chunks(fast_core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        seen = add_callbacks(rsps, mgmt_server_base_uri, 'add-objects-batch', batch_callbacks([]))
+
+        bulk = cpauto.ObjectsBatch(fast_core_client, chunk_size=2).add('host', iter(host_specs(5)))
+
+    assert [payload['objects'][0]['type'] for payload in seen] == ['host'] * 3
+    assert [len(payload['objects'][0]['list']) for payload in seen] == [2, 2, 1]
+    assert len(bulk) == 5
+    assert len(bulk.succeeded) == 5
+    assert [item.index for item in bulk] == list(range(5))
+
+def test_failed_objects_are_mapped_to_inputs(fast_core_client, mgmt_server_base_uri):
+    details = [[{"failed-objects": [{"name": "host_1", "errors": [{"message": "IP address is invalid"}]}],
+                 "succeeded-objects": [{"name": "host_0", "uid": "u0"}, {"name": "host_2", "uid": "u2"}]}]]
+    with responses.RequestsMock() as rsps:
+        add_callbacks(rsps, mgmt_server_base_uri, 'add-objects-batch',
+                      batch_callbacks(details, status="partially succeeded"))
+
+        bulk = cpauto.ObjectsBatch(fast_core_client).add('host', host_specs(3))
+
+    assert [item.spec['name'] for item in bulk.failed] == ['host_1']
+    assert str(bulk.failed[0].error) == "IP address is invalid"
+    assert [item.result.json()['uid'] for item in bulk.succeeded] == ['u0', 'u2']
+
+def test_failed_task_without_details_fails_its_chunk(fast_core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        add_callbacks(rsps, mgmt_server_base_uri, 'delete-objects-batch',
+                      batch_callbacks([], status=["succeeded", "failed"]))
+
+        specs = [{'name': 'host_{}'.format(i)} for i in range(4)]
+        bulk = cpauto.ObjectsBatch(fast_core_client, chunk_size=2).delete('host', specs)
+
+    assert [item.spec['name'] for item in bulk.failed] == ['host_2', 'host_3']
+    assert len(bulk.succeeded) == 2
+
+def test_rejected_chunk(fast_core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'set-objects-batch',
+                 json={'code': 'generic_err_invalid_syntax', 'message': 'Invalid syntax'}, status=400,
+                 content_type='application/json')
+
+        bulk = cpauto.ObjectsBatch(fast_core_client).set('host', [{'name': 'host_0', 'color': 'red'}])
+
+    assert len(bulk.failed) == 1
+    assert bulk.failed[0].error.http_status_code == 400
+
+def test_task_handles_are_waited_for(mgmt_server_base_uri):
+    strategy = cpauto.PollingStrategy(initial_delay=0.01, max_delay=0.02, jitter=0)
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', wait_for_tasks=False, polling=strategy)
+    with responses.RequestsMock() as rsps:
+        add_callbacks(rsps, mgmt_server_base_uri, 'add-objects-batch', batch_callbacks([]))
+
+        bulk = cpauto.ObjectsBatch(cc).add('host', host_specs(3))
+
+    assert len(bulk.succeeded) == 3
@@ -6,6 +6,8 @@ import pytest
 import responses
 import cpauto
 
+from requests.exceptions import ConnectionError
+
 @pytest.mark.parametrize("name,ip_address,ipv4_address,ipv6_address,params", [
     ("srv_cams", "192.168.1.91", "", "", {}),
     ("srv_dns", '', "10.11.12.13", '2002:0a0b:0c0d::0a0b:0c0d', {}),
@@ -105,3 +107,141 @@ def test_show_all(core_client, mgmt_server_base_uri,
 
         assert r.status_code == 200
         assert r.json() == resp_body
+
+def paged_callback(objects, key='objects', max_page=None):
+    def callback(request):
+        import json
+        body = json.loads(request.body)
+        offset, limit = body['offset'], body['limit']
+        if max_page is not None:
+            # the server caps pages whatever the limit asked for
+            limit = min(limit, max_page)
+        page = objects[offset:offset + limit]
+        resp_body = {key: page, 'from': offset + 1, 'to': offset + len(page), 'total': len(objects)}
+        if not page:
+            resp_body = {key: [], 'total': len(objects)}
+        return (200, {}, json.dumps(resp_body))
+    return callback
+
+@pytest.mark.parametrize("count,limit,pages", [
+    (0, 500, 1),
+    (499, 500, 1),
+    (500, 500, 1),
+    (1201, 500, 3),
+    (10, 3, 4),
+])
+def test_iter_all(core_client, mgmt_server_base_uri, count, limit, pages):
+    endpoint = mgmt_server_base_uri + 'show-hosts'
+    hosts = [{'name': 'host_{}'.format(i)} for i in range(count)]
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, endpoint,
+                          callback=paged_callback(hosts),
+                          content_type='application/json')
+
+        c = cpauto.Host(core_client)
+        it = c.iter_all(details_level='uid', limit=limit)
+
+        assert len(rsps.calls) == 0
+        assert list(it) == hosts
+        assert len(rsps.calls) == pages
+
+        assert c.fetch_all(limit=limit) == hosts
+
+def test_iter_all_error(core_client, mgmt_server_base_uri):
+    endpoint = mgmt_server_base_uri + 'show-hosts'
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, endpoint,
+                 json={'code': 'generic_err', 'message': 'Oops'}, status=500,
+                 content_type='application/json')
+
+        c = cpauto.Host(core_client)
+        with pytest.raises(cpauto.CoreClientError) as e:
+            c.fetch_all()
+        assert e.value.http_status_code == 500
+
+@pytest.mark.parametrize("count,limit,concurrency", [
+    (1201, 100, 4),
+    (1201, 500, 8),
+    (300, 100, 1),
+    (100, 100, 4),
+])
+def test_iter_all_concurrency(core_client, mgmt_server_base_uri, count, limit, concurrency):
+    import threading
+    import time
+    endpoint = mgmt_server_base_uri + 'show-hosts'
+    hosts = [{'name': 'host_{}'.format(i)} for i in range(count)]
+    serve_page = paged_callback(hosts)
+    lock = threading.Lock()
+    in_flight = [0, 0]
+    def callback(request):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return serve_page(request)
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, endpoint, callback=callback,
+                          content_type='application/json')
+
+        c = cpauto.Host(core_client)
+
+        assert c.fetch_all(limit=limit, concurrency=concurrency) == hosts
+        assert len(rsps.calls) == max(1, -(-count // limit))
+        assert in_flight[1] <= concurrency
+        if concurrency > 1 and count > 2 * limit:
+            assert in_flight[1] > 1
+
+def test_iter_all_concurrency_with_short_pages(core_client, mgmt_server_base_uri):
+    endpoint = mgmt_server_base_uri + 'show-hosts'
+    hosts = [{'name': 'host_{}'.format(i)} for i in range(25)]
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, endpoint, callback=paged_callback(hosts, max_page=4),
+                          content_type='application/json')
+
+        c = cpauto.Host(core_client)
+
+        assert c.fetch_all(limit=10, concurrency=4) == hosts
+
+def bulk_callback(failing=()):
+    def callback(request):
+        import json
+        body = json.loads(request.body)
+        if body['name'] in failing:
+            return (400, {}, json.dumps({'code': 'err_validation_failed', 'message': 'Validation failed'}))
+        return (200, {}, json.dumps({'uid': 'uid_' + body['name'], 'name': body['name']}))
+    return callback
+
+def test_add_many(core_client, mgmt_server_base_uri):
+    specs = [{'name': 'host_{}'.format(i), 'ipv4_address': '10.0.0.{}'.format(i)} for i in range(20)]
+    progress = []
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'add-host',
+                          callback=bulk_callback(failing=('host_3', 'host_11')),
+                          content_type='application/json')
+
+        c = cpauto.Host(core_client)
+        bulk = c.add_many(iter(specs), concurrency=4, callback=lambda done, item: progress.append(done))
+
+        assert len(rsps.calls) == 20
+    assert len(bulk) == 20
+    assert [item.index for item in bulk] == list(range(20))
+    assert [item.spec['name'] for item in bulk.failed] == ['host_3', 'host_11']
+    assert all(item.result.json()['name'] == item.spec['name'] for item in bulk.succeeded)
+    assert progress == list(range(1, 21))
+
+def test_set_and_delete_many_collect_errors(core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'set-host',
+                          callback=bulk_callback(), content_type='application/json')
+        rsps.add(responses.POST, mgmt_server_base_uri + 'delete-host',
+                 body=ConnectionError())
+
+        c = cpauto.Host(core_client)
+        bulk = c.set_many([{'name': 'host_1', 'params': {'color': 'red'}}])
+        assert len(bulk.succeeded) == 1
+
+        bulk = c.delete_many([{'name': 'host_1'}, {'uid': 'uid_2'}], concurrency=2)
+        assert len(bulk.failed) == 2
+        assert all(isinstance(item.error, cpauto.ConnectionError) for item in bulk.failed)
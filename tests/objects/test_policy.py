@@ -123,3 +123,21 @@ def test_show_all(core_client, mgmt_server_base_uri,
 
         assert r.status_code == 200
         assert r.json() == resp_body
+
+def test_package_iter_all(core_client, mgmt_server_base_uri):
+    import json
+    packages = [{'name': 'pkg_{}'.format(i)} for i in range(7)]
+    def callback(request):
+        body = json.loads(request.body)
+        page = packages[body['offset']:body['offset'] + body['limit']]
+        resp_body = {'packages': page, 'from': body['offset'] + 1,
+                     'to': body['offset'] + len(page), 'total': len(packages)}
+        return (200, {}, json.dumps(resp_body))
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-packages',
+                          callback=callback, content_type='application/json')
+
+        c = cpauto.PolicyPackage(core_client)
+
+        assert c.fetch_all(limit=5) == packages
+        assert len(rsps.calls) == 2
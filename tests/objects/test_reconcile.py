@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.objects.reconcile module."""
+
+import json
+
+import responses
+import cpauto
+
+CURRENT = [
+    {'uid': 'u1', 'name': 'web-1', 'type': 'host', 'ipv4-address': '10.0.0.1', 'color': 'black',
+     'groups': [{'uid': 'g2', 'name': 'dmz'}, {'uid': 'g1', 'name': 'web'}],
+     'domain': {'name': 'SMC User', 'domain-type': 'domain'}},
+    {'uid': 'u2', 'name': 'web-2', 'type': 'host', 'ipv4-address': '10.0.0.2', 'color': 'black',
+     'groups': [], 'domain': {'name': 'SMC User', 'domain-type': 'domain'}},
+    {'uid': 'u3', 'name': 'old', 'type': 'host', 'ipv4-address': '10.0.0.3', 'color': 'black',
+     'groups': [], 'domain': {'name': 'SMC User', 'domain-type': 'domain'}},
+    {'uid': 'u4', 'name': 'predefined', 'type': 'host', 'ipv4-address': '10.0.0.4',
+     'domain': {'name': 'Check Point Data', 'domain-type': 'data domain'}},
+]
+
+DESIRED = [
+    {'name': 'web-1', 'ipv4_address': '10.0.0.1', 'groups': ['web', 'dmz']},
+    {'name': 'web-2', 'ipv4-address': '10.0.0.2', 'color': 'red'},
+    {'name': 'web-3', 'ipv4-address': '10.0.0.5'},
+]
+
+def mock_hosts(rsps, base_uri, log):
+    def show_hosts(request):
+        payload = json.loads(request.body)
+        log.append(('show-hosts', payload))
+        page = CURRENT[payload['offset']:payload['offset'] + payload['limit']]
+        body = {'objects': page, 'from': payload['offset'] + 1, 'to': payload['offset'] + len(page),
+                'total': len(CURRENT)}
+        return (200, {}, json.dumps(body))
+
+    def write(endpoint):
+        def callback(request):
+            log.append((endpoint, json.loads(request.body)))
+            return (200, {}, json.dumps({}))
+        return callback
+
+    rsps.add_callback(responses.POST, base_uri + 'show-hosts', callback=show_hosts,
+                      content_type='application/json')
+    for endpoint in ('add-host', 'set-host', 'delete-host'):
+        rsps.add_callback(responses.POST, base_uri + endpoint, callback=write(endpoint),
+                          content_type='application/json')
+
+def test_diff_normalizes_fields():
+    current = {'name': 'a', 'port': '80', 'members': [{'uid': 'ub', 'name': 'b'}, {'uid': 'uc', 'name': 'c'}],
+               'comments': 'x '}
+    assert cpauto.objects.reconcile.diff(current, {'port': 80, 'members': ['c', 'b'], 'comments': 'x'}) == {}
+    assert cpauto.objects.reconcile.diff(current, {'port': 81, 'color': 'red'}) == {
+        'port': ('80', '81'), 'color': (None, 'red')}
+
+def test_diff_compares_named_dicts_that_are_not_references():
+    current = {'name': 'gw', 'interfaces': [
+        {'name': 'eth0', 'ipv4-address': '10.0.0.1', 'ipv4-mask-length': 24}]}
+    assert cpauto.objects.reconcile.diff(current, {'interfaces': [
+        {'name': 'eth0', 'ipv4-address': '10.0.0.1', 'ipv4-mask-length': 24}]}) == {}
+    changes = cpauto.objects.reconcile.diff(current, {'interfaces': [
+        {'name': 'eth0', 'ipv4-address': '10.0.0.2', 'ipv4-mask-length': 24}]})
+    assert list(changes) == ['interfaces']
+
+def test_plan_makes_only_needed_calls(core_client, mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_hosts(rsps, mgmt_server_base_uri, log)
+        plan = cpauto.Reconciler(core_client).plan(cpauto.Host, DESIRED)
+
+    assert [endpoint for endpoint, payload in log] == ['show-hosts']
+    assert log[0][1]['details-level'] == 'full'
+    assert [(change.action, change.name) for change in plan] == [('add', 'web-3'), ('set', 'web-2')]
+    assert plan.of('set')[0].spec == {'name': 'web-2', 'params': {'color': 'red'}}
+    assert plan.of('set')[0].fields == {'color': ('black', 'red')}
+    assert plan.unchanged == ['web-1']
+    assert plan.counts == {'add': 1, 'set': 1, 'delete': 0, 'unchanged': 1}
+    assert plan.describe() == ["+ web-3", "~ web-2: color 'black' -> 'red'",
+                               "Host: 1 to add, 1 to set, 0 to delete, 1 unchanged"]
+
+def test_prune_spares_predefined_objects(core_client):
+    current = dict((obj['name'], obj) for obj in CURRENT)
+    plan = cpauto.Reconciler(core_client).plan(cpauto.Host, DESIRED, prune=True, current=current)
+
+    assert [change.name for change in plan.of('delete')] == ['old']
+    assert plan.counts['delete'] == 1
+
+def test_reconcile(core_client, mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_hosts(rsps, mgmt_server_base_uri, log)
+        plan, results = cpauto.Reconciler(core_client).reconcile(cpauto.Host, DESIRED, prune=True)
+
+    writes = [(endpoint, payload) for endpoint, payload in log if endpoint != 'show-hosts']
+    assert sorted(writes, key=lambda w: w[0]) == [
+        ('add-host', {'name': 'web-3', 'ipv4-address': '10.0.0.5'}),
+        ('delete-host', {'name': 'old'}),
+        ('set-host', {'name': 'web-2', 'color': 'red'}),
+    ]
+    assert [len(results[action].succeeded) for action in ('add', 'set', 'delete')] == [1, 1, 1]
+
+def test_dry_run_makes_no_changes(core_client, mgmt_server_base_uri):
+    log = []
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_hosts(rsps, mgmt_server_base_uri, log)
+        plan, results = cpauto.Reconciler(core_client).reconcile(cpauto.Host, DESIRED, prune=True, dry_run=True)
+
+    assert results is None
+    assert [endpoint for endpoint, payload in log] == ['show-hosts']
+    assert plan.counts == {'add': 1, 'set': 1, 'delete': 1, 'unchanged': 1}
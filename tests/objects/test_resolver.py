@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for cpauto.objects.resolver module."""
+
+import json
+import threading
+import time
+
+import pytest
+import responses
+import cpauto
+
+def show_objects_callback(known, requests_seen):
+    def callback(request):
+        payload = json.loads(request.body)
+        requests_seen.append(payload)
+        objects = [known[uid] for uid in payload['uids'] if uid in known]
+        body = {'objects': objects, 'from': 1, 'to': len(objects), 'total': len(objects)}
+        return (200, {}, json.dumps(body))
+    return callback
+
+def known_hosts(count):
+    return dict(('u%d' % i, {'uid': 'u%d' % i, 'name': 'h%d' % i, 'type': 'host'}) for i in range(count))
+
+def test_resolve_in_chunks(core_client, mgmt_server_base_uri):
+    known = known_hosts(7)
+    seen = []
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-objects',
+                          callback=show_objects_callback(known, seen),
+                          content_type='application/json')
+
+        resolver = cpauto.UIDResolver(core_client, chunk_size=3)
+        objects = resolver.resolve(['u%d' % i for i in range(7)] + ['u0', 'missing'])
+
+    assert sorted(objects) == ['u%d' % i for i in range(7)]
+    assert objects['u4']['name'] == 'h4'
+    assert [len(payload['uids']) for payload in seen] == [3, 3, 2]
+    assert all(payload['limit'] == len(payload['uids']) for payload in seen)
+    assert all(payload['details-level'] == 'full' for payload in seen)
+
+def test_resolve_fills_and_uses_cache(mgmt_server_base_uri):
+    cc = cpauto.CoreClient('admin', 'vpn123', '10.11.12.13', cache=cpauto.ObjectCache())
+    known = known_hosts(3)
+    seen = []
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-objects',
+                          callback=show_objects_callback(known, seen),
+                          content_type='application/json')
+
+        resolver = cpauto.UIDResolver(cc)
+        resolver.resolve(['u0', 'u1'])
+        objects = resolver.resolve(['u0', 'u1', 'u2'])
+
+        assert sorted(objects) == ['u0', 'u1', 'u2']
+        assert [payload['uids'] for payload in seen] == [['u0', 'u1'], ['u2']]
+        assert cpauto.Host(cc).show(uid='u1', details_level='full').json()['name'] == 'h1'
+        assert cpauto.Host(cc).show(name='h1', details_level='full').json()['uid'] == 'u1'
+        assert len(seen) == 2
+
+def test_concurrent_callers_share_requests(core_client, mgmt_server_base_uri):
+    known = known_hosts(40)
+    seen = []
+    started = threading.Event()
+    release = threading.Event()
+    callback = show_objects_callback(known, seen)
+
+    def slow_callback(request):
+        started.set()
+        release.wait(5)
+        return callback(request)
+
+    resolver = cpauto.UIDResolver(core_client, chunk_size=100, concurrency=1)
+    results = []
+    resolve = lambda i: results.append(resolver.resolve(['u%d' % j for j in range(i * 10, i * 10 + 10)]))
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-objects',
+                          callback=slow_callback, content_type='application/json')
+
+        threads = [threading.Thread(target=resolve, args=(0,))]
+        threads[0].start()
+        started.wait(5)
+        for i in range(1, 4):
+            threads.append(threading.Thread(target=resolve, args=(i,)))
+            threads[-1].start()
+        queue = resolver._UIDResolver__queue
+        deadline = time.time() + 5
+        while len(queue) < 30 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for t in threads:
+            t.join()
+
+    assert len(results) == 4
+    assert sum(len(r) for r in results) == 40
+    assert [len(payload['uids']) for payload in seen] == [10, 30]
+
+def test_resolve_error(core_client, mgmt_server_base_uri):
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, mgmt_server_base_uri + 'show-objects',
+                 json={'code': 'generic_err_invalid_parameter', 'message': 'Bad uids'}, status=400,
+                 content_type='application/json')
+
+        with pytest.raises(cpauto.CoreClientError) as excinfo:
+            cpauto.UIDResolver(core_client).resolve(['u0'])
+    assert excinfo.value.http_status_code == 400
+
+class Interrupted(BaseException):
+    pass
+
+def test_interrupted_fetch_does_not_strand_uids(core_client, mgmt_server_base_uri):
+    known = known_hosts(1)
+    seen = []
+    callback = show_objects_callback(known, seen)
+    calls = []
+
+    def interrupted_once(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise Interrupted()
+        return callback(request)
+
+    resolver = cpauto.UIDResolver(core_client)
+    results = []
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-objects',
+                          callback=interrupted_once, content_type='application/json')
+
+        with pytest.raises(Interrupted):
+            resolver.resolve(['u0'])
+        t = threading.Thread(target=lambda: results.append(resolver.resolve(['u0'])))
+        t.daemon = True
+        t.start()
+        t.join(5)
+
+    assert not t.is_alive()
+    assert results == [{'u0': known['u0']}]
+
+def test_many_duplicate_uids_are_asked_for_once(core_client, mgmt_server_base_uri):
+    known = known_hosts(20000)
+    seen = []
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, mgmt_server_base_uri + 'show-objects',
+                          callback=show_objects_callback(known, seen),
+                          content_type='application/json')
+
+        objects = cpauto.UIDResolver(core_client).resolve(sorted(known) * 2)
+
+    assert len(objects) == 20000
+    assert sum(len(payload['uids']) for payload in seen) == 20000
+    assert len(seen) == 40